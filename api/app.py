@@ -1,7 +1,8 @@
 from fastapi import FastAPI
 from contextlib import asynccontextmanager
 from api.routers import marine, meteo
-from database import engine_staging, cleaned_marine_data, cleaned_meteo_data
+from database import cleaned_marine_data, cleaned_meteo_data, db_staging
+from engines import get_engine
 from sqlalchemy.orm import sessionmaker
 from sqlalchemy import inspect
 
@@ -14,6 +15,7 @@ async def lifespan(app: FastAPI):
     Initialise les tables et la connexion à la base de données pendant le cycle de vie de l'application.
     """
     # Création de la session pour interagir avec la DB (Database Session)
+    engine_staging = get_engine(db_staging)
     SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine_staging)
     app.state.db = SessionLocal()
 
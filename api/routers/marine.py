@@ -1,6 +1,6 @@
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session
-from database import engine_staging, cleaned_marine_data, get_db_staging
+from database import cleaned_marine_data, get_db_staging, get_staging_connection
 from sqlalchemy import func, asc
 from api.models import MarineNumericFields, MarineNonNumericFields  # Assurez-vous que cette importation est correcte
 from functions import *
@@ -108,7 +108,7 @@ async def get_records_in_range(
     station_id: Optional[str] = Query(None, description="Filtrer par ID de station"),
     start_date: Optional[str] = Query(None, description="Date de début YYYY-MM-DD"),
     end_date: Optional[str] = Query(None, description="Date de fin YYYY-MM-DD"),
-    db: Session = Depends(lambda: engine_staging.connect())
+    db: Session = Depends(get_staging_connection)
 ):
     """
     Renvoie les enregistrements où la colonne sélectionnée est dans les seuils fournis (supérieur et/ou inférieur).
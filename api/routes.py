@@ -3,7 +3,8 @@ from sqlalchemy import select, func
 from sqlalchemy.orm import Session
 from typing import Optional
 from datetime import datetime
-from database import cleaned_marine_data, cleaned_meteo_data, engine_staging
+from database import cleaned_marine_data, cleaned_meteo_data, db_staging
+from engines import get_engine
 
 
 app = FastAPI()
@@ -12,7 +13,7 @@ app = FastAPI()
 
 @app.get("/marine/avg_wave_height")
 def avg_wave_height(station_id: Optional[str] = None):
-    with engine_staging.connect() as conn:
+    with get_engine(db_staging).connect() as conn:
         query = select(func.avg(cleaned_marine_data.c.wave_height))
         if station_id:
             query = query.where(cleaned_marine_data.c.station_id == station_id)
@@ -22,7 +23,7 @@ def avg_wave_height(station_id: Optional[str] = None):
 
 @app.get("/marine/max_water_temp")
 def max_water_temperature():
-    with engine_staging.connect() as conn:
+    with get_engine(db_staging).connect() as conn:
         result = conn.execute(
             select(func.max(cleaned_marine_data.c.water_temp))
         ).scalar()
@@ -31,7 +32,7 @@ def max_water_temperature():
 
 @app.get("/marine/wave_stats")
 def wave_stats(station_id: Optional[str] = None):
-    with engine_staging.connect() as conn:
+    with get_engine(db_staging).connect() as conn:
         query = select(
             func.min(cleaned_marine_data.c.wave_height).label("min"),
             func.avg(cleaned_marine_data.c.wave_height).label("avg"),
@@ -47,7 +48,7 @@ def wave_stats(station_id: Optional[str] = None):
 
 @app.get("/meteo/avg_temperature")
 def avg_temperature(station_id: Optional[str] = None):
-    with engine_staging.connect() as conn:
+    with get_engine(db_staging).connect() as conn:
         query = select(func.avg(cleaned_meteo_data.c.temperature_c))
         if station_id:
             query = query.where(cleaned_meteo_data.c.station_id == station_id)
@@ -57,7 +58,7 @@ def avg_temperature(station_id: Optional[str] = None):
 
 @app.get("/meteo/precipitations_by_month")
 def precipitations_by_month(year: str = Query(...)):
-    with engine_staging.connect() as conn:
+    with get_engine(db_staging).connect() as conn:
         query = select(
             cleaned_meteo_data.c.month,
             func.sum(cleaned_meteo_data.c.precipitations).label("total_precip")
@@ -68,7 +69,7 @@ def precipitations_by_month(year: str = Query(...)):
 
 @app.get("/meteo/extreme_conditions")
 def extreme_conditions():
-    with engine_staging.connect() as conn:
+    with get_engine(db_staging).connect() as conn:
         query = select(
             cleaned_meteo_data.c.datetime,
             cleaned_meteo_data.c.temperature_c,
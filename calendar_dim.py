@@ -0,0 +1,116 @@
+from imports import *
+from keys import encode_date_id
+
+# ==============================
+# Configuration
+# ==============================
+CALENDAR_START = "2000-01-01"
+CALENDAR_END = "2040-12-31 23:00"
+
+MONTH_NAMES = ["January", "February", "March", "April", "May", "June", "July",
+               "August", "September", "October", "November", "December"]
+DAY_NAMES = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"]
+DAY_PERIODS = ["Morning", "Afternoon", "Evening", "Night"]
+
+# Moment de la journée pour chaque heure (0 → 23)
+HOUR_DAY_PERIOD = np.array(["Night"] * 6 + ["Morning"] * 6 + ["Afternoon"] * 6 + ["Evening"] * 4 + ["Night"] * 2)
+HOUR_DAY_PERIOD_CODES = pd.Categorical(HOUR_DAY_PERIOD, categories=DAY_PERIODS).codes
+
+# Colonnes calendaires des tables de staging / dim_time
+CALENDAR_COLUMNS = ['Year', 'Month', 'Day', 'Hour', 'DayOfWeek', 'DayPeriod']
+
+
+def day_period_of_hours(hours):
+    """
+    'Morning' (6h-12h), 'Afternoon' (12h-18h), 'Evening' (18h-22h) ou 'Night',
+    par simple indexation d'un tableau de 24 valeurs.
+    """
+    hours = np.asarray(hours, dtype="int64")
+    return pd.Categorical.from_codes(HOUR_DAY_PERIOD_CODES[hours], categories=DAY_PERIODS)
+
+
+def build_calendar(start=CALENDAR_START, end=CALENDAR_END):
+    """
+    Génère la dimension calendrier : une ligne par heure entre `start` et `end`,
+    avec les attributs dérivés en entiers courts ou en catégories.
+
+    Returns:
+    - pd.DataFrame: 'Date ID' (YYYYMMDDHH), 'Datetime', 'Year', 'Month', 'Day', 'Hour',
+      'DayOfWeek', 'DayPeriod'.
+    """
+    datetimes = pd.date_range(pd.Timestamp(start).floor("h"), pd.Timestamp(end).floor("h"), freq="h")
+    hours = datetimes.hour.to_numpy()
+
+    return pd.DataFrame({
+        'Date ID': encode_date_id(datetimes),
+        'Datetime': datetimes,
+        'Year': datetimes.year.to_numpy().astype("int16"),
+        'Month': pd.Categorical.from_codes(datetimes.month.to_numpy() - 1, categories=MONTH_NAMES, ordered=True),
+        'Day': datetimes.day.to_numpy().astype("int8"),
+        'Hour': hours.astype("int8"),
+        'DayOfWeek': pd.Categorical.from_codes(datetimes.dayofweek.to_numpy(), categories=DAY_NAMES, ordered=True),
+        'DayPeriod': day_period_of_hours(hours),
+    })
+
+
+_calendar = None
+
+
+def get_calendar(start=None, end=None):
+    """
+    Renvoie la dimension calendrier partagée, générée une seule fois et élargie
+    seulement si [start, end] sort de la plage déjà couverte.
+    """
+    global _calendar
+    if _calendar is None:
+        _calendar = build_calendar()
+
+    first, last = _calendar['Datetime'].iloc[0], _calendar['Datetime'].iloc[-1]
+    if (start is not None and pd.Timestamp(start) < first) or (end is not None and pd.Timestamp(end) > last):
+        _calendar = build_calendar(min(first, pd.Timestamp(start or first)), max(last, pd.Timestamp(end or last)))
+    return _calendar
+
+
+def lookup_calendar(datetimes, columns=CALENDAR_COLUMNS):
+    """
+    Attributs calendaires d'une série de datetimes (ramenés à l'heure), obtenus par
+    position dans la dimension calendrier plutôt que recalculés ligne à ligne.
+    Les datetimes manquants donnent des valeurs manquantes.
+
+    Returns:
+    - pd.DataFrame: `columns`, aligné sur l'index de `datetimes`.
+    """
+    datetimes = pd.Series(datetimes)
+    if datetimes.dt.tz is not None:
+        datetimes = datetimes.dt.tz_convert("UTC").dt.tz_localize(None)
+
+    calendar = get_calendar(datetimes.min(), datetimes.max())
+    hours = datetimes.to_numpy(dtype="datetime64[ns]").astype("datetime64[h]")
+    missing = np.isnat(hours)
+
+    start_hour = calendar['Datetime'].to_numpy(dtype="datetime64[ns]")[0].astype("datetime64[h]")
+    positions = np.where(missing, 0, (hours - start_hour).astype("int64"))
+
+    result = calendar[list(columns)].take(positions).set_index(datetimes.index)
+    if missing.any():
+        # Entiers nullables (Int8, Int16...) pour garder des types compacts malgré les manquants
+        result = result.astype({col: str(dtype).capitalize() for col, dtype in result.dtypes.items()
+                                if pd.api.types.is_integer_dtype(dtype)})
+        result = result.where(pd.Series(~missing, index=result.index), axis=0)
+    return result
+
+
+def add_calendar_columns(df, datetime_column='Datetime', columns=CALENDAR_COLUMNS):
+    """
+    Renvoie une copie du DataFrame avec les colonnes calendaires de `lookup_calendar`.
+    """
+    df = df.drop(columns=list(columns), errors='ignore')
+    return df.join(lookup_calendar(df[datetime_column], columns))
+
+
+def calendar_for(datetimes):
+    """
+    Lignes de la dimension calendrier (dim_time) correspondant aux heures présentes.
+    """
+    hours = pd.Series(pd.unique(pd.Series(datetimes).dropna().dt.floor("h")))
+    return lookup_calendar(hours, ['Date ID', 'Datetime'] + CALENDAR_COLUMNS).reset_index(drop=True)
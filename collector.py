@@ -0,0 +1,206 @@
+from imports import *
+from functions import meteo_api_request, rename_columns, print_with_flush
+from metadata_store import get_metadata_store
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from threading import Lock
+from time import perf_counter, monotonic, sleep
+
+# ==============================
+# Hôtes appelés pendant la collecte
+# ==============================
+NDBC_HOST = "www.ndbc.noaa.gov"
+OPEN_METEO_HOST = "api.open-meteo.com"
+
+# Nombre maximal de requêtes par seconde et par hôte
+DEFAULT_HOST_RATE_LIMITS = {
+    NDBC_HOST: 5,
+    OPEN_METEO_HOST: 10,
+}
+
+# Jointure Marine/Meteo : écart maximal entre une mesure NDBC et l'heure Open-Meteo associée
+# (utilisé par `pipeline.join_marine_meteo` et pour filtrer les mesures après un watermark)
+JOIN_TOLERANCE = pd.Timedelta("30min")
+
+
+class HostRateLimiter:
+    """
+    Limiteur de débit partagé entre les threads : espace les appels vers un même hôte
+    pour ne jamais dépasser `rate_limits[host]` requêtes par seconde.
+    Un hôte absent du dictionnaire n'est pas limité.
+    """
+
+    def __init__(self, rate_limits=None):
+        self.rate_limits = dict(DEFAULT_HOST_RATE_LIMITS if rate_limits is None else rate_limits)
+        self._next_slot = {}
+        self._lock = Lock()
+
+    def acquire(self, host):
+        rate = self.rate_limits.get(host)
+        if not rate:
+            return
+
+        # Réserver le prochain créneau libre pour cet hôte, puis attendre hors du verrou
+        with self._lock:
+            now = monotonic()
+            slot = max(now, self._next_slot.get(host, now))
+            self._next_slot[host] = slot + 1.0 / rate
+
+        if slot > now:
+            sleep(slot - now)
+
+
+def _rename_datetime_column(df):
+    # Même règle que dans le notebook : toute colonne 'date'/'time' devient 'Datetime'
+    df.columns = ['Datetime' if 'date' in col.lower() or 'time' in col.lower() else col for col in df.columns]
+    df['Datetime'] = df['Datetime'].dt.tz_localize(None)
+    return df
+
+
+def collect_station(buoy_id, buoy_info=None, limiter=None, watermark=None):
+    """
+    Collecte les données d'une seule bouée : métadonnées, observations marines (NDBC)
+    et données météo (Open-Meteo).
+
+    Args:
+    - buoy_id (str): ID de la station.
+    - buoy_info (dict): Métadonnées déjà parsées (`parse_buoy_json`), lues dans le cache
+      local (`metadata_store`) si None.
+    - limiter (HostRateLimiter): Limiteur de débit partagé.
+    - watermark (datetime): Dernier Datetime (heure) déjà chargé pour cette station ; seules les
+      mesures joignables à une heure plus récente (à JOIN_TOLERANCE près) sont gardées et la
+      requête Open-Meteo est réduite à l'écart.
+
+    Returns:
+    - tuple: (buoy_info, timings) où buoy_info contient les clés "Marine" et "Meteo"
+      en cas de succès, et timings le temps passé (s) dans chaque étape.
+    """
+    limiter = limiter or HostRateLimiter()
+    timings = {"Station ID": buoy_id, "status": "ok", "error": None}
+    start = perf_counter()
+
+    try:
+        ######### 🏷️ METADATA #########
+        step = perf_counter()
+        if not buoy_info:
+            store = get_metadata_store()
+            # Seul un re-téléchargement consomme un créneau NDBC
+            if not store.has_fresh(buoy_id):
+                limiter.acquire(NDBC_HOST)
+            buoy_info = store.get(buoy_id)
+        buoy_info = dict(buoy_info)
+        timings["metadata_s"] = perf_counter() - step
+
+        Lat, Lon = buoy_info.get('lat_buoy'), buoy_info.get('lon_buoy')
+        if Lat is None or Lon is None:
+            raise ValueError(f"Données manquantes pour {buoy_id}")
+
+        ######### 🌊 MARINE DATA #########
+        step = perf_counter()
+        limiter.acquire(NDBC_HOST)
+        df_marine = NDBC.realtime_observations(buoy_id)
+        timings["marine_s"] = perf_counter() - step
+
+        if df_marine is None or df_marine.empty:
+            timings["status"] = "marine_empty"
+            return buoy_info, timings
+
+        df_marine = _rename_datetime_column(df_marine)
+        if watermark is not None:
+            # Le watermark est une heure Open-Meteo (Datetime stocké) : on garde les mesures qui peuvent
+            # encore être jointes à une heure postérieure (ex: 10:50 pour 11:00 si le watermark est 10:00)
+            first_new_hour = pd.Timestamp(watermark).floor("h") + pd.Timedelta(hours=1)
+            df_marine = df_marine[df_marine['Datetime'] >= first_new_hour - JOIN_TOLERANCE].copy()
+            if df_marine.empty:
+                timings["status"] = "up_to_date"
+                return buoy_info, timings
+
+        df_marine['Lat'] = Lat
+        df_marine['Lon'] = Lon
+        df_marine['Water_depth'] = buoy_info.get('Water_depth', None)
+        buoy_info["Marine"] = df_marine
+
+        ######### ⛅ METEO DATA #########
+        step = perf_counter()
+        limiter.acquire(OPEN_METEO_HOST)
+        df_meteo = meteo_api_request([Lat, Lon], since=watermark)
+        timings["meteo_s"] = perf_counter() - step
+
+        if df_meteo is None or df_meteo.empty:
+            timings["status"] = "meteo_empty"
+            return buoy_info, timings
+
+        rename_columns(df_meteo, {'date': 'Datetime'})
+        buoy_info["Meteo"] = _rename_datetime_column(df_meteo)
+
+    except Exception as e:
+        timings["status"] = "error"
+        timings["error"] = str(e)
+
+    finally:
+        timings["total_s"] = perf_counter() - start
+
+    return buoy_info, timings
+
+
+def collect_buoy_datas(station_ids, buoy_datas=None, max_workers=8, rate_limits=None, watermarks=None):
+    """
+    Remplace la boucle séquentielle du notebook : collecte toutes les bouées en parallèle
+    avec un nombre borné de threads et une limite de débit par hôte.
+
+    Args:
+    - station_ids (iterable): IDs des stations (ex: stations_df["Station"]).
+    - buoy_datas (dict): Métadonnées déjà parsées par station, récupérées si absentes.
+    - max_workers (int): Nombre maximal de stations traitées simultanément.
+    - rate_limits (dict): Requêtes/seconde par hôte (défaut: DEFAULT_HOST_RATE_LIMITS).
+    - watermarks (dict): {station_id: dernier Datetime chargé}, voir `get_station_watermarks`.
+      Les stations sans watermark sont collectées en entier.
+
+    Returns:
+    - tuple: (buoy_datas, timings_df). buoy_datas a la même structure que dans le notebook
+      (métadonnées + "Marine" + "Meteo", uniquement pour les bouées complètes) et
+      timings_df contient une ligne par station avec les durées de chaque étape.
+    """
+    buoy_datas = buoy_datas or {}
+    watermarks = watermarks or {}
+    limiter = HostRateLimiter(rate_limits)
+    collected = {}
+    timings = []
+
+    station_ids = list(station_ids)
+    print(f"\n🚀 Collecte de {len(station_ids)} stations avec {max_workers} workers...\n")
+    start = perf_counter()
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = {
+            executor.submit(collect_station, buoy_id, buoy_datas.get(buoy_id), limiter,
+                            watermarks.get(str(buoy_id))): buoy_id
+            for buoy_id in station_ids
+        }
+        for count, future in enumerate(as_completed(futures), start=1):
+            buoy_id = futures[future]
+            buoy_info, station_timings = future.result()
+            collected[buoy_id] = buoy_info
+            timings.append(station_timings)
+
+            if station_timings["status"] == "error":
+                print(f"⚠️ Erreur collecte {buoy_id}: {station_timings['error']}")
+            print_with_flush(f"⏳ {count}/{len(station_ids)} stations traitées")
+
+    elapsed = perf_counter() - start
+
+    # Garder l'ordre d'origine et retirer les bouées avec des DataFrames vides ou None
+    buoy_datas = {buoy_id: collected[buoy_id] for buoy_id in station_ids
+                  if collected.get(buoy_id)
+                  and collected[buoy_id].get("Marine") is not None and not collected[buoy_id]["Marine"].empty
+                  and collected[buoy_id].get("Meteo") is not None and not collected[buoy_id]["Meteo"].empty}
+
+    timings_df = pd.DataFrame(timings, columns=["Station ID", "status", "metadata_s", "marine_s",
+                                                "meteo_s", "total_s", "error"])
+
+    print("\n\n📝 Résumé final :")
+    print(f"📊 Bouées avec des données valides : {len(buoy_datas)}/{len(station_ids)}")
+    if watermarks:
+        print(f"🔖 Bouées déjà à jour : {(timings_df['status'] == 'up_to_date').sum()}")
+    print(f"⏱️ Durée totale : {elapsed:.1f}s — médiane par station : {timings_df['total_s'].median():.2f}s")
+
+    return buoy_datas, timings_df
@@ -0,0 +1,142 @@
+from imports import *
+from sqlalchemy.engine import make_url
+from sqlalchemy.pool import QueuePool
+from threading import Lock
+
+# ==============================
+# Configuration par défaut
+# ==============================
+MYSQL_CREDS_PATH = r"c:\Credentials\mysql_creds.json"
+MYSQL_DRIVER = "mysql+mysqlconnector"          # mysql-connector-python (requirements.txt)
+
+DB_STAGING = 'db_staging'
+DB_DW = 'oceanography_data_analysis'
+
+# Pool de connexions, un par base
+DB_POOL_SIZE = 5
+DB_MAX_OVERFLOW = 10
+DB_POOL_RECYCLE = 3600                          # s, sous le wait_timeout MySQL
+DB_POOL_PRE_PING = True
+
+# URL de remplacement par base, ex: DB_URL_DB_STAGING=sqlite:///staging.db pour un run local
+DB_URL_ENV = "DB_URL_{name}"
+
+
+class EngineRegistry:
+    """
+    Un engine SQLAlchemy (et donc un pool de connexions) par base, créé au premier
+    `get` puis réutilisé. Aucune connexion n'est ouverte avant la première requête, et les
+    identifiants MySQL ne sont lus que si aucune URL de remplacement n'est fournie.
+
+    Args:
+    - urls (dict): {nom de base: URL SQLAlchemy} (prioritaire sur les variables DB_URL_<NOM>).
+    - pool_size, max_overflow, pool_recycle, pool_pre_ping: Réglages du pool (bases hors SQLite).
+    - creds_path (str): Fichier JSON des identifiants MySQL.
+    - connect_args (dict): Options du driver (ex: {'allow_local_infile': True} pour `loader.bulk_load`).
+    """
+
+    def __init__(self, urls=None, pool_size=DB_POOL_SIZE, max_overflow=DB_MAX_OVERFLOW,
+                 pool_recycle=DB_POOL_RECYCLE, pool_pre_ping=DB_POOL_PRE_PING,
+                 creds_path=MYSQL_CREDS_PATH, connect_args=None):
+        self.urls = dict(urls or {})
+        self.pool_options = {"pool_size": pool_size, "max_overflow": max_overflow,
+                             "pool_recycle": pool_recycle, "pool_pre_ping": pool_pre_ping}
+        self.creds_path = creds_path
+        self.connect_args = dict(connect_args or {})
+        self._credentials = None
+        self._engines = {}
+        self._lock = Lock()
+
+    def _read_credentials(self):
+        if self._credentials is None:
+            with open(self.creds_path, 'r') as file:
+                self._credentials = json.load(file)
+        return self._credentials
+
+    def url_for(self, db_name):
+        """
+        URL de la base : URL fournie, sinon variable d'environnement, sinon MySQL avec les identifiants.
+        """
+        url = self.urls.get(db_name) or os.environ.get(DB_URL_ENV.format(name=db_name.upper()))
+        if url:
+            return make_url(url)
+
+        content = self._read_credentials()
+        return make_url(f"{MYSQL_DRIVER}://{content['user']}:{content['password']}"
+                        f"@{content['host']}:{content['port']}/{db_name}")
+
+    def get(self, db_name):
+        """
+        Engine partagé de la base `db_name`, créé au premier appel.
+        """
+        with self._lock:
+            engine = self._engines.get(db_name)
+            if engine is None:
+                url = self.url_for(db_name)
+                # SQLite gère son propre pool (fichier local ou mémoire) : pas de réglages de taille
+                options = {} if url.get_backend_name() == "sqlite" else dict(self.pool_options)
+                engine = create_engine(url, connect_args=self.connect_args, **options)
+                self._engines[db_name] = engine
+            return engine
+
+    def stats(self):
+        """
+        État des pools : connexions ouvertes, prêtées, en débordement.
+        """
+        stats = {}
+        for db_name, engine in self._engines.items():
+            pool = engine.pool
+            stats[db_name] = {"url": engine.url.render_as_string(hide_password=True),
+                              "pool": type(pool).__name__, "status": pool.status()}
+            if isinstance(pool, QueuePool):
+                stats[db_name].update(size=pool.size(), checked_in=pool.checkedin(),
+                                      checked_out=pool.checkedout(), overflow=pool.overflow())
+        return stats
+
+    def dispose(self, db_name=None):
+        """
+        Ferme les connexions du pool de `db_name` (ou de toutes les bases) et oublie l'engine.
+        """
+        with self._lock:
+            names = [db_name] if db_name is not None else list(self._engines)
+            for name in names:
+                engine = self._engines.pop(name, None)
+                if engine is not None:
+                    engine.dispose()
+
+
+_engine_registry = None
+_engine_registry_lock = Lock()
+
+
+def configure_engines(**kwargs):
+    """
+    (Re)crée le registre partagé avec une configuration spécifique, après fermeture
+    des pools existants (ex: `configure_engines(urls={'db_staging': 'sqlite:///staging.db'})`).
+    """
+    global _engine_registry
+    with _engine_registry_lock:
+        if _engine_registry is not None:
+            _engine_registry.dispose()
+        _engine_registry = EngineRegistry(**kwargs)
+    return _engine_registry
+
+
+def get_engine_registry():
+    global _engine_registry
+    with _engine_registry_lock:
+        if _engine_registry is None:
+            _engine_registry = EngineRegistry()
+    return _engine_registry
+
+
+def get_engine(db_name):
+    return get_engine_registry().get(db_name)
+
+
+def get_engine_stats():
+    return get_engine_registry().stats()
+
+
+def dispose_engines(db_name=None):
+    get_engine_registry().dispose(db_name)
@@ -1,16 +1,31 @@
 from imports import *
-
-def convert_df_columns(df):
+from http_client import get_openmeteo_client
+from functools import lru_cache
+from keys import encode_keys
+from calendar_dim import day_period_of_hours
+from imputation import Imputer, CLEANING_POLICIES, plan_null_policies, apply_null_plan, null_plan_report
+from time import perf_counter
+from schemas import apply_schema, infer_table_types, legacy_sql_type
+from sqlalchemy import Enum as SqlEnum
+from loader import load_dataframe, LOAD_BATCH_ROWS
+from indexes import table_keys, STAGING_PRIMARY_KEY, STAGING_INDEXES
+from engines import get_engine
+
+def convert_df_columns(df, schema=None):
     """
     Convertit chaque colonne en son type approprié sans modifier les données
     ou introduire des NaN.
     
     Args:
     - df: pd.DataFrame. Le DataFrame à traiter.
+    - schema: Optionnel, schéma déclaratif ('marine', 'meteo' ou dict, voir schemas.py) :
+      conversion directe en float32 / petits entiers / catégories, sans deviner les types.
     
     Returns:
     - pd.DataFrame: Le DataFrame avec les types de données convertis.
     """
+    if schema is not None:
+        return apply_schema(df, schema)
     
     # Traitement des colonnes avec les types appropriés
     for col in df.columns:
@@ -69,6 +84,45 @@ def fetch_table_data(engine, table_name: str) -> pd.DataFrame:
         print(f"❌ Erreur lors de la récupération de '{table_name}' : {e}")
         return pd.DataFrame()  # Retourne une DataFrame vide en cas d'erreur
 
+def get_station_watermarks(engine, table_names, station_column='Station ID', datetime_column='Datetime'):
+    """
+    Récupère le dernier Datetime chargé (high-water mark) pour chaque station.
+
+    Params:
+        engine: SQLAlchemy engine de la base de staging.
+        table_names (str | list): Une table ou plusieurs (ex: cleaned_marine_data et cleaned_meteo_data).
+            Avec plusieurs tables, on garde le minimum par station, et seules les stations
+            présentes dans toutes les tables ont un watermark.
+
+    Returns:
+        dict: {station_id: datetime}. Une station absente doit être collectée en entier.
+    """
+    if isinstance(table_names, str):
+        table_names = [table_names]
+
+    watermarks = None
+    for table_name in table_names:
+        if not check_table_exists(table_name=table_name, engine=engine):
+            print(f"⚠️ La table '{table_name}' n'existe pas : collecte complète.")
+            return {}
+
+        query = text(
+            f"SELECT `{station_column}`, MAX(`{datetime_column}`) FROM `{table_name}` GROUP BY `{station_column}`;"
+        )
+        with engine.connect() as connection:
+            table_watermarks = {str(station_id): max_dt for station_id, max_dt in connection.execute(query) if max_dt is not None}
+
+        if watermarks is None:
+            watermarks = table_watermarks
+        else:
+            watermarks = {
+                station_id: min(watermarks[station_id], max_dt)
+                for station_id, max_dt in table_watermarks.items() if station_id in watermarks
+            }
+
+    print(f"🔖 Watermarks récupérés pour {len(watermarks or {})} stations.")
+    return watermarks or {}
+
 def show_null_counts(df):
     row_count = df.shape[0]
     null_counts = df.isnull().sum()
@@ -114,199 +168,283 @@ def convert_to_datetime(date_value):
         # Si la conversion échoue, on retourne la valeur d'origine (sans la modifier)
         return date_value  # Retourne la valeur d'origine sans la modifier
 
-def handle_null_values(df):
-    # Calcul du nombre de lignes du DataFrame
-    num_rows = len(df)
-
-    # Attribution du tag et seuil en fonction du nombre de lignes
-    if num_rows > 100000:
-        tag = 'green'  # Vert pour les DataFrames de plus de 100 000 lignes
-        threshold = 70  # Plus souple pour les DataFrames verts (jusqu'à 70% de données manquantes)
-    elif 10000 < num_rows <= 100000:
-        tag = 'yellow'  # Jaune pour les DataFrames entre 10 000 et 100 000 lignes
-        threshold = 60  # Seuil intermédiaire pour les DataFrames jaunes (jusqu'à 60% de données manquantes)
-    elif 2000 < num_rows <= 10000:
-        tag = 'orange'  # Orange pour les DataFrames entre 2 000 et 10 000 lignes
-        threshold = 55  # Seuil modéré pour les DataFrames entre 2K et 10K (jusqu'à 55% de données manquantes)
-    else:
-        tag = 'red'  # Rouge pour les DataFrames de moins de 2 000 lignes
-        threshold = 50  # Plus strict pour les DataFrames rouges (jusqu'à 50% de données manquantes)
+def handle_null_values(df, return_report=False, verbose=False):
+    """
+    Supprime les colonnes trop incomplètes et impute les autres (médiane pour les
+    colonnes numériques, mode sinon). Le seuil de suppression dépend du nombre de
+    lignes (voir `imputation.NULL_THRESHOLDS`). Le profil est calculé une seule fois
+    et toutes les décisions sont appliquées en une opération.
 
-    print(f"\nTag: {tag} - Nombre de lignes: {num_rows}")
+    Args:
+    - df (pd.DataFrame): DataFrame à traiter (non modifié).
+    - return_report (bool): Renvoie aussi le rapport (pourcentages, politique par colonne, durée).
+    - verbose (bool): Affiche un résumé.
 
-    # Calcul du pourcentage de valeurs manquantes par colonne
-    missing_percent = (df.isnull().sum() / len(df)) * 100
+    Returns:
+    - pd.DataFrame, ou (pd.DataFrame, dict) si `return_report`.
+    """
+    start = perf_counter()
+    plan = plan_null_policies(df)
+    df = apply_null_plan(df, plan)
+    report = null_plan_report(plan, elapsed_s=perf_counter() - start)
 
-    # Gestion des valeurs manquantes en fonction du tag
-    for column in df.columns:
-        null_percentage = missing_percent[column]  # Calcul du pourcentage de valeurs manquantes
+    if verbose:
+        policies = plan["policy"].value_counts()
+        print(f"\nTag: {report['tag']} - Nombre de lignes: {report['rows']} | "
+              f"Supprimées : {policies.get('drop', 0)}, Imputées : {policies.get('median', 0) + policies.get('mode', 0)}, "
+              f"Intactes : {policies.get('keep', 0)}")
+
+    return (df, report) if return_report else df
+
+# ==============================
+# Open-Meteo
+# ==============================
+OPENMETEO_URL = "https://api.open-meteo.com/v1/forecast"
+
+OPENMETEO_HOURLY_VARIABLES = [
+    "temperature_2m", "relative_humidity_2m", "dew_point_2m", "precipitation", "rain", "showers", 
+    "pressure_msl", "surface_pressure", "cloud_cover", "cloud_cover_low", "cloud_cover_mid", 
+    "cloud_cover_high", "visibility", "wind_speed_10m", "soil_temperature_0cm", "soil_moisture_0_to_1cm", 
+    "is_day"
+]
+
+OPENMETEO_DAILY_VARIABLES = [
+    "temperature_2m_max", "temperature_2m_min", "apparent_temperature_max", "apparent_temperature_min", 
+    "sunrise", "sunset", "daylight_duration", "sunshine_duration", "uv_index_max", "uv_index_clear_sky_max", 
+    "precipitation_sum", "rain_sum", "showers_sum", "precipitation_hours", "precipitation_probability_max", 
+    "wind_speed_10m_max", "wind_gusts_10m_max", "wind_direction_10m_dominant", "shortwave_radiation_sum"
+]
+
+# Registre des blocs Open-Meteo : accesseur de la réponse et variables demandées (dans l'ordre)
+OPENMETEO_REGISTRY = {
+    "hourly": {"block": "Hourly", "variables": OPENMETEO_HOURLY_VARIABLES},
+    "daily": {"block": "Daily", "variables": OPENMETEO_DAILY_VARIABLES},
+}
+
+# Variables renvoyées en secondes epoch (int64) plutôt qu'en float
+OPENMETEO_EPOCH_VARIABLES = {"sunrise", "sunset"}
+OPENMETEO_DECIMALS = 2
+
+# Limites d'un appel multi-lieux : nombre de coordonnées et longueur maximale de l'URL
+OPENMETEO_MAX_LOCATIONS = 100
+OPENMETEO_MAX_URL_LENGTH = 8000
+
+# Coordonnée avec ou sans suffixe de direction (ex: '45.5W', '-45.5', '14.51 n')
+COORDINATE_PATTERN = r"^\s*([-+]?\d+(?:\.\d+)?)\s*([NSEWnsew]?)\s*$"
+COORDINATE_DECIMALS = 2
+
+# Fonction utilitaire pour convertir les coordonnées avec ou sans suffixe (ex: '45.5W', '-45.5')
+@lru_cache(maxsize=4096)
+def _parse_coordinate_text(text):
+    match = re.match(COORDINATE_PATTERN, text)
+    if not match:
+        return None
+    value = float(match.group(1))
+    # Sud et Ouest sont négatifs
+    return -abs(value) if match.group(2).upper() in ("S", "W") else value
+
+def parse_coordinates(coord):
+    value = _parse_coordinate_text(str(coord))
+    if value is None:
+        raise ValueError(f"Coordonnée invalide : {coord}")
+    return value
 
-        if null_percentage == 0:
-            print(f"Colonne '{column}' non modifiée (0% de valeurs manquantes)")
-            continue  # Skip this column if there are no missing values
+def parse_coordinate_series(series, decimals=COORDINATE_DECIMALS):
+    """
+    Version vectorisée de `parse_coordinates` pour une colonne entière : les valeurs
+    distinctes (quelques positions de stations) sont parsées une seule fois avec
+    `str.extract`, puis redistribuées sur toutes les lignes.
 
-        if null_percentage > threshold:  # Si + de X% de valeurs manquantes (dépend du tag)
-            df = df.drop(columns=[column]) 
-            print(f"Colonne '{column}' Supprimée (plus de {threshold}% de valeurs manquantes)")
+    Args:
+    - series (pd.Series): Coordonnées ('14.51N', '-75.15', 14.51, ...).
+    - decimals (int | None): Arrondi appliqué (None pour garder la valeur brute).
 
-        else:  # Si moins de X% de valeurs manquantes
-            if pd.api.types.is_numeric_dtype(df[column]):
-                median_value = df[column].median()
-                df[column] = df[column].fillna(median_value)  # Imputation par la médiane pour les colonnes numériques
-                print(f"Colonne '{column}' Imputée par la médiane ({round(null_percentage,2)}% de valeurs manquantes)")
+    Returns:
+    - pd.Series: float64, NaN pour les valeurs invalides.
+    """
+    codes, uniques = pd.factorize(series)
+    parts = pd.Series(uniques, dtype="object").astype(str).str.extract(COORDINATE_PATTERN)
 
-            else:
-                mode_value = df[column].mode()[0]  # Imputation par le mode pour les colonnes non numériques
-                df[column] = df[column].fillna(mode_value)
-                print(f"Colonne '{column}' Imputée par le mode ({round(null_percentage,2)}% de valeurs manquantes)")
+    values = pd.to_numeric(parts[0], errors="coerce").to_numpy()
+    negative = parts[1].str.upper().isin(["S", "W"]).to_numpy()
+    values = np.where(negative, -np.abs(values), values)
+    if decimals is not None:
+        values = np.round(values, decimals)
+
+    # code -1 = valeur manquante
+    parsed = np.append(values, np.nan)[codes]
+    return pd.Series(parsed, index=series.index, name=series.name, dtype="float64")
 
+def convert_coordinate_columns(df, lat_column='Lat', lon_column='Lon', decimals=COORDINATE_DECIMALS):
+    """
+    Remplace `df.apply(lambda row: pd.Series(convert_coordinates(row['Lat'], row['Lon'])), axis=1)` :
+    renvoie une copie du DataFrame avec les colonnes de coordonnées en float décimaux.
+    """
+    df = df.copy()
+    df[lat_column] = parse_coordinate_series(df[lat_column], decimals)
+    df[lon_column] = parse_coordinate_series(df[lon_column], decimals)
     return df
 
-def meteo_api_request(coordinates, mode='historical', days=92, interval='hourly'):
+def _comma_join(values):
+    return ",".join(str(value) for value in values) if isinstance(values, (list, tuple)) else values
 
+def build_openmeteo_params(latitude, longitude, mode='historical', days=92, interval='hourly', since=None):
+    """
+    Construit les paramètres d'un appel Open-Meteo. `latitude` et `longitude` peuvent
+    être des valeurs uniques ou des listes (un résultat par lieu).
+    Si `since` est fourni (mode historique), seule la période [since, aujourd'hui] est demandée
+    via `start_date`/`end_date`, dans la limite de `days` jours.
+    """
+    interval = interval.lower()
+    params = {
+        # Listes en valeurs séparées par des virgules (une clé répétée par valeur doublerait l'URL)
+        "latitude": _comma_join(latitude),
+        "longitude": _comma_join(longitude),
+        "past_days": days if mode == 'historical' else None,  # Si historique, utiliser 'past_days'
+        "forecast_days": days if mode == 'forecast' else None,  # Si forecast, utiliser 'forecast_days'
+        interval: _comma_join(OPENMETEO_REGISTRY[interval]["variables"])
+    }
 
-    # Fonction utilitaire pour convertir les coordonnées avec ou sans suffixe (ex: '45.5W', '-45.5')
-    def parse_coordinates(coord):
-        # Vérifie si la coordonnée a un suffixe de direction (W, E, N, S)
-        pattern = r"^([-+]?\d+(\.\d+)?)([NSEW]?)$"
-        match = re.match(pattern, str(coord))
-        if match:
-            value = float(match.group(1))
-            direction = match.group(3)
-            
-            if direction == 'W' or direction == 'S':
-                value = -abs(value) 
-                
-            return value
-        else:
-            raise ValueError(f"Coordonnée invalide : {coord}")
+    if since is not None and mode == 'historical':
+        today = datetime.now(timezone.utc).date()
+        start = max(pd.Timestamp(since).date(), today - timedelta(days=days))
+        params.pop("past_days")
+        params.pop("forecast_days")
+        params["start_date"] = start.isoformat()
+        params["end_date"] = today.isoformat()
+
+    return params
+
+def meteo_api_request(coordinates, mode='historical', days=92, interval='hourly', float32=False, since=None):
 
     # Convertir les coordonnées
     latitude = parse_coordinates(coordinates[0])
     longitude = parse_coordinates(coordinates[1])
 
-    # Setup de l'API client avec retry et cache
-    cache_session = requests_cache.CachedSession('.cache', expire_after=3600)
-    openmeteo = openmeteo_requests.Client(session=cache_session)
+    # Client partagé (pool de connexions, retry et cache)
+    openmeteo = get_openmeteo_client()
 
-    url = "https://api.open-meteo.com/v1/forecast"
-    
     # Paramètres de base
-    params = {
-        "latitude": latitude,
-        "longitude": longitude,
-        "past_days": days if mode == 'historical' else None,  # Si historique, utiliser 'past_days'
-        "forecast_days": days if mode == 'forecast' else None,  # Si forecast, utiliser 'forecast_days'
-        "hourly" if interval.lower() == 'hourly' else "daily": [
-            "temperature_2m", "relative_humidity_2m", "dew_point_2m", "precipitation", "rain", "showers", 
-            "pressure_msl", "surface_pressure", "cloud_cover", "cloud_cover_low", "cloud_cover_mid", 
-            "cloud_cover_high", "visibility", "wind_speed_10m", "soil_temperature_0cm", "soil_moisture_0_to_1cm", 
-            "is_day"
-        ]
-    }
+    params = build_openmeteo_params(latitude, longitude, mode=mode, days=days, interval=interval, since=since)
 
     # Faire l'appel API
-    responses = openmeteo.weather_api(url, params=params)
+    responses = openmeteo.weather_api(OPENMETEO_URL, params=params)
 
     # Traiter la réponse pour le premier emplacement
     response = responses[0]  # On prend la première réponse si plusieurs lieux sont fournis
 
-    # Initialisation du dictionnaire pour les données à retourner
-    data = {}
-
-    # Processus des données en fonction du mode sélectionné
-    if mode == 'historical':
-        # Traitement pour données historiques
-        if interval == 'hourly':
-            hourly = response.Hourly()
-            hourly_data = {
-                "date": pd.date_range(
-                    start=pd.to_datetime(hourly.Time(), unit="s", utc=True),
-                    end=pd.to_datetime(hourly.TimeEnd(), unit="s", utc=True),
-                    freq=pd.Timedelta(seconds=hourly.Interval()),
-                    inclusive="left"
-                )
-            }
-            hourly_variables = [
-                "temperature_2m", "relative_humidity_2m", "dew_point_2m", "precipitation", "rain", "showers", 
-                "pressure_msl", "surface_pressure", "cloud_cover", "cloud_cover_low", "cloud_cover_mid", 
-                "cloud_cover_high", "visibility", "wind_speed_10m", "soil_temperature_0cm", "soil_moisture_0_to_1cm", 
-                "is_day"
-            ]
-            
-            for i, var in enumerate(hourly_variables):
-                hourly_data[var] = [round(value, 2) for value in hourly.Variables(i).ValuesAsNumpy()]
-
-            return pd.DataFrame(hourly_data)
-
-        elif interval == 'daily':
-            daily = response.Daily()
-            daily_data = {
-                "date": pd.date_range(
-                    start=pd.to_datetime(daily.Time(), unit="s", utc=True),
-                    end=pd.to_datetime(daily.TimeEnd(), unit="s", utc=True),
-                    freq=pd.Timedelta(seconds=daily.Interval()),
-                    inclusive="left"
-                )
-            }
-            daily_variables = [
-                "temperature_2m_max", "temperature_2m_min", "apparent_temperature_max", "apparent_temperature_min", 
-                "sunrise", "sunset", "daylight_duration", "sunshine_duration", "uv_index_max", "uv_index_clear_sky_max", 
-                "precipitation_sum", "rain_sum", "showers_sum", "precipitation_hours", "precipitation_probability_max", 
-                "wind_speed_10m_max", "wind_gusts_10m_max", "wind_direction_10m_dominant", "shortwave_radiation_sum"
-            ]
-            
-            for i, var in enumerate(daily_variables):
-                daily_data[var] = [round(value, 2) for value in daily.Variables(i).ValuesAsNumpy()]
-
-            return pd.DataFrame(daily_data)
-
-    # If Forecast is chosen
-    elif mode == 'forecast':
-        # Traitement pour prévisions
-        if interval == 'hourly':
-            hourly = response.Hourly()
-            hourly_data = {
-                "date": pd.date_range(
-                    start=pd.to_datetime(hourly.Time(), unit="s", utc=True),
-                    end=pd.to_datetime(hourly.TimeEnd(), unit="s", utc=True),
-                    freq=pd.Timedelta(seconds=hourly.Interval()),
-                    inclusive="left"
-                )
-            }
-            hourly_variables = [
-                "temperature_2m", "relative_humidity_2m", "dew_point_2m", "precipitation", "rain", "showers", 
-                "pressure_msl", "surface_pressure", "cloud_cover", "cloud_cover_low", "cloud_cover_mid", 
-                "cloud_cover_high", "visibility", "wind_speed_10m", "soil_temperature_0cm", "soil_moisture_0_to_1cm", 
-                "is_day"
-            ]
-            
-            for i, var in enumerate(hourly_variables):
-                hourly_data[var] = [round(value, 2) for value in hourly.Variables(i).ValuesAsNumpy()]
-
-            return pd.DataFrame(hourly_data)
-
-        elif interval == 'daily':
-            daily = response.Daily()
-            daily_data = {
-                "date": pd.date_range(
-                    start=pd.to_datetime(daily.Time(), unit="s", utc=True),
-                    end=pd.to_datetime(daily.TimeEnd(), unit="s", utc=True),
-                    freq=pd.Timedelta(seconds=daily.Interval()),
-                    inclusive="left"
-                )
-            }
-            daily_variables = [
-                "temperature_2m_max", "temperature_2m_min", "apparent_temperature_max", "apparent_temperature_min", 
-                "sunrise", "sunset", "daylight_duration", "sunshine_duration", "uv_index_max", "uv_index_clear_sky_max", 
-                "precipitation_sum", "rain_sum", "showers_sum", "precipitation_hours", "precipitation_probability_max", 
-                "wind_speed_10m_max", "wind_gusts_10m_max", "wind_direction_10m_dominant", "shortwave_radiation_sum"
-            ]
-            
-            for i, var in enumerate(daily_variables):
-                daily_data[var] = [round(value, 2) for value in daily.Variables(i).ValuesAsNumpy()]
+    # Même décodage pour l'historique et les prévisions, seul l'intervalle change
+    df = decode_openmeteo_response(response, interval=interval, float32=float32)
+
+    # Ne garder que les lignes postérieures au dernier chargement
+    if since is not None:
+        since = pd.Timestamp(since)
+        since = since.tz_localize("UTC") if since.tzinfo is None else since.tz_convert("UTC")
+        df = df[df["date"] > since].reset_index(drop=True)
+
+    return df
+
+def chunk_openmeteo_coordinates(coordinates, max_locations=OPENMETEO_MAX_LOCATIONS, max_url_length=OPENMETEO_MAX_URL_LENGTH,
+                                interval='hourly'):
+    """
+    Découpe une liste de (station_id, latitude, longitude) en paquets respectant
+    la limite de lieux par appel et la longueur maximale de l'URL.
+    `interval` ('hourly' ou 'daily') détermine les variables demandées, donc la longueur fixe de l'URL.
+    """
+    # Longueur de l'URL encodée sans les coordonnées (variables demandées + options), avec une
+    # marge pour start_date/end_date
+    params = build_openmeteo_params([], [], interval=interval)
+    base_length = len(requests.Request("GET", OPENMETEO_URL, params=params).prepare().url) + 100
+
+    chunk, chunk_length = [], base_length
+    for station_id, latitude, longitude in coordinates:
+        # Chaque lieu ajoute "lat," dans latitude et "lon," dans longitude (virgule encodée en %2C)
+        coord_length = len(quote_plus(f"{latitude},")) + len(quote_plus(f"{longitude},"))
+        if chunk and (len(chunk) >= max_locations or chunk_length + coord_length > max_url_length):
+            yield chunk
+            chunk, chunk_length = [], base_length
+        chunk.append((station_id, latitude, longitude))
+        chunk_length += coord_length
+
+    if chunk:
+        yield chunk
+
+def decode_openmeteo_response(response, interval='hourly', float32=False):
+    """
+    Convertit une réponse Open-Meteo (un seul lieu) en DataFrame à partir du registre
+    `OPENMETEO_REGISTRY`. Les valeurs restent des tableaux NumPy, arrondis de façon vectorisée.
+
+    Args:
+    - response: Réponse Open-Meteo (WeatherApiResponse).
+    - interval (str): 'hourly' ou 'daily'.
+    - float32 (bool): Garde les colonnes en float32 (format natif de l'API) au lieu de float64.
+
+    Returns:
+    - pd.DataFrame: Une colonne 'date' (UTC) + une colonne par variable.
+    """
+    interval = interval.lower()
+    spec = OPENMETEO_REGISTRY[interval]
+    block = getattr(response, spec["block"])()
+
+    data = {
+        "date": pd.date_range(
+            start=pd.to_datetime(block.Time(), unit="s", utc=True),
+            end=pd.to_datetime(block.TimeEnd(), unit="s", utc=True),
+            freq=pd.Timedelta(seconds=block.Interval()),
+            inclusive="left"
+        )
+    }
+
+    dtype = np.float32 if float32 else np.float64
+    for i, var in enumerate(spec["variables"]):
+        variable = block.Variables(i)
+        if var in OPENMETEO_EPOCH_VARIABLES:
+            data[var] = pd.to_datetime(variable.ValuesInt64AsNumpy(), unit="s", utc=True)
+        else:
+            data[var] = np.round(variable.ValuesAsNumpy().astype(dtype, copy=False), OPENMETEO_DECIMALS)
+
+    return pd.DataFrame(data, copy=False)
+
+def meteo_api_request_batch(stations, mode='historical', days=92, interval='hourly', float32=False,
+                            max_locations=OPENMETEO_MAX_LOCATIONS, max_url_length=OPENMETEO_MAX_URL_LENGTH):
+    """
+    Variante multi-lieux de `meteo_api_request` : un seul appel HTTP par paquet de stations
+    au lieu d'un appel par bouée.
+
+    Args:
+    - stations (dict): {station_id: (lat, lon)}, coordonnées avec ou sans suffixe (ex: '45.5W').
+    - mode, days, interval, float32: Identiques à `meteo_api_request`.
+    - max_locations (int): Nombre maximal de lieux par appel.
+    - max_url_length (int): Longueur maximale de l'URL générée.
+
+    Returns:
+    - pd.DataFrame: Format long, une colonne 'Station ID' + 'date' + les variables météo.
+    """
+    coordinates = [
+        (station_id, parse_coordinates(lat), parse_coordinates(lon))
+        for station_id, (lat, lon) in stations.items()
+    ]
+
+    openmeteo = get_openmeteo_client()
+
+    frames = []
+    for chunk in chunk_openmeteo_coordinates(coordinates, max_locations, max_url_length, interval=interval):
+        station_ids, latitudes, longitudes = zip(*chunk)
+        params = build_openmeteo_params(list(latitudes), list(longitudes), mode=mode, days=days, interval=interval)
 
-            return pd.DataFrame(daily_data)
+        # Open-Meteo renvoie une réponse par lieu, dans l'ordre des coordonnées
+        responses = openmeteo.weather_api(OPENMETEO_URL, params=params)
+        print(f"⛅ {len(responses)} lieux récupérés en un appel")
+
+        for station_id, response in zip(station_ids, responses):
+            df = decode_openmeteo_response(response, interval=interval, float32=float32)
+            df.insert(0, "Station ID", str(station_id))
+            frames.append(df)
+
+    if not frames:
+        return pd.DataFrame()
+
+    return pd.concat(frames, ignore_index=True)
 
 def get_station_metadata(station_id):
     return api.station(station_id=station_id)
@@ -389,19 +527,9 @@ def extract_lat_lon_from_station_list(location):
     lon_match = re.search(r'([+-]?\d+\.\d+|\d+)([EW])', location)
     
     if lat_match and lon_match:
-        # Extraction des valeurs
-        lat = float(lat_match.group(1))
-        lon = float(lon_match.group(1))
-        
-        # Inverser la direction de la latitude et longitude si nécessaire
-        if lat_match.group(2) == 'S':  # Si la latitude est au Sud
-            lat = -lat
-        if lon_match.group(2) == 'W':  # Si la longitude est à l'Ouest
-            lon = -lon
-        
-        lat = round(lat, 2)
-        lon = round(lon, 2)
-        return lat, lon
+        lat = parse_coordinates(lat_match.group(0))
+        lon = parse_coordinates(lon_match.group(0))
+        return round(lat, COORDINATE_DECIMALS), round(lon, COORDINATE_DECIMALS)
     return None, None
 
 def print_with_flush(message):
@@ -422,17 +550,10 @@ def clean_numeric(value):
     return re.sub(r"[^\d.]", "", value).strip()  # Supprime tout sauf chiffres et "."
 
 def convert_coordinates(lat, lon):
-    # Conversion de la latitude
-    lat_value = float(lat[:-1])  # On enlève la lettre 'n' ou 's' et on garde la valeur numérique
-    if lon[-1].lower() == 's':  # Si la latitude est dans l'hémisphère sud
-        lat_value = -lat_value
-
-    # Conversion de la longitude
-    lon_value = float(lon[:-1])  # On enlève la lettre 'e' ou 'w' et on garde la valeur numérique
-    if lon[-1].lower() == 'w':  # Si la longitude est dans l'hémisphère ouest
-        lon_value = -lon_value
-
-    return round(lat_value, 2), round(lon_value, 2)
+    # '14.51N', '75.15W' → (14.51, -75.15), même règle que `parse_coordinates`
+    lat_value = parse_coordinates(lat)
+    lon_value = parse_coordinates(lon)
+    return round(lat_value, COORDINATE_DECIMALS), round(lon_value, COORDINATE_DECIMALS)
 
 def count_files_in_directory(output_dir):
     try:
@@ -475,29 +596,93 @@ def count_files_in_directory(output_dir):
     except Exception as e:
         print(f"Erreur dans la fonction count_files_in_directory: {e}")
 
-def process_datetime_column(df, column):
-    # Convertir la colonne en chaîne de caractères au tout début
-    df[column] = df[column].astype(str)
-    print(f"📌 La colonne '{column}' est maintenant convertie en chaîne de caractères.")
+# Formats texte reconnus par `normalize_datetimes` (testés dans cet ordre sur un échantillon)
+# Dates avec '/' : mois en premier comme `pd.to_datetime` ('03/04/2025' = 4 mars) ; le format
+# jour/mois n'est retenu que si le mois/jour échoue sur l'échantillon (ex: '25/04/2025')
+DATETIME_FORMATS = ["ISO8601", "%Y-%m-%d %H:%M:%S%z", "%Y-%m-%d-%H", "%Y%m%d%H", "%Y%m%d%H%M",
+                    "%m/%d/%Y %H:%M", "%d/%m/%Y %H:%M"]
+DATETIME_SAMPLE_SIZE = 100
+DATETIME_MIN_MATCH = 0.9  # Part minimale de l'échantillon qu'un format doit convertir
+
+# Unité d'un epoch selon son ordre de grandeur (valeur absolue maximale)
+EPOCH_UNITS = [(1e11, "s"), (1e14, "ms"), (1e17, "us"), (np.inf, "ns")]
+
+def _detect_datetime_format(values, formats):
+    sample = values.dropna().head(DATETIME_SAMPLE_SIZE)
+    if sample.empty:
+        return None
+    for fmt in formats:
+        parsed = pd.to_datetime(sample, format=fmt, errors="coerce", utc=True)
+        if parsed.notna().mean() >= DATETIME_MIN_MATCH:
+            return fmt
+    return None
+
+def normalize_datetimes(values, formats=DATETIME_FORMATS):
+    """
+    Convertit une colonne de dates en datetime64 UTC naïf arrondi à l'heure inférieure,
+    en choisissant le chemin selon le type reçu :
+    - datetime64 (avec ou sans fuseau) : aucune conversion texte ;
+    - nombres : epoch (unité s/ms/us/ns déduite de l'ordre de grandeur) ;
+    - texte : premier format de `formats` valide sur un échantillon, sinon inférence pandas.
 
-    # Essayer de convertir la colonne en datetime en forçant la conversion avec errors='coerce'
-    try:
-        df[column] = pd.to_datetime(df[column], errors='coerce', utc=True)
-        print(f"📌 Conversion réussie de '{column}' en datetime.")
+    Returns:
+    - tuple: (pd.Series datetime64[ns], rapport {"path", "format", "rows", "failed", "failed_index"})
+    """
+    values = pd.Series(values)
+    report = {"path": None, "format": None, "rows": len(values), "failed": 0, "failed_index": []}
+
+    if pd.api.types.is_datetime64_any_dtype(values):
+        report["path"] = "datetime"
+        parsed = values
+    elif pd.api.types.is_numeric_dtype(values) and not pd.api.types.is_bool_dtype(values):
+        magnitude = np.nanmax(np.abs(values.to_numpy(dtype="float64"))) if values.notna().any() else 0
+        unit = next(unit for limit, unit in EPOCH_UNITS if magnitude < limit)
+        report.update(path="epoch", format=unit)
+        parsed = pd.to_datetime(values, unit=unit, errors="coerce", utc=True)
+    else:
+        fmt = _detect_datetime_format(values.astype("string"), formats)
+        report.update(path="format" if fmt else "inferred", format=fmt)
+        parsed = pd.to_datetime(values, format=fmt, errors="coerce", utc=True)
 
-        # Renommer la colonne AVANT d'appliquer floor()
-        df.rename(columns={column: 'Datetime'}, inplace=True)
-        print('✅ Successfully renamed column to "Datetime"!')
+    # UTC naïf + arrondi à l'heure en une opération sur les valeurs numpy
+    hours = parsed.to_numpy(dtype="datetime64[ns]").astype("datetime64[h]").astype("datetime64[ns]")
+    result = pd.Series(hours, index=values.index, name=values.name)
 
-        # Appliquer l'arrondi sur la nouvelle colonne renommée et supprimer le fuseau horaire
-        df['Datetime'] = df['Datetime'].dt.floor('H').dt.tz_localize(None)
-        
-    except Exception as e:
-        print(f"🚨 ERREUR lors de la conversion de '{column}' : {e}")
-    
-    return df  # Toujours retourner le DataFrame modifié
+    failed = result.isna() & values.notna()
+    report["failed"] = int(failed.sum())
+    report["failed_index"] = values.index[failed].tolist()
+    return result, report
+
+def process_datetime_column(df, column, formats=DATETIME_FORMATS, return_report=False):
+    """
+    Convertit `column` en datetime (voir `normalize_datetimes`), la renomme 'Datetime',
+    l'arrondit à l'heure et supprime le fuseau horaire.
 
-def clean_dataframe(df, cols_to_convert, verbose=False):
+    Returns:
+    - pd.DataFrame, ou (pd.DataFrame, dict) si `return_report` (lignes non converties incluses).
+    """
+    datetimes, report = normalize_datetimes(df[column], formats)
+    report["column"] = column
+
+    df[column] = datetimes
+    df.rename(columns={column: 'Datetime'}, inplace=True)
+
+    if report["failed"]:
+        print(f"⚠️ {report['failed']} valeurs de '{column}' n'ont pas pu être converties en datetime.")
+
+    return (df, report) if return_report else df
+
+def clean_dataframe(df, cols_to_convert, verbose=False, imputer=None):
+    """
+    Convertit les colonnes ciblées en float puis impute les valeurs manquantes en une passe
+    (médiane par défaut, moyenne pour la visibilité, 0 pour water_level_above_mean).
+
+    Args:
+    - df (pd.DataFrame): DataFrame à nettoyer (non modifié).
+    - cols_to_convert (list): Colonnes à convertir en numérique.
+    - imputer (Imputer): Optionnel, imputer déjà ajusté (ex: sur un premier lot) dont les
+      statistiques sont réutilisées, ou imputer configuré (groupes, politiques) à ajuster.
+    """
 
     # Faire une copie du DataFrame pour éviter les modifications sur une vue
     df = df.copy()
@@ -505,26 +690,15 @@ def clean_dataframe(df, cols_to_convert, verbose=False):
     # Supprimer les colonnes 100% vides
     df.dropna(axis=1, how="all", inplace=True)
 
-    # Conversion des colonnes en float
-    for col in cols_to_convert:
-        if col in df.columns:
-            df[col] = pd.to_numeric(df[col], errors="coerce")
-    
-            # Remplacement des NaN par des valeurs adaptées
-            df.fillna(df.median(numeric_only=True), inplace=True)
-
-    # Cas spécifiques : visibilité et températures
-    if "visibility" in df.columns:
-        df["visibility"].fillna(df["visibility"].mean(), inplace=True)
-
-    if "water_level_above_mean" in df.columns:
-        df["water_level_above_mean"].fillna(0, inplace=True)
+    # Conversion des colonnes en float, en une seule opération
+    cols = [col for col in cols_to_convert if col in df.columns]
+    if cols:
+        df[cols] = df[cols].apply(pd.to_numeric, errors="coerce")
 
-    if "air_temperature" in df.columns:
-        df["air_temperature"].fillna(df["air_temperature"].median(), inplace=True)
-
-    if "water_temperature" in df.columns:
-        df["water_temperature"].fillna(df["water_temperature"].median(), inplace=True)
+    # Remplacement des NaN par des valeurs adaptées
+    if imputer is None:
+        imputer = Imputer(policies=CLEANING_POLICIES)
+    df = imputer.transform(df) if imputer.statistics_ is not None else imputer.fit_transform(df)
 
     # Vérification finale
     if verbose:
@@ -588,48 +762,51 @@ def rename_columns(df, columns):
     
     return df
 
-def calculate_closer_probabilities(df, columns):
+def closer_matrix(df, columns):
     """
-    Calcule les probabilités que chaque colonne d'un DataFrame soit la plus proche des autres,
-    selon l'idée de la "wisdom of the crowd".
+    Pour chaque ligne, indique quelle(s) colonne(s) sont les plus proches des autres :
+    tenseur des distances deux à deux (lignes × k × k), somme des distances de chaque
+    colonne aux autres, puis minimum par ligne. Les lignes avec un NaN sont ignorées
+    et le DataFrame d'entrée n'est pas modifié.
 
     :param df: DataFrame contenant les données.
     :param columns: Liste des noms des colonnes à comparer entre elles.
-    :return: Dictionnaire des probabilités pour chaque colonne.
+    :return: DataFrame booléen (index des lignes complètes × columns), True pour la ou
+             les colonnes les plus proches (les égalités comptent pour chacune).
     """
-    
-    # Créer un dictionnaire pour stocker les résultats des distances
-    distances = {}
-    
-    # Calculer les distances entre chaque paire de colonnes
-    for i, col1 in enumerate(columns):
-        for j, col2 in enumerate(columns):
-            if i < j:  # Calculer les distances uniquement une fois pour chaque paire
-                dist_column = f'dist_{col1}_{col2}'
-                distances[dist_column] = np.abs(df[col1] - df[col2])
-    
-    # Ajouter les distances au DataFrame
-    for dist_column, values in distances.items():
-        df[dist_column] = values
-    
-    # Créer un dictionnaire pour stocker si une colonne est plus proche des autres
-    closer = {col: [] for col in columns}
-    
-    # Pour chaque ligne, déterminer quelle colonne est la plus proche des autres
-    for _, row in df.iterrows():
-        for col1 in columns:
-            # Trouver les distances entre la colonne 'col1' et les autres
-            dist_to_others = [row[f'dist_{col1}_{col2}'] for col2 in columns if col1 != col2]
-            # Vérifier si 'col1' est la plus proche de toutes les autres colonnes
-            if row[f'dist_{col1}_{col2}'] == min(dist_to_others):
-                closer[col1].append(True)
-            else:
-                closer[col1].append(False)
-    
-    # Calculer les probabilités pour chaque colonne d'être la plus proche
-    probabilities = {col: np.mean(closer[col]).round(3) for col in columns}
-    
-    return probabilities
+    values = df[columns].to_numpy(dtype="float64")
+    complete = ~np.isnan(values).any(axis=1)
+    values = values[complete]
+
+    distances = np.abs(values[:, :, None] - values[:, None, :])
+    scores = distances.sum(axis=2)
+    closer = scores == scores.min(axis=1, keepdims=True)
+
+    return pd.DataFrame(closer, index=df.index[complete], columns=columns)
+
+def calculate_closer_probabilities(df, columns, by=None):
+    """
+    Calcule les probabilités que chaque colonne d'un DataFrame soit la plus proche des autres,
+    selon l'idée de la "wisdom of the crowd" (ex: NDBC vs Open-Meteo vs Visual Crossing).
+
+    :param df: DataFrame contenant les données (non modifié).
+    :param columns: Liste des noms des colonnes à comparer entre elles.
+    :param by: Optionnel, regroupement : nom(s) de colonne (ex: 'Station ID') ou
+               `pd.Grouper` (ex: `pd.Grouper(key='Datetime', freq='D')` par jour).
+    :return: Dictionnaire des probabilités pour chaque colonne, ou DataFrame
+             (un groupe par ligne) si `by` est renseigné.
+    """
+    closer = closer_matrix(df, columns)
+
+    if by is None:
+        return {col: round(float(closer[col].mean()), 3) for col in columns}
+
+    groupers = by if isinstance(by, list) else [by]
+    keys = [grouper.key if isinstance(grouper, pd.Grouper) else grouper for grouper in groupers]
+    keys = [key for key in keys if key is not None and key not in columns]
+    closer = df.loc[closer.index, keys].join(closer)
+
+    return closer.groupby(groupers)[columns].mean().round(3)
 
 def add_day_period(df, datetime_column='Datetime'):
     """
@@ -648,19 +825,10 @@ def add_day_period(df, datetime_column='Datetime'):
     # Assurez-vous que la colonne 'Datetime' est bien de type datetime
     df[datetime_column] = pd.to_datetime(df[datetime_column], errors='coerce')
     
-    # Ajouter la colonne 'DayPeriod' (Moment de la journée)
+    # Ajouter la colonne 'DayPeriod' (Moment de la journée), via la table heure → période de calendar_dim
     if 'DayPeriod' not in df.columns:
-        def get_day_period(hour):
-            if 6 <= hour < 12:
-                return 'Morning'
-            elif 12 <= hour < 18:
-                return 'Afternoon'
-            elif 18 <= hour < 22:
-                return 'Evening'
-            else:
-                return 'Night'
-        
-        df['DayPeriod'] = df[datetime_column].dt.hour.apply(get_day_period)
+        hours = df[datetime_column].dt.hour
+        df['DayPeriod'] = pd.Series(day_period_of_hours(hours.fillna(0)), index=df.index).where(hours.notna())
       
     return df
 
@@ -720,43 +888,26 @@ def display_buoys_missing_df_counts(buoy_datas, prefix=None, df_wanted=None):
     if df_wanted is None or df_wanted.lower() == "meteo":
         print(f"\n☁️ Nombre de bouées sans données '{meteo_key}' : {meteo_empty}/{total}")
 
-def create_unique_id(df, columns):
+def create_unique_id(df, columns=('Station ID', 'Datetime')):
 
     """
-    Crée un identifiant unique basé sur des colonnes spécifiées,
-    avec une gestion spéciale pour les colonnes de type datetime.
+    Crée un identifiant unique int64 à partir d'une colonne station et d'une colonne
+    datetime (voir `keys.encode_keys`), au lieu d'une concaténation de chaînes.
     
     Args:
     df (pandas.DataFrame): DataFrame sur lequel opérer.
-    columns (list): Liste des colonnes à utiliser pour créer l'ID unique.
+    columns (list): La colonne Station ID et la colonne datetime (dans n'importe quel ordre).
     
     Returns:
-    pandas.DataFrame: DataFrame avec un identifiant unique créé et ordonné.
+    pandas.DataFrame: Copie du DataFrame avec 'Unique ID' en première colonne.
     """
-    
-    def process_datetime_column(col):
-        """
-        Formate une colonne datetime en une chaîne d'entiers avec année, mois, jour, heure, minute, etc.
-        """
-        if pd.api.types.is_datetime64_any_dtype(df[col]):
-            return df[col].apply(lambda x: f"{x.year:04d}{x.month:02d}{x.day:02d}{x.hour:02d}{x.minute:02d}{x.second:02d}")
-        return df[col].astype(str)
-
-    # Créer une liste de colonnes transformées
-    unique_columns = []
-    
-    # Parcourir les colonnes spécifiées
-    for col in columns:
-        if pd.api.types.is_datetime64_any_dtype(df[col]):  # Si la colonne est de type datetime
-            unique_columns.append(process_datetime_column(col))  # Applique le format datetime
-        else:
-            unique_columns.append(df[col].astype(str))  # Sinon, traite comme une chaîne de caractères
-    
-    # Fusionner toutes les colonnes pour créer l'ID unique
-    df['Unique ID'] = pd.concat(unique_columns, axis=1).agg(''.join, axis=1)
+    datetime_columns = [col for col in columns if pd.api.types.is_datetime64_any_dtype(df[col])]
+    station_columns = [col for col in columns if col not in datetime_columns]
+    if len(datetime_columns) != 1 or len(station_columns) != 1:
+        raise ValueError(f"Attendu une colonne station et une colonne datetime, reçu : {list(columns)}")
 
-    # Placer la colonne 'Unique ID' en première position
-    df = df[['Unique ID'] + [col for col in df.columns if col != 'Unique ID']]
+    df = df.drop(columns='Unique ID', errors='ignore')
+    df.insert(0, 'Unique ID', encode_keys(df[station_columns[0]], df[datetime_columns[0]]))
 
     return df
 
@@ -800,15 +951,9 @@ def display_row_values(df, columns=None, show_index=True):
         print("  |  ".join(row))
 
 def check_table_exists(table_name: str, engine) -> bool:
-    # Requête SQL pour vérifier si la table existe
-    query = f"SHOW TABLES LIKE '{table_name}'"
-    
-    with engine.connect() as connection:
-        # Exécuter la requête
-        result = connection.execute(text(query)).fetchall()
-    
-    # Si la table existe, renvoyer True
-    return bool(result)
+    # Inspection SQLAlchemy plutôt que SHOW TABLES LIKE : nom exact ('_' n'est pas un joker)
+    # et valable hors MySQL (SQLite pour les runs locaux)
+    return inspect(engine).has_table(table_name)
 
 def get_table_data_to_df(table_name: str, engine) -> pd.DataFrame:
     # Récupère toutes les métadonnées (tables, colonnes, etc.) de la base via l'engine
@@ -865,16 +1010,15 @@ def save_concat_csv(df, base_filename, csv_folder="csv"):
         # Si aucun fichier n'existe, on sauvegarde simplement le dataframe final
         df.to_csv(df_final_csv_name, index=False)
 
-def create_driver(website_url):
-    
+# Liste d'user-agents (exemples courants)
+USER_AGENTS = [
+    "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/124.0.0.0 Safari/537.36",
+    "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/605.1.15 (KHTML, like Gecko) Version/17.1 Safari/605.1.15",
+    "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/123.0.0.0 Safari/537.36"
+]
 
-    # Liste d'user-agents (exemples courants)
-    user_agents = [
-        "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/124.0.0.0 Safari/537.36",
-        "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/605.1.15 (KHTML, like Gecko) Version/17.1 Safari/605.1.15",
-        "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/123.0.0.0 Safari/537.36"
-    ]
-    chosen_agent = random.choice(user_agents)
+def build_chrome_options():
+    chosen_agent = random.choice(USER_AGENTS)
 
     # Initialisation des options pour le driver
     options = Options()
@@ -882,8 +1026,11 @@ def create_driver(website_url):
     options.add_argument(f"user-agent={chosen_agent}")
     options.add_argument("--disable-gpu")
     options.add_argument("--no-sandbox")
+    return options
+
+def create_driver(website_url):
 
-    driver = webdriver.Chrome(options=options)
+    driver = webdriver.Chrome(options=build_chrome_options())
     driver.implicitly_wait(2)
 
     driver.get(website_url)
@@ -936,37 +1083,15 @@ def wait_page_to_load(driver):
     print("Page completely loaded!")
 
 def convert_to_decimal(lat, lon):
-    # Convertir latitude
-    lat_deg = float(lat[:-1])  # Retirer le dernier caractère (N/S)
-    lat_dir = lat[-1]  # Direction (N/S)
-    if lat_dir == "S":
-        lat_deg = -lat_deg
-    
-    # Convertir longitude
-    lon_deg = float(lon[:-1])  # Retirer le dernier caractère (E/W)
-    lon_dir = lon[-1]  # Direction (E/W)
-    if lon_dir == "W":
-        lon_deg = -lon_deg
-    
-    return lat_deg, lon_deg
+    # Comme `convert_coordinates`, sans arrondi
+    return parse_coordinates(lat), parse_coordinates(lon)
 
 def create_mysql_engine(db_name: str):
-    creds_path: str = r"c:\Credentials\mysql_creds.json"
-    # Charger les informations de connexion
-    with open(creds_path, 'r') as file:
-        content = json.load(file)
-        mysql_user = content["user"]
-        password = content["password"]
-        host = content["host"]
-        port = content["port"]
-    
-    # Créer l'engine
-    engine = create_engine(
-        f"mysql+mysqlconnector://{mysql_user}:{password}@{host}:{port}/{db_name}",
-        isolation_level='AUTOCOMMIT'
-    )
-    
-    return engine
+    """
+    Engine en AUTOCOMMIT sur la base `db_name`. Il partage le pool de l'engine du registre
+    (engines.py) : les appels répétés ne créent ni nouvel engine ni nouveau pool.
+    """
+    return get_engine(db_name).execution_options(isolation_level='AUTOCOMMIT')
 
 def check_existing_csv_files(csv_folder, base_filename):
     # Lister tous les fichiers dans le dossier csv
@@ -977,11 +1102,30 @@ def check_existing_csv_files(csv_folder, base_filename):
     
     return matching_files
 
-def create_table_in_mysql(df: pd.DataFrame, table_name: str, engine):
+def create_table_in_mysql(df: pd.DataFrame, table_name: str, engine, primary_key=None, indexes=None,
+                          narrow_types=True):
     """
     Crée une table MySQL en se basant sur la structure du DataFrame, 
     en utilisant uniquement SQLAlchemy (sans requête SQL brute).
+
+    Pour les tables de staging (STAGING_INDEXES), la clé primaire est par défaut
+    ('Station ID', 'Datetime') avec les index secondaires configurés ; sinon l'index du
+    DataFrame sert de clé primaire comme auparavant.
+
+    Args:
+    - primary_key (list): Colonnes de la clé primaire (composite possible).
+    - indexes (list): Tuples de colonnes des index secondaires.
+    - narrow_types (bool): Types étroits (`schemas.infer_table_types` : TINYINT/SMALLINT/ENUM pour les colonnes
+      calendaires, DECIMAL pour Lat/Lon, VARCHAR(16) pour Station ID) ; False pour le typage historique (String(255), Float...).
+
+    Returns:
+    - pd.DataFrame | None: Rapport de typage par colonne (octets par ligne avant/après),
+      None si la table existe déjà ou sans typage étroit.
     """
+    if primary_key is None and table_name in STAGING_INDEXES:
+        primary_key = STAGING_PRIMARY_KEY
+    if indexes is None:
+        indexes = STAGING_INDEXES.get(table_name, [])
 
     print("🔄 Vérification de l'existence de la table...")
 
@@ -996,7 +1140,7 @@ def create_table_in_mysql(df: pd.DataFrame, table_name: str, engine):
     columns = []
 
     # Gestion de l'index comme colonne primaire si nécessaire
-    if df.index.name is not None or not df.index.equals(pd.RangeIndex(start=0, stop=len(df))):
+    if primary_key is None and (df.index.name is not None or not df.index.equals(pd.RangeIndex(start=0, stop=len(df)))):
         index_name = df.index.name or "index"
         index_dtype = df.index.dtype
 
@@ -1006,12 +1150,12 @@ def create_table_in_mysql(df: pd.DataFrame, table_name: str, engine):
             col_type = String(255)
             icon = "🔤"  # String type
         elif index_dtype == 'int64':
-            col_type = Integer
+            col_type = BigInteger
             icon = "🔢"  # Integer type
         elif index_dtype in ['float32', 'float64']:  # Gérer float32 et float64
             col_type = Float
             icon = "🔢"  # Float type
-        elif np.issubdtype(index_dtype, np.datetime64):
+        elif pd.api.types.is_datetime64_any_dtype(index_dtype):
             col_type = DateTime
             icon = "📅"  # DateTime type
         else:
@@ -1021,33 +1165,44 @@ def create_table_in_mysql(df: pd.DataFrame, table_name: str, engine):
         columns.append(Column(index_name, col_type, primary_key=True))
         print(f"{icon} Colonne '{index_name}' ajoutée en tant que '{col_type}' (clé primaire)")
 
-    # Ajouter les colonnes du DataFrame
+    # Ajouter les colonnes du DataFrame, avec le type le plus étroit compatible avec les données
     print("\n🔄 Ajout des colonnes du DataFrame...")
-    for column_name, dtype in df.dtypes.items():
-        if dtype == 'object':
-            col_type = String(255)
-            icon = "🔤"  # String type
-        elif dtype == 'int64':
-            col_type = Integer
-            icon = "🔢"  # Integer type
-        elif dtype in ['float32', 'float64']:  # Gérer float32 et float64
-            col_type = Float
-            icon = "🔢"  # Float type
-        elif np.issubdtype(dtype, np.datetime64):
-            col_type = DateTime
+    if narrow_types:
+        column_types, type_report = infer_table_types(df)
+    else:
+        column_types, type_report = {col: legacy_sql_type(dtype) for col, dtype in df.dtypes.items()}, None
+
+    for column_name, col_type in column_types.items():
+        if isinstance(col_type, (String, SqlEnum)):
+            icon = "🔤"  # String / Enum type
+        elif isinstance(col_type, DateTime):
             icon = "📅"  # DateTime type
-        elif dtype == 'timedelta64[ns]':
-            col_type = Time
+        elif isinstance(col_type, Time):
             icon = "🕒"  # Timedelta type
-        elif dtype == 'bool':
-            col_type = Boolean
+        elif isinstance(col_type, Boolean):
             icon = "❓"  # Boolean type (point d'interrogation)
         else:
-            col_type = String(255)
-            icon = "🔤"  # String type
-
-        columns.append(Column(column_name, col_type))
-        print(f"{icon} Colonne '{column_name}' ajoutée en tant que '{col_type}'")
+            icon = "🔢"  # Integer / Decimal / Float type
+
+        in_key = primary_key is not None and column_name in primary_key
+        columns.append(Column(column_name, col_type, nullable=not in_key))
+        print(f"{icon} Colonne '{column_name}' ajoutée en tant que '{col_type.compile(dialect=engine.dialect)}'"
+              + (" (clé primaire)" if in_key else ""))
+
+    if type_report is not None:
+        print(f"💾 Typage étroit : ~{type_report.attrs['saved_bytes_per_row']:.0f} octets économisés par ligne "
+              f"par rapport au typage par défaut")
+
+    # Clé primaire composite et index secondaires
+    if primary_key is not None:
+        missing = [col for col in primary_key if col not in df.columns]
+        if missing:
+            raise ValueError(f"Colonnes de clé primaire absentes du DataFrame : {missing}")
+        print(f"🔑 Clé primaire {list(primary_key)}")
+    indexes = [cols for cols in indexes if all(col in df.columns for col in cols)]
+    if primary_key is not None or indexes:
+        columns += table_keys(table_name, primary_key, indexes)
+        print(f"📇 {len(indexes)} index secondaires")
 
     # Création de la table
     print("\n🚀 Création de la table dans la base de données...")
@@ -1055,34 +1210,40 @@ def create_table_in_mysql(df: pd.DataFrame, table_name: str, engine):
     metadata.create_all(engine)
 
     print(f"\n✅ Table '{table_name}' créée avec succès dans la base de données MySQL.")
-    
-def insert_new_rows(df: pd.DataFrame, engine, table_name: str, ref: str):
-    metadata = MetaData()
-    
-    try:
-        # Chargement direct de la table depuis la base
-        table = Table(table_name, metadata, autoload_with=engine)
-
-        if ref not in table.columns:
-            raise ValueError(f"La colonne de référence '{ref}' n'existe pas dans la table.")
-
-        with engine.connect() as conn:
-            stmt = select(table.c[ref])
-            existing_values = {row[0] for row in conn.execute(stmt)}
-
-        print(f"🔎 {len(existing_values)} valeurs déjà présentes dans la colonne '{ref}'.")
-
-        new_df = df[~df[ref].isin(existing_values)]
+    return type_report
 
-        if new_df.empty:
-            print("⚠️ Aucune nouvelle ligne à insérer.")
-            return
+def insert_new_rows(df: pd.DataFrame, engine, table_name: str, ref, mode: str = "insert_missing",
+                    batch_rows: int = LOAD_BATCH_ROWS):
+    """
+    Charge les lignes de `df` dont la clé n'existe pas encore dans la table (ou les met à jour
+    avec mode='upsert'), via `loader.load_dataframe` : fusion par lots côté base, sans lire
+    toute la colonne de référence en mémoire.
 
-        print(f"🚀 Insertion de {len(new_df)} lignes dans '{table_name}'...")
+    `ref` peut être une colonne ou une liste ; si la table a une colonne 'Station ID' elle est
+    ajoutée à la clé, pour ne pas écarter les lignes d'autres stations à la même heure.
+    Si la table a déjà une clé primaire différente (ex: 'Datetime' seul, avant
+    `indexes.migrate_table_keys`), le chargement se fait sur cette clé primaire.
 
-        new_df.to_sql(name=table_name, con=engine, if_exists='append', index=False, chunksize=1000)
+    Returns:
+    - dict | None: Rapport de chargement (insérées / mises à jour / ignorées), None en cas d'erreur.
+    """
+    key_columns = [ref] if isinstance(ref, str) else list(ref)
 
-        print("✅ Insertion terminée avec succès.")
+    try:
+        columns = [column["name"] for column in inspect(engine).get_columns(table_name)]
+        if 'Station ID' in columns and 'Station ID' not in key_columns:
+            key_columns = ['Station ID'] + key_columns
+
+        # La clé primaire existante prime : une autre clé ferait échouer l'upsert (pas de contrainte
+        # correspondante) ou l'insertion (doublon sur la clé primaire)
+        primary_key = inspect(engine).get_pk_constraint(table_name)["constrained_columns"]
+        if primary_key and set(primary_key) != set(key_columns):
+            print(f"⚠️ Clé primaire de '{table_name}' : {primary_key} au lieu de {key_columns}, utilisée pour le "
+                  f"chargement (voir `indexes.migrate_table_keys`)")
+            key_columns = primary_key
+
+        print(f"🚀 Chargement de {len(df)} lignes dans '{table_name}' (clé : {key_columns})...")
+        return load_dataframe(df, engine, table_name, key_columns=key_columns, mode=mode, batch_rows=batch_rows)
 
     except Exception as e:
         print(f"💥 Erreur pendant l'insertion : {e}")
@@ -0,0 +1,167 @@
+from imports import *
+from requests.adapters import HTTPAdapter
+from threading import Lock
+
+# ==============================
+# Configuration par défaut
+# ==============================
+HTTP_CACHE_NAME = ".cache"
+HTTP_CACHE_BACKEND = "sqlite"  # 'sqlite', 'filesystem' ou 'memory'
+HTTP_CACHE_BACKENDS = ("sqlite", "filesystem", "memory")
+
+# TTL par défaut (s) et TTL par endpoint (motifs d'URL requests_cache)
+DEFAULT_EXPIRE_AFTER = 3600
+ENDPOINT_EXPIRE_AFTER = {
+    "api.open-meteo.com/*": 3600,
+    "www.ndbc.noaa.gov/data/realtime2/*": 600,
+    "www.ndbc.noaa.gov/station_page.php*": 86400,
+    "weather.visualcrossing.com/*": 86400,
+}
+
+# Nombre maximal de réponses gardées en cache (les plus anciennes sont évincées)
+HTTP_CACHE_MAX_ENTRIES = 5000
+
+# Pool de connexions et politique de retry
+HTTP_POOL_CONNECTIONS = 10
+HTTP_POOL_MAXSIZE = 32
+HTTP_RETRIES = 5
+HTTP_BACKOFF_FACTOR = 0.2
+HTTP_TIMEOUT = 30
+
+
+class HttpClient:
+    """
+    Session HTTP partagée par tout le processus : keep-alive via un pool de connexions,
+    retry avec backoff exponentiel (`retry_requests`) et cache de réponses `requests_cache`
+    avec TTL par endpoint, éviction bornée et compteurs hits/misses.
+    """
+
+    def __init__(self, backend=HTTP_CACHE_BACKEND, cache_name=HTTP_CACHE_NAME,
+                 expire_after=DEFAULT_EXPIRE_AFTER, urls_expire_after=None,
+                 max_entries=HTTP_CACHE_MAX_ENTRIES, pool_connections=HTTP_POOL_CONNECTIONS,
+                 pool_maxsize=HTTP_POOL_MAXSIZE, retries=HTTP_RETRIES, backoff_factor=HTTP_BACKOFF_FACTOR):
+
+        if backend not in HTTP_CACHE_BACKENDS:
+            raise ValueError(f"Backend de cache inconnu : '{backend}' (attendu : {HTTP_CACHE_BACKENDS})")
+
+        self.backend = backend
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._lock = Lock()
+
+        self.session = requests_cache.CachedSession(
+            cache_name,
+            backend=backend,
+            expire_after=expire_after,
+            urls_expire_after=ENDPOINT_EXPIRE_AFTER if urls_expire_after is None else urls_expire_after,
+        )
+
+        # Retry + backoff, puis remplacement de l'adaptateur pour dimensionner le pool
+        retry(self.session, retries=retries, backoff_factor=backoff_factor, status_to_retry=(429, 500, 502, 503, 504))
+        max_retries = self.session.get_adapter("https://").max_retries
+        adapter = HTTPAdapter(pool_connections=pool_connections, pool_maxsize=pool_maxsize, max_retries=max_retries)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+        # Comptage une fois par requête (get, post, client Open-Meteo passent tous par `request`) :
+        # pas de marqueur posé sur la réponse, que le backend 'memory' renvoie telle quelle à chaque hit
+        send_request = self.session.request
+
+        def counted_request(*args, **kwargs):
+            return self._count_response(send_request(*args, **kwargs))
+
+        self.session.request = counted_request
+
+    def _count_response(self, response):
+        with self._lock:
+            if getattr(response, "from_cache", False):
+                self.hits += 1
+            else:
+                self.misses += 1
+                if self.max_entries and self.misses % 100 == 0:
+                    self.evict()
+        return response
+
+    def evict(self):
+        """
+        Supprime les réponses expirées puis, si le cache dépasse `max_entries`,
+        les réponses les plus anciennes.
+        """
+        cache = self.session.cache
+        cache.delete(expired=True)
+
+        overflow = len(cache.responses) - self.max_entries
+        if overflow > 0:
+            oldest = sorted(cache.filter(expired=True), key=lambda r: r.created_at)[:overflow]
+            cache.delete(*[r.cache_key for r in oldest])
+
+    def get(self, url, **kwargs):
+        kwargs.setdefault("timeout", HTTP_TIMEOUT)
+        return self.session.get(url, **kwargs)
+
+    def stats(self):
+        total = self.hits + self.misses
+        return {
+            "backend": self.backend,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / total, 3) if total else 0.0,
+            "entries": len(self.session.cache.responses),
+        }
+
+
+_http_client = None
+_http_client_lock = Lock()
+
+
+def configure_http_client(**kwargs):
+    """
+    (Re)crée le client partagé avec une configuration spécifique
+    (ex: `configure_http_client(backend='memory', max_entries=500)`).
+    """
+    global _http_client
+    with _http_client_lock:
+        if _http_client is not None:
+            _http_client.session.close()
+        _http_client = HttpClient(**kwargs)
+    return _http_client
+
+
+def get_http_client():
+    """
+    Renvoie le client HTTP partagé, créé au premier appel avec la configuration par défaut.
+    """
+    global _http_client
+    with _http_client_lock:
+        if _http_client is None:
+            _http_client = HttpClient()
+    return _http_client
+
+
+def get_http_session():
+    return get_http_client().session
+
+
+def http_get(url, **kwargs):
+    return get_http_client().get(url, **kwargs)
+
+
+_openmeteo_client = None
+_openmeteo_session = None
+
+
+def get_openmeteo_client():
+    """
+    Client Open-Meteo réutilisé entre les appels, branché sur la session partagée.
+    """
+    global _openmeteo_client, _openmeteo_session
+    session = get_http_session()
+    if _openmeteo_client is None or _openmeteo_session is not session:
+        _openmeteo_client = openmeteo_requests.Client(session=session)
+        _openmeteo_session = session
+    return _openmeteo_client
+
+
+def get_http_cache_stats():
+    return get_http_client().stats()
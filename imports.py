@@ -31,7 +31,7 @@ api = NdbcApi()
 from siphon.simplewebservice.ndbc import NDBC
 
 from sqlalchemy import create_engine, inspect, MetaData, Table, select, Boolean,func
-from sqlalchemy import Column, Integer, String, Time, Float, DateTime, ForeignKey, text
+from sqlalchemy import Column, Integer, BigInteger, String, Time, Float, DateTime, ForeignKey, text
 from sqlalchemy.orm import sessionmaker, declarative_base
 from sqlalchemy.exc import IntegrityError
 from sqlalchemy import ForeignKeyConstraint, UniqueConstraint
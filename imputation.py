@@ -0,0 +1,217 @@
+from imports import *
+
+# ==============================
+# Configuration
+# ==============================
+# Politiques : "median", "mean", ("constant", valeur), ("ffill", limite) ou None (pas d'imputation)
+IMPUTATION_STATISTICS = ("median", "mean")
+DEFAULT_IMPUTATION_POLICY = "median"
+
+# Cas spécifiques historiques de `clean_dataframe`
+CLEANING_POLICIES = {
+    "visibility": "mean",
+    "water_level_above_mean": ("constant", 0),
+}
+
+
+def _policy_kind(policy):
+    return policy[0] if isinstance(policy, tuple) else policy
+
+
+class Imputer:
+    """
+    Imputation des valeurs manquantes en une passe : les statistiques (médiane, moyenne)
+    de toutes les colonnes sont calculées en un seul appel, éventuellement par groupe
+    (station et/ou fenêtre de temps), puis appliquées avec un seul `fillna`.
+
+    Les statistiques sont gardées après `fit` : les lots suivants (chargement incrémental)
+    sont imputés avec `transform` sans les recalculer. Un groupe absent du fit utilise
+    la statistique globale.
+
+    Args:
+    - policies (dict): {colonne: politique} ; les autres colonnes numériques suivent `default`.
+    - default: Politique des colonnes numériques non listées (None pour les ignorer).
+    - by (list): Colonnes de regroupement (ex: ['Station ID']).
+    - window (str): Fenêtre de temps pour le regroupement (ex: 'D', '6h'), sur `datetime_column`.
+    - datetime_column (str): Colonne datetime utilisée par `window`.
+    """
+
+    def __init__(self, policies=None, default=DEFAULT_IMPUTATION_POLICY, by=None, window=None,
+                 datetime_column='Datetime'):
+        self.policies = dict(policies or {})
+        self.default = default
+        self.by = list(by or [])
+        self.window = window
+        self.datetime_column = datetime_column
+        self.statistics_ = None
+        self.group_statistics_ = None
+
+    def resolve_policies(self, df):
+        """
+        Politique effective de chaque colonne imputée du DataFrame.
+        """
+        keys = set(self.by) | ({self.datetime_column} if self.window else set())
+        policies = {}
+        for col in df.columns:
+            if col in keys:
+                continue
+            if col in self.policies:
+                policy = self.policies[col]
+            elif pd.api.types.is_numeric_dtype(df[col]):
+                policy = self.default
+            else:
+                policy = None
+            if policy is not None:
+                policies[col] = policy
+        return policies
+
+    def _group_keys(self, df):
+        keys = [df[col] for col in self.by]
+        if self.window:
+            keys.append(df[self.datetime_column].dt.floor(self.window).rename("_window"))
+        return keys
+
+    def fit(self, df):
+        policies = self.resolve_policies(df)
+        stats_needed = {stat: [col for col, policy in policies.items() if _policy_kind(policy) == stat]
+                        for stat in IMPUTATION_STATISTICS}
+
+        self.statistics_ = {}
+        self.group_statistics_ = {}
+        for stat, cols in stats_needed.items():
+            if not cols:
+                continue
+            self.statistics_[stat] = df[cols].agg(stat)
+            keys = self._group_keys(df)
+            if keys:
+                self.group_statistics_[stat] = df[cols].groupby(keys, observed=True).agg(stat)
+        return self
+
+    def transform(self, df):
+        """
+        Renvoie une copie imputée du DataFrame avec les statistiques du dernier `fit`.
+        """
+        if self.statistics_ is None:
+            raise RuntimeError("Imputer non ajusté : appeler fit() ou fit_transform() d'abord")
+
+        df = df.copy()
+        policies = self.resolve_policies(df)
+        fill_values = {}
+
+        for stat, values in self.statistics_.items():
+            cols = [col for col in values.index if col in policies and _policy_kind(policies[col]) == stat]
+            if not cols:
+                continue
+
+            if stat in self.group_statistics_:
+                # Valeur du groupe de chaque ligne, sinon valeur globale
+                keys = pd.MultiIndex.from_arrays(self._group_keys(df))
+                group_values = self.group_statistics_[stat][cols]
+                if group_values.index.nlevels == 1:
+                    keys = keys.get_level_values(0)
+                row_values = group_values.reindex(keys).set_axis(df.index)
+                fill_values.update({col: row_values[col].fillna(values[col]) for col in cols})
+            else:
+                fill_values.update({col: values[col] for col in cols})
+
+        for col, policy in policies.items():
+            if _policy_kind(policy) == "constant":
+                fill_values[col] = policy[1]
+
+        if fill_values:
+            df = df.fillna(fill_values)
+
+        ffill_columns = {col: policy[1] if isinstance(policy, tuple) else None
+                         for col, policy in policies.items() if _policy_kind(policy) == "ffill"}
+        for limit in set(ffill_columns.values()):
+            cols = [col for col, col_limit in ffill_columns.items() if col_limit == limit]
+            keys = self._group_keys(df)
+            filled = df[cols].groupby(keys, observed=True).ffill(limit=limit) if keys else df[cols].ffill(limit=limit)
+            df[cols] = filled
+
+        return df
+
+    def fit_transform(self, df):
+        return self.fit(df).transform(df)
+
+
+# ==============================
+# Planification des valeurs manquantes
+# ==============================
+# (nombre de lignes minimum exclu, tag, % de valeurs manquantes au-delà duquel une colonne est supprimée)
+NULL_THRESHOLDS = [
+    (100000, "green", 70),
+    (10000, "yellow", 60),
+    (2000, "orange", 55),
+    (-1, "red", 50),
+]
+
+
+def null_threshold(num_rows):
+    """
+    Tag et seuil de suppression selon la taille du DataFrame (plus souple pour les gros volumes).
+    """
+    for min_rows, tag, threshold in NULL_THRESHOLDS:
+        if num_rows > min_rows:
+            return tag, threshold
+
+
+def plan_null_policies(df):
+    """
+    Calcule le profil des valeurs manquantes en une passe et décide pour toutes les
+    colonnes : 'keep' (aucun manquant), 'drop' (au-delà du seuil), 'median' (numérique)
+    ou 'mode' (autres types).
+
+    Returns:
+    - pd.DataFrame: Une ligne par colonne : 'null_pct', 'policy', 'fill_value'.
+    """
+    tag, threshold = null_threshold(len(df))
+    null_pct = df.isna().mean() * 100 if len(df) else pd.Series(0.0, index=df.columns)
+
+    numeric = pd.Series([pd.api.types.is_numeric_dtype(dtype) for dtype in df.dtypes], index=df.columns)
+    policy = np.select(
+        [null_pct == 0, null_pct > threshold, numeric],
+        ["keep", "drop", "median"],
+        default="mode",
+    )
+    plan = pd.DataFrame({"null_pct": null_pct.round(2), "policy": policy}, index=df.columns)
+    plan["fill_value"] = None
+
+    median_cols = plan.index[plan["policy"] == "median"]
+    if len(median_cols):
+        plan.loc[median_cols, "fill_value"] = df[median_cols].median().astype(object)
+
+    mode_cols = plan.index[plan["policy"] == "mode"]
+    if len(mode_cols):
+        plan.loc[mode_cols, "fill_value"] = df[mode_cols].mode().iloc[0].astype(object)
+
+    plan.attrs.update(tag=tag, threshold=threshold, rows=len(df))
+    return plan
+
+
+def apply_null_plan(df, plan):
+    """
+    Applique un plan de `plan_null_policies` en une seule opération (drop + fillna).
+    """
+    drop_cols = plan.index[plan["policy"] == "drop"]
+    fill_values = plan.loc[plan["policy"].isin(["median", "mode"]), "fill_value"].to_dict()
+    return df.drop(columns=drop_cols).fillna(fill_values)
+
+
+def null_plan_report(plan, elapsed_s=None):
+    """
+    Rapport exploitable (JSON) d'un plan : tag, seuil, durée et décision par colonne.
+    """
+    columns = [
+        {"column": column, "null_pct": float(row.null_pct), "policy": row.policy,
+         "fill_value": row.fill_value.item() if isinstance(row.fill_value, np.generic) else row.fill_value}
+        for column, row in plan.iterrows()
+    ]
+    return {
+        "rows": plan.attrs.get("rows"),
+        "tag": plan.attrs.get("tag"),
+        "threshold": plan.attrs.get("threshold"),
+        "dropped": [col["column"] for col in columns if col["policy"] == "drop"],
+        "elapsed_s": elapsed_s,
+        "columns": columns,
+    }
@@ -0,0 +1,202 @@
+from imports import *
+from sqlalchemy import Index, PrimaryKeyConstraint, or_, insert
+from loader import has_unique_key
+from time import perf_counter
+import re
+
+# ==============================
+# Configuration
+# ==============================
+# Clé primaire des tables de staging (clustered sous InnoDB) : les routes filtrent une
+# station puis une plage de Datetime, ce qui devient une lecture d'un intervalle de la clé
+STAGING_PRIMARY_KEY = ['Station ID', 'Datetime']
+
+# Index secondaires (un tuple de colonnes par index), d'après les requêtes des routers :
+# - ('Datetime',) : plage de dates sans station (/median/moving7) et min/max de /median ;
+# - une colonne numérique : seuils de /{column}/records_compared_to_threshold et /meteo/extreme_conditions
+#   (InnoDB ajoute la clé primaire à chaque index secondaire : le filtre station/date reste dans l'index) ;
+# - ('Year', 'Month') : /meteo/precipitations_by_month.
+STAGING_INDEXES = {
+    "cleaned_marine_data": [
+        ("Datetime",),
+        ("Wave Height (m)",),
+        ("Water T° (°C)",),
+    ],
+    "cleaned_meteo_data": [
+        ("Datetime",),
+        ("Year", "Month"),
+        ("T°(C°)",),
+        ("Wind Gusts (km/h)",),
+        ("Precipitations (mm)",),
+    ],
+}
+
+MIGRATION_SUFFIX = "_migration"
+BACKUP_SUFFIX = "_backup"
+MYSQL_MAX_IDENTIFIER = 64
+
+
+def index_name(table_name, columns):
+    """
+    Nom d'index stable et valide en SQL : 'ix_<table>_<colonnes>' (ex: 'ix_cleaned_marine_data_wave_height_m').
+    """
+    slug = "_".join(re.sub(r"[^0-9a-z]+", "_", col.lower()).strip("_") for col in columns)
+    return f"ix_{table_name}_{slug}"[:MYSQL_MAX_IDENTIFIER]
+
+
+def table_keys(table_name, primary_key=STAGING_PRIMARY_KEY, indexes=None):
+    """
+    Clé primaire et index à passer à `Table(...)` (noms de colonnes résolus à la construction).
+
+    Args:
+    - table_name (str): Nom de la table.
+    - primary_key (list): Colonnes de la clé primaire (None : pas de contrainte).
+    - indexes (list): Tuples de colonnes ; par défaut STAGING_INDEXES[table_name].
+
+    Returns:
+    - list: PrimaryKeyConstraint puis un Index par entrée.
+    """
+    if indexes is None:
+        indexes = STAGING_INDEXES.get(table_name, [])
+    keys = [PrimaryKeyConstraint(*primary_key)] if primary_key else []
+    return keys + [Index(index_name(table_name, cols), *cols) for cols in indexes]
+
+
+def missing_indexes(engine, table):
+    """
+    Index de la définition `table` absents de la table existante (comparés par colonnes).
+    """
+    existing = {tuple(index["column_names"]) for index in inspect(engine).get_indexes(table.name)}
+    return [index for index in table.indexes if tuple(col.name for col in index.columns) not in existing]
+
+
+def _rename_tables(conn, renames):
+    preparer = conn.dialect.identifier_preparer
+    if conn.dialect.name in ("mysql", "mariadb"):
+        # Échange atomique des noms
+        conn.exec_driver_sql("RENAME TABLE " + ", ".join(
+            f"{preparer.quote(old)} TO {preparer.quote(new)}" for old, new in renames))
+    else:
+        for old, new in renames:
+            conn.exec_driver_sql(f"ALTER TABLE {preparer.quote(old)} RENAME TO {preparer.quote(new)}")
+
+
+def migrate_table_keys(engine, table, keep_backup=True, drop_null_keys=False):
+    """
+    Met une table existante en conformité avec sa définition `table` (clé primaire composite
+    et index secondaires) :
+    - table absente : création ;
+    - clé primaire déjà correcte : ajout des seuls index manquants ;
+    - sinon : copie dans '<table>_migration' créée avec la nouvelle clé, puis échange des
+      noms et création des index ; l'ancienne table reste disponible sous '<table>_backup'.
+      Tant que l'échange n'a pas réussi, l'ancienne table n'est pas modifiée (en cas d'échec,
+      '<table>_migration' est supprimée).
+
+    Les doublons sur la nouvelle clé lèvent une ValueError, de même que les clés NULL
+    (sauf `drop_null_keys=True`, qui les écarte de la copie).
+
+    Returns:
+    - dict: 'table', 'status' ('created', 'up_to_date', 'indexes_added', 'migrated'),
+      'rows_copied', 'null_keys_dropped', 'indexes_added', 'backup', 'elapsed_s'.
+    """
+    start = perf_counter()
+    report = {"table": table.name, "status": None, "rows_copied": 0, "null_keys_dropped": 0,
+              "indexes_added": [], "backup": None, "elapsed_s": None}
+    primary_key = [col.name for col in table.primary_key.columns]
+
+    def done(status):
+        report["status"] = status
+        report["elapsed_s"] = perf_counter() - start
+        print(f"✅ '{table.name}' : {status} ({report['rows_copied']} lignes copiées, "
+              f"{len(report['indexes_added'])} index ajoutés)")
+        return report
+
+    if not inspect(engine).has_table(table.name):
+        table.create(engine)
+        report["indexes_added"] = [index.name for index in table.indexes]
+        return done("created")
+
+    if has_unique_key(engine, table.name, primary_key):
+        for index in missing_indexes(engine, table):
+            index.create(engine)
+            report["indexes_added"].append(index.name)
+        return done("indexes_added" if report["indexes_added"] else "up_to_date")
+
+    # Contrôles sur la table existante avant copie
+    existing = Table(table.name, MetaData(), autoload_with=engine)
+    missing_keys = [col for col in primary_key if col not in existing.c]
+    if missing_keys:
+        raise ValueError(f"Colonnes de clé absentes de '{table.name}' : {missing_keys}")
+
+    null_keys = or_(*[existing.c[col].is_(None) for col in primary_key])
+    key_columns = [existing.c[col] for col in primary_key]
+    with engine.connect() as conn:
+        null_count = conn.execute(select(func.count()).select_from(existing).where(null_keys)).scalar()
+        duplicates = conn.execute(select(func.count()).select_from(
+            select(*key_columns).where(~null_keys).group_by(*key_columns).having(func.count() > 1).subquery()
+        )).scalar()
+
+    if duplicates:
+        raise ValueError(f"{duplicates} clés {primary_key} en double dans '{table.name}' : dédoublonner avant migration")
+    if null_count and not drop_null_keys:
+        raise ValueError(f"{null_count} lignes de '{table.name}' ont une clé NULL : "
+                         f"les corriger ou utiliser drop_null_keys=True")
+
+    migration_name = f"{table.name}{MIGRATION_SUFFIX}"
+    backup_name = f"{table.name}{BACKUP_SUFFIX}"
+    if inspect(engine).has_table(backup_name):
+        raise ValueError(f"La table '{backup_name}' existe déjà (migration précédente) : la supprimer avant de migrer")
+
+    print(f"🔄 Migration de '{table.name}' vers la clé {primary_key}...")
+    migration = table.to_metadata(MetaData(), name=migration_name)
+    # Index créés après l'échange : sous SQLite leurs noms sont globaux et entreraient en
+    # conflit avec ceux de l'ancienne table, qui n'est ainsi jamais modifiée avant l'échange
+    migration.indexes.clear()
+    columns = [col.name for col in migration.columns if col.name in existing.c]
+    report["null_keys_dropped"] = null_count
+
+    migration.drop(engine, checkfirst=True)
+    try:
+        with engine.begin() as conn:
+            migration.create(conn)
+            report["rows_copied"] = conn.execute(insert(migration).from_select(
+                columns, select(*[existing.c[col] for col in columns]).where(~null_keys)
+            )).rowcount
+
+        with engine.begin() as conn:
+            _rename_tables(conn, [(table.name, backup_name), (migration_name, table.name)])
+    except Exception:
+        # Échec avant ou pendant l'échange (RENAME TABLE atomique sous MySQL, transaction sous SQLite) :
+        # la table d'origine et ses index sont intacts, seule la copie est supprimée
+        migration.drop(engine, checkfirst=True)
+        print(f"💥 Migration de '{table.name}' annulée, '{migration_name}' supprimée")
+        raise
+
+    # Après l'échange : index de la sauvegarde homonymes supprimés (SQLite), puis nouveaux index
+    new_index_names = {index.name for index in table.indexes}
+    backup = Table(backup_name, MetaData(), autoload_with=engine)
+    if keep_backup:
+        report["backup"] = backup_name
+        for index in list(backup.indexes):
+            if index.name in new_index_names:
+                index.drop(engine)
+    else:
+        backup.drop(engine)
+    for index in table.indexes:
+        index.create(engine)
+
+    report["indexes_added"] = sorted(new_index_names)
+    return done("migrated")
+
+
+def migrate_staging_tables(engine, keep_backup=True, drop_null_keys=False):
+    """
+    Applique `migrate_table_keys` aux tables de staging définies dans tables.py.
+
+    Returns:
+    - list: Un rapport par table.
+    """
+    import tables
+
+    return [migrate_table_keys(engine, tables.metadata.tables[table_name], keep_backup, drop_null_keys)
+            for table_name in STAGING_INDEXES]
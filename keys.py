@@ -0,0 +1,142 @@
+from imports import *
+from functools import lru_cache
+
+# ==============================
+# Configuration
+# ==============================
+# Clé (station, heure) sur 63 bits : [ station : 39 bits | heures depuis 1970 : 24 bits ]
+HOUR_BITS = 24                                  # 16,7 M d'heures → jusqu'en 3883
+HOUR_MASK = (1 << HOUR_BITS) - 1
+
+# Station ID NDBC ('41001', 'LONF1', ...) en base 37 bijective : 0 est réservé au
+# remplissage, les zéros de tête sont donc conservés ('041001' ≠ '41001')
+STATION_ALPHABET = "0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZ"
+STATION_BASE = len(STATION_ALPHABET) + 1
+STATION_MAX_LENGTH = 7                          # 37^7 < 2^39
+
+NS_PER_HOUR = 3_600 * 10**9
+
+
+@lru_cache(maxsize=None)
+def encode_station(station_id):
+    """
+    Encode un Station ID NDBC canonique (majuscules et chiffres, au plus 7 caractères) en entier.
+    Les autres formes ('lonf1', ' 41001') sont refusées plutôt que normalisées, pour que
+    `decode_station` rende toujours le Station ID d'origine.
+    """
+    text = str(station_id)
+    if not text or len(text) > STATION_MAX_LENGTH:
+        raise ValueError(f"Station ID invalide pour une clé : '{station_id}'")
+    if text != text.strip().upper():
+        raise ValueError(f"Station ID non canonique : '{station_id}' (attendu : '{text.strip().upper()}')")
+
+    code = 0
+    for char in text:
+        digit = STATION_ALPHABET.find(char)
+        if digit < 0:
+            raise ValueError(f"Caractère '{char}' non supporté dans le Station ID '{station_id}'")
+        code = code * STATION_BASE + digit + 1
+    return code
+
+
+@lru_cache(maxsize=None)
+def decode_station(code):
+    code = int(code)
+    chars = []
+    while code:
+        code, digit = divmod(code, STATION_BASE)
+        chars.append(STATION_ALPHABET[digit - 1])
+    return "".join(reversed(chars))
+
+
+def datetime_to_hours(datetimes):
+    """
+    Heures écoulées depuis 1970-01-01 (int64). Les datetimes avec fuseau sont ramenés en UTC ;
+    une ValueError est levée pour les valeurs manquantes ou qui ne tombent pas sur une heure pile.
+    """
+    datetimes = pd.Series(datetimes)
+    if not pd.api.types.is_datetime64_any_dtype(datetimes):
+        datetimes = pd.to_datetime(datetimes)
+    if datetimes.dt.tz is not None:
+        datetimes = datetimes.dt.tz_convert("UTC").dt.tz_localize(None)
+    if datetimes.isna().any():
+        raise ValueError("Datetime manquant : impossible de construire la clé")
+
+    nanoseconds = datetimes.to_numpy(dtype="datetime64[ns]").astype("int64")
+    hours, remainder = np.divmod(nanoseconds, NS_PER_HOUR)
+    if remainder.any() or hours.min() < 0 or hours.max() > HOUR_MASK:
+        raise ValueError("Les Datetime doivent être des heures pleines postérieures à 1970")
+    return hours
+
+
+def hours_to_datetime(hours):
+    return pd.to_datetime(np.asarray(hours, dtype="int64") * NS_PER_HOUR)
+
+
+def encode_keys(station_ids, datetimes):
+    """
+    Construit les clés int64 (station, heure) de façon vectorisée : chaque Station ID
+    distinct n'est encodé qu'une fois, puis combiné aux heures par décalage de bits.
+
+    Args:
+    - station_ids (pd.Series | array): Station IDs.
+    - datetimes (pd.Series | array): Datetimes alignés sur l'heure.
+
+    Returns:
+    - np.ndarray: Clés int64, triées d'abord par station puis par heure.
+    """
+    codes, uniques = pd.factorize(pd.Series(station_ids).astype(str))
+    if (codes < 0).any():
+        raise ValueError("Station ID manquant : impossible de construire la clé")
+
+    station_codes = np.array([encode_station(station_id) for station_id in uniques], dtype="int64")
+    return (station_codes[codes] << HOUR_BITS) | datetime_to_hours(datetimes)
+
+
+def decode_keys(keys):
+    """
+    Opération inverse de `encode_keys`.
+
+    Returns:
+    - pd.DataFrame: Colonnes 'Station ID' et 'Datetime'.
+    """
+    keys = np.asarray(keys, dtype="int64")
+    station_codes, inverse = np.unique(keys >> HOUR_BITS, return_inverse=True)
+    station_ids = np.array([decode_station(code) for code in station_codes], dtype="object")
+
+    return pd.DataFrame({
+        "Station ID": station_ids[inverse.ravel()],
+        "Datetime": hours_to_datetime(keys & HOUR_MASK),
+    })
+
+
+def encode_date_id(datetimes):
+    """
+    'Date ID' entier YYYYMMDDHH (même valeur que `strftime('%Y%m%d%H')`, sans passer par du texte).
+    """
+    datetimes = pd.Series(datetimes)
+    return (datetimes.dt.year.to_numpy(dtype="int64") * 1_000_000
+            + datetimes.dt.month.to_numpy(dtype="int64") * 10_000
+            + datetimes.dt.day.to_numpy(dtype="int64") * 100
+            + datetimes.dt.hour.to_numpy(dtype="int64"))
+
+
+def decode_date_id(date_ids):
+    date_ids = np.asarray(date_ids, dtype="int64")
+    return pd.to_datetime(pd.DataFrame({
+        "year": date_ids // 1_000_000,
+        "month": date_ids // 10_000 % 100,
+        "day": date_ids // 100 % 100,
+        "hour": date_ids % 100,
+    }))
+
+
+def add_keys(df, station_column='Station ID', datetime_column='Datetime'):
+    """
+    Renvoie une copie du DataFrame avec 'Unique ID' (clé station/heure) et 'Date ID'
+    en premières colonnes, pour les tables du DW.
+    """
+    df = df.copy()
+    df.insert(0, 'Date ID', encode_date_id(df[datetime_column]))
+    df.insert(0, 'Unique ID', encode_keys(df[station_column], df[datetime_column]))
+    return df
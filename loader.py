@@ -0,0 +1,282 @@
+from imports import *
+from sqlalchemy import or_, and_, true, insert
+from sqlalchemy.dialects import mysql, postgresql, sqlite
+from schemas import to_table_frame
+from time import perf_counter
+import csv
+import os
+import tempfile
+
+# ==============================
+# Configuration
+# ==============================
+STAGING_KEY_COLUMNS = ['Station ID', 'Datetime']
+LOAD_BATCH_ROWS = 5000
+LOAD_MODES = ("upsert", "insert_missing")
+
+# Backends d'écriture des lots : executemany (requête préparée), INSERT multi-lignes, LOAD DATA LOCAL INFILE
+BULK_LOAD_STRATEGIES = ("executemany", "values", "infile")
+BULK_LOAD_DEFAULT = "values"                   # Le plus rapide sur SQLite (voir loader_benchmark.py)
+VALUES_BATCH_ROWS = 1000
+VALUES_MAX_PARAMS = {"sqlite": 32766}          # Autres dialectes : 65535 (limite des placeholders MySQL)
+
+
+def _dialect_insert(engine):
+    """
+    `insert` du dialecte, pour ON DUPLICATE KEY UPDATE (MySQL/MariaDB) ou ON CONFLICT (SQLite/Postgres).
+    """
+    name = engine.dialect.name
+    if name in ("mysql", "mariadb"):
+        return mysql.insert
+    if name == "postgresql":
+        return postgresql.insert
+    if name == "sqlite":
+        return sqlite.insert
+    raise ValueError(f"Dialecte non supporté pour l'upsert : '{name}'")
+
+
+def has_unique_key(engine, table_name, key_columns):
+    """
+    Vérifie que la table a une clé primaire ou une contrainte d'unicité exactement sur `key_columns`.
+    """
+    inspector = inspect(engine)
+    keys = [inspector.get_pk_constraint(table_name).get("constrained_columns") or []]
+    keys += [constraint["column_names"] for constraint in inspector.get_unique_constraints(table_name)]
+    keys += [index["column_names"] for index in inspector.get_indexes(table_name) if index.get("unique")]
+    return any(set(key) == set(key_columns) for key in keys)
+
+
+def _records(df):
+    # NaN/NaT → None et types numpy → types Python, pour le driver
+    return df.astype(object).where(df.notna(), None).to_dict("records")
+
+
+def _load_executemany(conn, table, df):
+    # Une seule requête préparée, exécutée pour toutes les lignes du lot
+    conn.execute(insert(table), _records(df))
+
+
+def _bound_columns(conn, table, df):
+    # Valeurs par colonne, passées par les convertisseurs du type SQLAlchemy (comme pour `execute`)
+    columns = []
+    for col in df.columns:
+        values = df[col].astype(object).where(df[col].notna(), None).tolist()
+        processor = table.c[col].type.dialect_impl(conn.dialect).bind_processor(conn.dialect)
+        columns.append([processor(value) for value in values] if processor else values)
+    return columns
+
+
+def _values_statement(conn, table, columns, rows):
+    preparer = conn.dialect.identifier_preparer
+    placeholder = "?" if conn.dialect.paramstyle == "qmark" else "%s"
+    # Le preparer du dialecte double déjà les '%' des noms quand le driver les interprète
+    # (mysqlclient, pymysql) et les laisse tels quels sinon (mysql-connector)
+    header = f"INSERT INTO {preparer.format_table(table)} ({', '.join(preparer.quote(col) for col in columns)})"
+    row = f"({', '.join([placeholder] * len(columns))})"
+    return f"{header} VALUES {', '.join([row] * rows)}"
+
+
+def _load_values(conn, table, df, rows=VALUES_BATCH_ROWS):
+    # INSERT ... VALUES (...), (...) : `rows` lignes par requête, dans la limite de paramètres du dialecte.
+    # Le texte SQL est construit une fois par taille de bloc (pas de compilation SQLAlchemy par bloc).
+    if conn.dialect.paramstyle not in ("qmark", "format", "pyformat"):
+        return _load_executemany(conn, table, df)
+
+    max_params = VALUES_MAX_PARAMS.get(conn.dialect.name, 65535)
+    rows = max(1, min(rows, max_params // max(len(df.columns), 1)))
+    values = [value for row in zip(*_bound_columns(conn, table, df)) for value in row]
+    width = len(df.columns)
+
+    statements = {}
+    for offset in range(0, len(df), rows):
+        size = min(rows, len(df) - offset)
+        if size not in statements:
+            statements[size] = _values_statement(conn, table, list(df.columns), size)
+        conn.exec_driver_sql(statements[size], tuple(values[offset * width:(offset + size) * width]))
+
+
+def _load_infile(conn, table, df):
+    # Fichier TSV temporaire (NULL = \N) chargé par le serveur ; nécessite local_infile
+    # côté serveur et côté client (mysql-connector : `configure_engines(connect_args={'allow_local_infile': True})`)
+    if conn.dialect.name not in ("mysql", "mariadb"):
+        raise ValueError(f"LOAD DATA LOCAL INFILE n'est pas disponible sur '{conn.dialect.name}'")
+
+    handle, path = tempfile.mkstemp(suffix=".tsv")
+    try:
+        with os.fdopen(handle, "w", newline="", encoding="utf-8") as file:
+            df.to_csv(file, sep="\t", header=False, index=False, na_rep="\\N", lineterminator="\n",
+                      date_format="%Y-%m-%d %H:%M:%S", quoting=csv.QUOTE_NONE)
+
+        columns = ", ".join(f"`{col}`" for col in df.columns)
+        statement = (f"LOAD DATA LOCAL INFILE '{path.replace(os.sep, '/')}' INTO TABLE `{table.name}` "
+                     f"CHARACTER SET utf8mb4 FIELDS TERMINATED BY '\\t' LINES TERMINATED BY '\\n' ({columns})")
+        # no_parameters : les '%' des noms de colonnes ne sont pas interprétés par le driver
+        conn.execution_options(no_parameters=True).exec_driver_sql(statement)
+    finally:
+        os.remove(path)
+
+
+BULK_LOADERS = {
+    "executemany": _load_executemany,
+    "values": _load_values,
+    "infile": _load_infile,
+}
+
+
+def supports_strategy(engine, strategy):
+    return strategy != "infile" or engine.dialect.name in ("mysql", "mariadb")
+
+
+def _check_strategy(strategy):
+    if strategy not in BULK_LOADERS:
+        raise ValueError(f"Stratégie inconnue : '{strategy}' (attendu : {BULK_LOAD_STRATEGIES})")
+
+
+def bulk_load(df, engine, table_name, strategy=BULK_LOAD_DEFAULT, batch_rows=LOAD_BATCH_ROWS, verbose=False):
+    """
+    Ajoute un DataFrame à une table existante (sans contrôle de clé, comme `to_sql(if_exists='append')`)
+    avec le backend `strategy`, un lot par transaction.
+
+    Args:
+    - df (pd.DataFrame): Données à charger (colonnes absentes de la table ignorées).
+    - engine: Engine SQLAlchemy.
+    - table_name (str): Table cible (doit exister).
+    - strategy (str): 'executemany', 'values' ou 'infile' (MySQL/MariaDB uniquement).
+    - batch_rows (int): Lignes par lot.
+
+    Returns:
+    - dict: 'rows', 'batches', 'elapsed_s' et 'rows_per_s'.
+    """
+    _check_strategy(strategy)
+    target = Table(table_name, MetaData(), autoload_with=engine)
+    columns = [column.name for column in target.columns if column.name in df.columns]
+    df = to_table_frame(df[columns], target)
+
+    start = perf_counter()
+    batches = 0
+    with engine.connect() as conn:
+        for offset in range(0, len(df), batch_rows):
+            with conn.begin():
+                BULK_LOADERS[strategy](conn, target, df.iloc[offset:offset + batch_rows])
+            batches += 1
+
+    elapsed = perf_counter() - start
+    report = {"table": table_name, "strategy": strategy, "rows": len(df), "batches": batches,
+              "elapsed_s": elapsed, "rows_per_s": len(df) / elapsed if elapsed else None}
+    if verbose:
+        print(f"✅ {len(df)} lignes ajoutées à '{table_name}' ({strategy}) en {elapsed:.1f}s")
+    return report
+
+
+def _temporary_table(target, metadata):
+    return Table(f"_tmp_{target.name}", metadata,
+                 *[Column(column.name, column.type) for column in target.columns],
+                 prefixes=["TEMPORARY"])
+
+
+def load_dataframe(df, engine, table_name, key_columns=STAGING_KEY_COLUMNS, mode="upsert",
+                   batch_rows=LOAD_BATCH_ROWS, strategy=BULK_LOAD_DEFAULT, verbose=True):
+    """
+    Charge un DataFrame dans une table par lots, en passant par une table temporaire
+    puis une fusion ensembliste côté base (aucune lecture de la table cible en mémoire) :
+    - 'upsert' : INSERT ... SELECT ... ON DUPLICATE KEY UPDATE (MySQL/MariaDB) ou
+      ON CONFLICT DO UPDATE (SQLite/Postgres) ; nécessite une clé unique sur `key_columns` ;
+    - 'insert_missing' : insère seulement les clés absentes (anti-jointure), sans contrainte requise.
+
+    Args:
+    - df (pd.DataFrame): Données à charger (colonnes absentes de la table ignorées).
+    - engine: Engine SQLAlchemy.
+    - table_name (str): Table cible (doit exister).
+    - key_columns (list): Clé composite, par défaut ('Station ID', 'Datetime').
+    - mode (str): 'upsert' ou 'insert_missing'.
+    - batch_rows (int): Lignes par lot.
+    - strategy (str): Backend d'écriture des lots dans la table temporaire (voir `bulk_load`).
+
+    Returns:
+    - dict: Rapport avec, par lot et au total, les lignes insérées, mises à jour et ignorées
+      (déjà présentes et identiques).
+    """
+    if mode not in LOAD_MODES:
+        raise ValueError(f"Mode inconnu : '{mode}' (attendu : {LOAD_MODES})")
+    _check_strategy(strategy)
+
+    key_columns = list(key_columns)
+    metadata = MetaData()
+    target = Table(table_name, metadata, autoload_with=engine)
+
+    missing_keys = [col for col in key_columns if col not in target.c]
+    if missing_keys:
+        raise ValueError(f"Colonnes de clé absentes de '{table_name}' : {missing_keys}")
+    if mode == "upsert" and not has_unique_key(engine, table_name, key_columns):
+        raise ValueError(f"La table '{table_name}' n'a pas de clé primaire/unique sur {key_columns} : "
+                         f"utiliser mode='insert_missing' ou migrer la table.")
+
+    columns = [column.name for column in target.columns if column.name in df.columns]
+    value_columns = [col for col in columns if col not in key_columns]
+
+    # Une seule ligne par clé dans les données chargées (la dernière l'emporte)
+    rows = len(df)
+    df = to_table_frame(df[columns].drop_duplicates(subset=key_columns, keep="last"), target)
+
+    temporary = _temporary_table(target, metadata)
+    join_condition = and_(*[temporary.c[col] == target.c[col] for col in key_columns])
+    changed_condition = or_(*[temporary.c[col].is_distinct_from(target.c[col]) for col in value_columns]) \
+        if value_columns else None
+
+    if mode == "upsert":
+        dialect_insert = _dialect_insert(engine)
+        statement = dialect_insert(target).from_select(columns, select(*[temporary.c[col] for col in columns]).where(true()))
+        if engine.dialect.name in ("mysql", "mariadb"):
+            statement = statement.on_duplicate_key_update({col: statement.inserted[col] for col in value_columns}) \
+                if value_columns else statement.prefix_with("IGNORE")
+        elif value_columns:
+            statement = statement.on_conflict_do_update(index_elements=key_columns,
+                                                        set_={col: statement.excluded[col] for col in value_columns})
+        else:
+            statement = statement.on_conflict_do_nothing(index_elements=key_columns)
+    else:
+        anti_join = temporary.outerjoin(target, join_condition)
+        statement = insert(target).from_select(
+            columns,
+            select(*[temporary.c[col] for col in columns]).select_from(anti_join).where(target.c[key_columns[0]].is_(None))
+        )
+
+    report = {"table": table_name, "mode": mode, "batches": [], "inserted": 0, "updated": 0, "skipped": 0,
+              "duplicates": rows - len(df), "elapsed_s": None}
+    start = perf_counter()
+
+    with engine.connect() as conn:
+        temporary.create(conn)
+        conn.commit()
+        try:
+            for batch_number, offset in enumerate(range(0, len(df), batch_rows), start=1):
+                batch_start = perf_counter()
+                batch = df.iloc[offset:offset + batch_rows]
+
+                with conn.begin():
+                    conn.execute(temporary.delete())
+                    BULK_LOADERS[strategy](conn, temporary, batch)
+
+                    existing = conn.execute(select(func.count()).select_from(temporary.join(target, join_condition))).scalar()
+                    changed = 0
+                    if mode == "upsert" and changed_condition is not None:
+                        changed = conn.execute(select(func.count()).select_from(temporary.join(target, join_condition))
+                                               .where(changed_condition)).scalar()
+
+                    conn.execute(statement)
+
+                batch_report = {"batch": batch_number, "rows": len(batch), "inserted": len(batch) - existing,
+                                "updated": changed, "skipped": existing - changed,
+                                "elapsed_s": perf_counter() - batch_start}
+                report["batches"].append(batch_report)
+                for key in ("inserted", "updated", "skipped"):
+                    report[key] += batch_report[key]
+        finally:
+            temporary.drop(conn)
+            conn.commit()
+
+    report["elapsed_s"] = perf_counter() - start
+    if verbose:
+        print(f"✅ '{table_name}' ({mode}) : {report['inserted']} insérées, {report['updated']} mises à jour, "
+              f"{report['skipped']} ignorées en {len(report['batches'])} lots ({report['elapsed_s']:.1f}s)")
+    return report
@@ -0,0 +1,153 @@
+from imports import *
+from functions import get_station_metadata, parse_buoy_json
+from threading import Lock
+import sqlite3
+import hashlib
+
+# ==============================
+# Configuration
+# ==============================
+METADATA_DB_PATH = ".station_metadata.sqlite"
+METADATA_TTL = timedelta(days=7)
+
+
+class StationMetadataStore:
+    """
+    Cache persistant (SQLite) des métadonnées de stations NDBC, indexé par Station ID.
+
+    On stocke la réponse brute de `get_station_metadata` et le dictionnaire parsé par
+    `parse_buoy_json` (zone, coordonnées, profondeurs, hauteurs). Une entrée plus vieille
+    que `ttl` est re-téléchargée ; si le contenu n'a pas changé on se contente de
+    rafraîchir sa date, et en cas d'erreur réseau on renvoie la dernière version connue.
+    """
+
+    def __init__(self, path=METADATA_DB_PATH, ttl=METADATA_TTL):
+        self.path = path
+        self.ttl = ttl
+        self._lock = Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS station_metadata (
+                station_id TEXT PRIMARY KEY,
+                raw TEXT NOT NULL,
+                parsed TEXT NOT NULL,
+                content_hash TEXT NOT NULL,
+                fetched_at TEXT NOT NULL
+            )
+        """)
+        self._conn.commit()
+
+    def _read(self, station_id):
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT parsed, content_hash, fetched_at FROM station_metadata WHERE station_id = ?",
+                (str(station_id),)
+            ).fetchone()
+        if row is None:
+            return None
+        parsed, content_hash, fetched_at = row
+        return json.loads(parsed), content_hash, datetime.fromisoformat(fetched_at)
+
+    def _write(self, station_id, raw, parsed, content_hash):
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO station_metadata VALUES (?, ?, ?, ?, ?)",
+                (str(station_id), raw, json.dumps(parsed), content_hash, datetime.now().isoformat())
+            )
+            self._conn.commit()
+
+    def _touch(self, station_id):
+        with self._lock:
+            self._conn.execute(
+                "UPDATE station_metadata SET fetched_at = ? WHERE station_id = ?",
+                (datetime.now().isoformat(), str(station_id))
+            )
+            self._conn.commit()
+
+    def is_fresh(self, fetched_at):
+        return datetime.now() - fetched_at < self.ttl
+
+    def has_fresh(self, station_id):
+        cached = self._read(station_id)
+        return cached is not None and self.is_fresh(cached[2])
+
+    def get(self, station_id, refresh=False):
+        """
+        Renvoie le dictionnaire parsé d'une station, depuis le cache s'il est encore valide.
+
+        Args:
+        - station_id (str): ID de la station.
+        - refresh (bool): Force le re-téléchargement même si l'entrée est récente.
+
+        Returns:
+        - dict: Même contenu que `parse_buoy_json`.
+        """
+        cached = self._read(station_id)
+        if cached is not None and not refresh and self.is_fresh(cached[2]):
+            return cached[0]
+
+        try:
+            metadata = get_station_metadata(station_id)
+            raw = json.dumps(metadata, sort_keys=True, default=str)
+            content_hash = hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+            # Contenu identique : pas besoin de re-parser, on prolonge simplement l'entrée
+            if cached is not None and cached[1] == content_hash:
+                self._touch(station_id)
+                return cached[0]
+
+            parsed = parse_buoy_json(metadata)
+            self._write(station_id, raw, parsed, content_hash)
+            return parsed
+
+        except Exception as e:
+            if cached is not None:
+                print(f"⚠️ Métadonnées {station_id} non rafraîchies ({e}), version en cache utilisée.")
+                return cached[0]
+            raise
+
+    def get_many(self, station_ids, refresh=False):
+        """
+        Renvoie {station_id: dict parsé} pour toutes les stations disponibles ;
+        les stations en erreur sont ignorées.
+        """
+        result = {}
+        for station_id in station_ids:
+            try:
+                result[station_id] = self.get(station_id, refresh=refresh)
+            except Exception as e:
+                print(f"❌ Métadonnées indisponibles pour {station_id} : {e}")
+        return result
+
+    def invalidate(self, station_id=None):
+        with self._lock:
+            if station_id is None:
+                self._conn.execute("DELETE FROM station_metadata")
+            else:
+                self._conn.execute("DELETE FROM station_metadata WHERE station_id = ?", (str(station_id),))
+            self._conn.commit()
+
+    def close(self):
+        self._conn.close()
+
+
+_metadata_store = None
+_metadata_store_lock = Lock()
+
+
+def get_metadata_store():
+    """
+    Renvoie le cache de métadonnées partagé, ouvert au premier appel.
+    """
+    global _metadata_store
+    with _metadata_store_lock:
+        if _metadata_store is None:
+            _metadata_store = StationMetadataStore()
+    return _metadata_store
+
+
+def get_station_info(station_id, refresh=False):
+    """
+    Équivalent de `parse_buoy_json(get_station_metadata(station_id))` avec cache local.
+    """
+    return get_metadata_store().get(station_id, refresh=refresh)
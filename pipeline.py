@@ -0,0 +1,617 @@
+from imports import *
+from functions import handle_null_values, convert_coordinate_columns, create_table_in_mysql
+from collector import HostRateLimiter, collect_station, JOIN_TOLERANCE
+from keys import add_keys
+from calendar_dim import add_calendar_columns, calendar_for
+from schemas import apply_schema, float32_to_float64
+from loader import load_dataframe, bulk_load, STAGING_KEY_COLUMNS, BULK_LOAD_DEFAULT
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, wait, FIRST_COMPLETED
+from collections import deque
+from time import perf_counter
+
+# ==============================
+# Configuration
+# ==============================
+PIPELINE_IN_FLIGHT = 8          # Stations en cours de collecte/traitement en même temps
+PIPELINE_BATCH_ROWS = 50_000    # Lignes accumulées avant un flush vers la staging
+PIPELINE_PROCESS_WORKERS = os.cpu_count() or 1   # Processus pour le nettoyage/enrichissement
+PIPELINE_SERIALIZATIONS = ("arrow", "pickle")
+
+# Jointure Marine/Meteo (écart maximal JOIN_TOLERANCE défini dans collector.py, qui filtre aussi les watermarks)
+JOIN_SUFFIXES = ("_x", "_y")          # (Marine, Meteo), comme le `pd.merge` du notebook
+JOIN_DIRECTIONS = ("nearest", "backward", "forward")
+
+STAGING_MARINE_TABLE = "cleaned_marine_data"
+STAGING_METEO_TABLE = "cleaned_meteo_data"
+
+IMPORTANT_COLUMNS_OCEANOGRAPHY = ['wind_direction', 'wind_speed', 'wave_height', 'pressure',
+                                  'air_temperature', 'water_temperature', 'Datetime', 'Lat', 'Lon']
+IMPORTANT_COLUMNS_METEOROLOGY = ['temperature_2m', 'relative_humidity_2m', 'dew_point_2m', 'precipitation',
+                                 'pressure_msl', 'cloud_cover', 'wind_speed_10m', 'Datetime']
+
+# Métadonnées de `parse_buoy_json` non ajoutées comme colonnes
+METADATA_NOT_INCLUDED = ['lon_buoy', 'lat_buoy', 'url']
+
+COLUMNS_TO_RENAME = {
+    'temperature_2m': 'T°(C°)', 'relative_humidity_2m': 'Relative Humidity (%)',
+    'dew_point_2m': 'Dew Point (°C)', 'precipitation': 'Precipitations (mm)',
+    'pressure_msl': 'Sea Level Pressure (hPa)', 'cloud_cover_low': 'Low Clouds (%)',
+    'cloud_cover_mid': 'Middle Clouds (%)', 'cloud_cover_high': 'High Clouds (%)',
+    'visibility': 'Visibility (km)', 'wind_direction': 'Wind Direction (°)',
+    'wind_speed': 'Wind Speed (km/h)', 'wind_gust': 'Wind Gusts (km/h)',
+    'wind_speed_10m': 'Wind Speed (10m)', 'surface_pressure': 'Surface Pressure',
+    'wave_height': 'Wave Height (m)', 'average_wave_period': 'Average Wave Period (s)',
+    'dominant_wave_direction': 'Dominant Wave Direction (°)', 'pressure': 'Pressure (hPa)',
+    'air_temperature': 'Air T°', 'water_temperature': 'Water T° (°C)',
+    'Water_depth': 'Water Depth (m)', 'Air_temp_height': 'Air T° Height (m)',
+    'Anemometer_height': 'Anemometer Height (m)', 'station_zone': 'Station Zone',
+    'Barometer_elevation': 'Barometer Elevation (m)', 'sea_temp_depth': 'Sea Temperature Depth (m)',
+    'cloud_cover': 'Cloud Cover (%)'
+}
+
+COLUMNS_TO_DROP = ['soil_temperature_0cm', 'lat_buoy', 'lon_buoy', 'rain', 'showers', 'is_day',
+                   'soil_moisture_0_to_1cm', 'Wind Speed (km/h)', 'Anemometer Height (m)', 'Pressure (hPa)']
+
+MARINE_STAGING_COLUMNS = ['Datetime', 'Lat', 'Lon', 'Wave Height (m)', 'Average Wave Period (s)',
+                          'Dominant Wave Direction (°)', 'Water T° (°C)', 'Water Depth (m)',
+                          'Station ID', 'Station Zone', 'Sea Temperature Depth (m)',
+                          'Barometer Elevation (m)', 'Sea Level Pressure (hPa)',
+                          'Year', 'Month', 'Day', 'Hour', 'DayOfWeek', 'DayPeriod']
+
+METEO_STAGING_COLUMNS = ['Datetime', 'Lat', 'Lon', 'Wind Direction (°)', 'Wind Gusts (km/h)',
+                         'Station ID', 'Station Zone', 'Sea Temperature Depth (m)',
+                         'Barometer Elevation (m)', 'Air T° Height (m)', 'T°(C°)',
+                         'Relative Humidity (%)', 'Dew Point (°C)', 'Precipitations (mm)',
+                         'Cloud Cover (%)', 'Low Clouds (%)', 'Middle Clouds (%)', 'High Clouds (%)',
+                         'Visibility (km)', 'Wind Speed (10m)',
+                         'Year', 'Month', 'Day', 'Hour', 'DayOfWeek', 'DayPeriod']
+
+# Tables du DW : (clé primaire, colonnes)
+DW_TABLES = {
+    "dim_station": ('Station ID', ['Station ID', 'Station Zone', 'Lat', 'Lon']),
+    "dim_time": ('Date ID', ['Date ID', 'Datetime', 'Year', 'Month', 'DayOfWeek', 'Day', 'Hour', 'DayPeriod']),
+    "facts_meteo": ('Unique ID', ['Unique ID', 'T°(C°)', 'Relative Humidity (%)', 'Dew Point (°C)',
+                                  'Precipitations (mm)', 'Sea Level Pressure (hPa)', 'Low Clouds (%)',
+                                  'Middle Clouds (%)', 'High Clouds (%)', 'Cloud Cover (%)', 'Visibility (km)',
+                                  'Wind Speed (10m)', 'Wind Direction (°)', 'Wind Gusts (km/h)',
+                                  'Barometer Elevation (m)', 'Air T° Height (m)', 'Station ID', 'Date ID', 'Datetime']),
+    "facts_ocean": ('Unique ID', ['Unique ID', 'Wave Height (m)', 'Average Wave Period (s)',
+                                  'Dominant Wave Direction (°)', 'Water T° (°C)', 'Water Depth (m)',
+                                  'Sea Temperature Depth (m)', 'Station ID', 'Date ID', 'Datetime']),
+}
+
+
+# ==============================
+# Étapes par station
+# ==============================
+
+def clean_station(buoy_info):
+    """
+    Nettoie les DataFrames Marine et Meteo d'une station et vérifie les colonnes importantes.
+    Lève une ValueError si une colonne importante manque.
+
+    Même nettoyage que le notebook (`handle_null_values`) et non `clean_dataframe` : ce dernier
+    convertit les colonnes en float avant `convert_coordinate_columns`, ce qui remplace les
+    coordonnées NDBC ('14.51N', '51.25W') par NaN.
+    """
+    cleaned_marine_df = handle_null_values(buoy_info["Marine"])
+    cleaned_meteo_df = handle_null_values(buoy_info["Meteo"])
+
+    missing_marine_columns = [col for col in IMPORTANT_COLUMNS_OCEANOGRAPHY if col not in cleaned_marine_df.columns]
+    missing_meteo_columns = [col for col in IMPORTANT_COLUMNS_METEOROLOGY if col not in cleaned_meteo_df.columns]
+    if missing_marine_columns or missing_meteo_columns:
+        raise ValueError(f"Colonnes manquantes: Marine: {missing_marine_columns}, Meteo: {missing_meteo_columns}")
+
+    return cleaned_marine_df, cleaned_meteo_df
+
+
+def join_marine_meteo(marine_df, meteo_df, by='Station ID', on='Datetime',
+                      tolerance=JOIN_TOLERANCE, direction="nearest", suffixes=JOIN_SUFFIXES):
+    """
+    Jointure temporelle Marine/Meteo en une seule opération pour toutes les stations :
+    chaque heure Open-Meteo reçoit la mesure NDBC la plus proche (ex: 10:50 pour 11:00)
+    de la même station, dans la limite de `tolerance` (`merge_asof` groupé par `by`).
+    On obtient une ligne par station et par heure, datée à l'heure Open-Meteo.
+
+    Args:
+    - marine_df, meteo_df (pd.DataFrame): Tables longues (toutes stations), avec `on` et `by`.
+    - by (str | None): Colonne station (None pour une seule station).
+    - tolerance (str | pd.Timedelta): Écart maximal (0 = correspondance exacte).
+    - direction (str): Mesure retenue pour chaque heure : 'nearest', 'backward' (à l'heure
+      ou avant) ou 'forward' (à l'heure ou après).
+    - suffixes (tuple): Suffixes (Marine, Meteo) des colonnes présentes des deux côtés, qui
+      sont toutes gardées comme avec l'ancien `pd.merge` ('_x', '_y').
+
+    Returns:
+    - tuple: (merged_df, report) ; le rapport donne les lignes perdues de chaque côté
+      et les colonnes communes renommées ('overlapping_columns').
+    """
+    if direction not in JOIN_DIRECTIONS:
+        raise ValueError(f"Direction inconnue : '{direction}' (attendu : {JOIN_DIRECTIONS})")
+
+    marine_row, join_key = "_marine_row", "_join_key"
+
+    # Station ID → code entier, à partir des stations de la table Marine
+    if by is not None:
+        marine_codes, stations = pd.factorize(marine_df[by])
+        meteo_codes = pd.Index(stations).get_indexer(meteo_df[by])
+    else:
+        marine_codes, meteo_codes = np.zeros(len(marine_df), dtype="int64"), np.zeros(len(meteo_df), dtype="int64")
+
+    # Colonnes communes (hors clés) renommées des deux côtés avant la jointure
+    keys = {on} | ({by} if by is not None else set())
+    overlap = [col for col in marine_df.columns if col in meteo_df.columns and col not in keys]
+    marine_df = marine_df.rename(columns={col: f"{col}{suffixes[0]}" for col in overlap})
+    meteo_df = meteo_df.rename(columns={col: f"{col}{suffixes[1]}" for col in overlap})
+
+    left = meteo_df.drop(columns=[by] if by is not None else [])
+    left[join_key] = _asof_key(meteo_codes, meteo_df[on])
+    right = marine_df.drop(columns=[on]).assign(**{marine_row: np.arange(len(marine_df)),
+                                                   join_key: _asof_key(marine_codes, marine_df[on])})
+
+    # Une seule clé triée (station, seconde) : pas de tri si les tables sont déjà rangées par station puis date
+    merged = pd.merge_asof(_sorted_by(left, join_key), _sorted_by(right, join_key), on=join_key,
+                           tolerance=int(pd.Timedelta(tolerance).total_seconds()),
+                           direction=direction)
+    matched = merged[merged[marine_row].notna()]
+
+    # Colonnes dans l'ordre de l'ancien merge : Marine puis Meteo
+    columns = [on] + [col for col in marine_df.columns if col != on] + [col for col in left.columns
+                                                                          if col not in (on, join_key)]
+    result = matched[columns].reset_index(drop=True)
+
+    marine_used = matched[marine_row].nunique()
+    report = {
+        "marine_rows": len(marine_df),
+        "meteo_rows": len(meteo_df),
+        "merged_rows": len(result),
+        "marine_unmatched": len(marine_df) - marine_used,
+        "meteo_unmatched": len(meteo_df) - len(result),
+        "tolerance": str(pd.Timedelta(tolerance)),
+        "direction": direction,
+        "overlapping_columns": overlap,
+    }
+    if by is not None:
+        report["stations_empty"] = sorted(set(marine_df[by].astype(object)) - set(result[by].astype(object)))
+    return result, report
+
+
+def _asof_key(station_codes, datetimes):
+    """
+    Clé int64 (station, secondes depuis 1970) : les stations sont séparées par un écart
+    (2^33 s) bien supérieur à toute tolérance, un `merge_asof` sur cette clé ne peut donc
+    pas associer deux stations différentes.
+    """
+    if getattr(datetimes.dt, "tz", None) is not None:
+        datetimes = datetimes.dt.tz_convert(None)
+    seconds = datetimes.to_numpy(dtype="datetime64[s]").astype("int64")
+    return (np.asarray(station_codes, dtype="int64") << 33) + seconds
+
+
+def _sorted_by(df, column):
+    if df[column].is_monotonic_increasing:
+        return df
+    return df.take(np.argsort(df[column].to_numpy(), kind="stable"))
+
+
+def add_station_metadata(buoy_id, buoy_info, cleaned_marine_df):
+    """
+    Ajoute le Station ID et les métadonnées de la station (zone, profondeurs...) aux données marines.
+    """
+    cleaned_marine_df["Station ID"] = str(buoy_id)
+    for key, value in buoy_info.items():
+        if key not in METADATA_NOT_INCLUDED and not isinstance(value, pd.DataFrame):
+            cleaned_marine_df[key] = value
+    return cleaned_marine_df
+
+
+def merge_station(buoy_id, buoy_info, cleaned_marine_df, cleaned_meteo_df, tolerance=JOIN_TOLERANCE,
+                  direction="nearest"):
+    """
+    Ajoute les métadonnées de la station aux données marines puis fusionne avec la météo
+    (jointure temporelle, voir `join_marine_meteo`).
+    """
+    cleaned_marine_df = add_station_metadata(buoy_id, buoy_info, cleaned_marine_df)
+    cleaned_meteo_df = cleaned_meteo_df.drop(columns="Station ID", errors="ignore")
+    merged_df, _ = join_marine_meteo(cleaned_marine_df, cleaned_meteo_df, by=None,
+                                     tolerance=tolerance, direction=direction)
+    return merged_df
+
+
+def merge_stations(buoy_datas, tolerance=JOIN_TOLERANCE, direction="nearest"):
+    """
+    Remplace la boucle de fusion par station + concaténation du notebook : empile les
+    'Cleaned Marine' / 'Cleaned Meteo' de toutes les stations et les fusionne en une fois.
+
+    Returns:
+    - tuple: (df_final, report)
+    """
+    marine_frames, meteo_frames = [], []
+    for buoy_id, buoy_info in buoy_datas.items():
+        if buoy_info.get("Cleaned Marine") is None or buoy_info.get("Cleaned Meteo") is None:
+            continue
+        marine_frames.append(add_station_metadata(buoy_id, buoy_info, buoy_info["Cleaned Marine"].copy()))
+        meteo_frames.append(buoy_info["Cleaned Meteo"].assign(**{"Station ID": str(buoy_id)}))
+
+    if not marine_frames:
+        raise ValueError("Aucune station nettoyée à fusionner")
+
+    df_final, report = join_marine_meteo(pd.concat(marine_frames, ignore_index=True),
+                                         pd.concat(meteo_frames, ignore_index=True),
+                                         tolerance=tolerance, direction=direction)
+    print(f"📦 Fusion : {report['merged_rows']} lignes | Mesures marines non utilisées : "
+          f"{report['marine_unmatched']} | Heures météo sans mesure : {report['meteo_unmatched']}")
+    return df_final, report
+
+
+def enrich_station(df):
+    """
+    Applique à une station les transformations du notebook (renommage, moyennes
+    NDBC/Open-Meteo, coordonnées décimales, colonnes calendaires) pour obtenir
+    le schéma des tables de staging.
+    """
+    df.columns = [col.strip() for col in df.columns]
+    df = df.rename(columns=COLUMNS_TO_RENAME)
+
+    if 'Visibility (km)' in df.columns and df['Visibility (km)'].mean() > 1000:
+        df['Visibility (km)'] = df['Visibility (km)'] / 1000
+
+    # Moyenne des mesures NDBC et Open-Meteo
+    if 'Air T°' in df.columns:
+        df['T°(C°)'] = (df['Air T°'] + df['T°(C°)']) / 2
+    if 'Surface Pressure' in df.columns:
+        df['Sea Level Pressure (hPa)'] = (df['Sea Level Pressure (hPa)'] + df['Surface Pressure']) / 2
+    if 'dewpoint' in df.columns:
+        df['Dew Point (°C)'] = df['dewpoint']
+    df = df.drop(columns=COLUMNS_TO_DROP + ['Air T°', 'Surface Pressure', 'dewpoint'], errors='ignore')
+
+    # Coordonnées décimales (parsées une fois par position distincte)
+    df = convert_coordinate_columns(df)
+
+    # Colonnes calendaires (lues dans la dimension calendrier)
+    df = add_calendar_columns(df)
+
+    if 'Water Depth (m)' in df.columns:
+        df['Water Depth (m)'] = pd.to_numeric(df['Water Depth (m)'].astype(str).str.replace(r'[^\d.]', '', regex=True), errors='coerce')
+
+    return df.round(2)
+
+
+def split_staging(df):
+    """
+    Sépare une station enrichie en DataFrames Marine et Meteo au format des tables de staging,
+    typés selon les schémas 'marine' et 'meteo' (float32, petits entiers, catégories).
+    """
+    marine = apply_schema(df[[col for col in MARINE_STAGING_COLUMNS if col in df.columns]], "marine")
+    meteo = apply_schema(df[[col for col in METEO_STAGING_COLUMNS if col in df.columns]], "meteo")
+    return marine, meteo
+
+
+def build_dw_tables(df):
+    """
+    Construit les DataFrames des tables du DW (dimensions + faits) à partir des données
+    enrichies, avec les clés entières 'Unique ID' (station, heure) et 'Date ID' (YYYYMMDDHH)
+    de `keys.add_keys`. Les doublons sont éliminés sur la clé primaire de chaque table.
+
+    Returns:
+    - dict: {nom de table: DataFrame}
+    """
+    df = add_keys(df)
+    tables = {}
+    for table_name, (primary_key, columns) in DW_TABLES.items():
+        columns = [col for col in columns if col in df.columns]
+        tables[table_name] = df[columns].drop_duplicates(subset=primary_key).reset_index(drop=True)
+
+    # dim_time : lignes de la dimension calendrier pour les heures présentes
+    tables["dim_time"] = calendar_for(df['Datetime'])
+    return tables
+
+
+def load_dw_tables(df, engine, mode="upsert", strategy=BULK_LOAD_DEFAULT):
+    """
+    Charge les données enrichies dans les tables du DW construites par `build_dw_tables` :
+    chaque table est créée au besoin avec sa clé primaire entière ('Unique ID', 'Date ID')
+    ou 'Station ID', puis alimentée par `loader.load_dataframe` sur cette même clé.
+
+    Args:
+    - df (pd.DataFrame): Données enrichies (Marine + Meteo + calendrier).
+    - engine: Engine du DW.
+    - mode (str): 'upsert' ou 'insert_missing'.
+    - strategy (str): Backend de chargement (voir `loader.bulk_load`).
+
+    Returns:
+    - dict: {nom de table: rapport de `load_dataframe`}
+    """
+    reports = {}
+    for table_name, table_df in build_dw_tables(df).items():
+        primary_key = [DW_TABLES[table_name][0]]
+        create_table_in_mysql(table_df, table_name, engine, primary_key=primary_key, indexes=[])
+        reports[table_name] = load_dataframe(table_df, engine, table_name, key_columns=primary_key,
+                                             mode=mode, strategy=strategy)
+    return reports
+
+
+def process_station(buoy_id, buoy_info):
+    """
+    Nettoyage → fusion → enrichissement pour une station déjà collectée.
+
+    Returns:
+    - tuple: (marine_df, meteo_df) prêts pour la staging.
+    """
+    cleaned_marine_df, cleaned_meteo_df = clean_station(buoy_info)
+    merged_df = merge_station(buoy_id, buoy_info, cleaned_marine_df, cleaned_meteo_df)
+    if merged_df.empty:
+        raise ValueError("Résultat vide après la jointure sur 'Datetime'")
+    return split_staging(enrich_station(merged_df))
+
+
+# ==============================
+# Parallélisme (processus)
+# ==============================
+
+def frame_to_ipc(df):
+    """
+    Sérialise un DataFrame au format Arrow IPC (stream), types pandas conservés
+    (catégories, float32, datetime64).
+    """
+    import pyarrow as pa
+
+    table = pa.Table.from_pandas(df, preserve_index=None)
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return sink.getvalue().to_pybytes()
+
+
+def frame_from_ipc(payload):
+    import pyarrow as pa
+
+    return pa.ipc.open_stream(payload).read_all().to_pandas()
+
+
+def _encode_frames(data, serialization):
+    """
+    Remplace les DataFrames d'un dictionnaire par leur version Arrow IPC. Un DataFrame
+    que Arrow ne sait pas convertir (colonne objet aux types mélangés) reste picklé.
+    """
+    if serialization != "arrow":
+        return data
+    encoded = {}
+    for key, value in data.items():
+        if isinstance(value, pd.DataFrame):
+            try:
+                value = ("ipc", frame_to_ipc(value))
+            except Exception:
+                pass
+        encoded[key] = value
+    return encoded
+
+
+def _decode_frames(data):
+    return {
+        key: frame_from_ipc(value[1]) if isinstance(value, tuple) and len(value) == 2 and value[0] == "ipc" else value
+        for key, value in data.items()
+    }
+
+
+def _process_station_worker(buoy_id, payload, serialization):
+    """
+    Tâche exécutée dans un processus : renvoie ("ok", frames) ou ("error", message),
+    pour que les erreurs restent rattachées à leur station sans interrompre le lot.
+    """
+    try:
+        marine_df, meteo_df = process_station(buoy_id, _decode_frames(payload))
+        return "ok", _encode_frames({"Marine": marine_df, "Meteo": meteo_df}, serialization)
+    except Exception as e:
+        return "error", str(e)
+
+
+def _station_payload(buoy_info):
+    # Seules les colonnes utiles au nettoyage partent vers le processus (pas les DataFrames nettoyés du notebook)
+    return {key: value for key, value in buoy_info.items() if key not in ("Cleaned Marine", "Cleaned Meteo")}
+
+
+def process_stations(buoy_datas, workers=PIPELINE_PROCESS_WORKERS, serialization="arrow"):
+    """
+    Applique `process_station` à toutes les stations de `buoy_datas`, réparties sur
+    `workers` processus. Les DataFrames circulent en Arrow IPC et les résultats sont
+    rendus dans l'ordre de `buoy_datas`, identiques au chemin séquentiel (`workers=1`).
+
+    Args:
+    - buoy_datas (dict): {station_id: buoy_info} avec 'Marine' et 'Meteo'.
+    - workers (int): Nombre de processus (1 = séquentiel, dans le processus courant).
+    - serialization (str): 'arrow' (Arrow IPC) ou 'pickle'.
+
+    Returns:
+    - tuple: ({station_id: (marine_df, meteo_df)}, {station_id: erreur})
+    """
+    if serialization not in PIPELINE_SERIALIZATIONS:
+        raise ValueError(f"Sérialisation inconnue : '{serialization}' (attendu : {PIPELINE_SERIALIZATIONS})")
+
+    results, ignored = {}, {}
+
+    if workers <= 1:
+        for buoy_id, buoy_info in buoy_datas.items():
+            try:
+                results[buoy_id] = process_station(buoy_id, buoy_info)
+            except Exception as e:
+                ignored[buoy_id] = str(e)
+        return results, ignored
+
+    buoy_ids = list(buoy_datas)
+    payloads = (_encode_frames(_station_payload(buoy_datas[buoy_id]), serialization) for buoy_id in buoy_ids)
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        outputs = executor.map(_process_station_worker, buoy_ids, payloads,
+                               [serialization] * len(buoy_ids))
+        for buoy_id, (status, output) in zip(buoy_ids, outputs):
+            if status == "ok":
+                frames = _decode_frames(output)
+                results[buoy_id] = (frames["Marine"], frames["Meteo"])
+            else:
+                ignored[buoy_id] = output
+
+    print(f"✅ {len(results)} stations traitées sur {workers} processus | ignorées : {len(ignored)}")
+    return results, ignored
+
+
+# ==============================
+# Streaming
+# ==============================
+
+def iter_collected_stations(station_ids, in_flight=PIPELINE_IN_FLIGHT, rate_limits=None, watermarks=None):
+    """
+    Générateur : collecte les stations avec au plus `in_flight` stations en mémoire
+    à la fois, et les renvoie au fur et à mesure (ordre d'arrivée).
+
+    Yields:
+    - tuple: (buoy_id, buoy_info, timings)
+    """
+    limiter = HostRateLimiter(rate_limits)
+    watermarks = watermarks or {}
+    station_ids = iter(station_ids)
+
+    with ThreadPoolExecutor(max_workers=in_flight) as executor:
+        pending = {}
+
+        def submit_next():
+            buoy_id = next(station_ids, None)
+            if buoy_id is not None:
+                future = executor.submit(collect_station, buoy_id, None, limiter, watermarks.get(str(buoy_id)))
+                pending[future] = buoy_id
+
+        for _ in range(in_flight):
+            submit_next()
+
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                buoy_id = pending.pop(future)
+                buoy_info, timings = future.result()
+                submit_next()
+                yield buoy_id, buoy_info, timings
+
+
+def sql_sink(engine, mode=None, key_columns=STAGING_KEY_COLUMNS, strategy=BULK_LOAD_DEFAULT):
+    """
+    Sink par défaut : ajoute le lot dans la table de staging (créée au besoin d'après
+    tables.py) avec le backend de chargement `strategy` ('executemany', 'values' ou
+    'infile', voir `loader.bulk_load`). Avec `mode` ('upsert' ou 'insert_missing'), le lot
+    passe par `loader.load_dataframe` sur la clé `key_columns`, ce qui rend les
+    rechargements idempotents.
+    """
+    import tables
+
+    created = set()
+
+    def sink(df, table_name):
+        table = tables.metadata.tables.get(table_name)
+        if table is None:
+            float32_to_float64(df).to_sql(name=table_name, con=engine, if_exists='append', index=False, chunksize=1000)
+            return
+
+        if table_name not in created:
+            table.create(engine, checkfirst=True)
+            created.add(table_name)
+
+        if mode is not None:
+            load_dataframe(df, engine, table_name, key_columns=key_columns, mode=mode, strategy=strategy)
+        else:
+            bulk_load(df, engine, table_name, strategy=strategy)
+    return sink
+
+
+def run_pipeline(station_ids, sink, in_flight=PIPELINE_IN_FLIGHT, batch_rows=PIPELINE_BATCH_ROWS,
+                 marine_table=STAGING_MARINE_TABLE, meteo_table=STAGING_METEO_TABLE,
+                 rate_limits=None, watermarks=None, process_workers=1, serialization="arrow"):
+    """
+    Pipeline en flux par station (collecte → nettoyage → fusion → enrichissement → chargement)
+    à mémoire bornée : seules `in_flight` stations brutes et au plus `batch_rows` lignes
+    transformées sont gardées en mémoire, quel que soit le nombre de bouées suivies.
+
+    Args:
+    - station_ids (iterable): IDs des stations.
+    - sink (callable): `sink(df, table_name)` appelé à chaque flush (ex: `sql_sink(engine_staging)`).
+    - in_flight (int): Nombre de stations traitées en parallèle.
+    - batch_rows (int): Nombre de lignes accumulées avant un flush.
+    - process_workers (int): Processus pour le nettoyage/enrichissement (1 = dans le processus
+      courant) ; les stations restent chargées dans leur ordre de collecte.
+    - serialization (str): 'arrow' ou 'pickle', pour l'envoi des DataFrames aux processus.
+
+    Returns:
+    - dict: Rapport (stations traitées/ignorées, lignes chargées, nombre de flushs, durée).
+    """
+    report = {"stations_ok": 0, "stations_ignored": {}, "marine_rows": 0, "meteo_rows": 0,
+              "flushes": 0, "elapsed_s": None}
+    buffers = {marine_table: [], meteo_table: []}
+    buffered_rows = 0
+    start = perf_counter()
+
+    def flush():
+        nonlocal buffered_rows
+        for table_name, frames in buffers.items():
+            if frames:
+                batch = pd.concat(frames, ignore_index=True)
+                sink(batch, table_name)
+                frames.clear()
+        report["flushes"] += 1
+        print(f"💾 Flush #{report['flushes']} : {buffered_rows} lignes chargées")
+        buffered_rows = 0
+
+    def add_station(buoy_id, marine_df, meteo_df):
+        nonlocal buffered_rows
+        buffers[marine_table].append(marine_df)
+        buffers[meteo_table].append(meteo_df)
+        buffered_rows += len(marine_df)
+        report["stations_ok"] += 1
+        report["marine_rows"] += len(marine_df)
+        report["meteo_rows"] += len(meteo_df)
+
+        if buffered_rows >= batch_rows:
+            flush()
+
+    # Stations envoyées aux processus, récupérées dans l'ordre d'envoi
+    executor = ProcessPoolExecutor(max_workers=process_workers) if process_workers > 1 else None
+    pending = deque()
+
+    def drain(max_pending):
+        while len(pending) > max_pending:
+            buoy_id, future = pending.popleft()
+            status, output = future.result()
+            if status == "ok":
+                frames = _decode_frames(output)
+                add_station(buoy_id, frames["Marine"], frames["Meteo"])
+            else:
+                report["stations_ignored"][buoy_id] = output
+
+    try:
+        for buoy_id, buoy_info, timings in iter_collected_stations(station_ids, in_flight, rate_limits, watermarks):
+            if buoy_info is None or buoy_info.get("Marine") is None or buoy_info.get("Meteo") is None:
+                report["stations_ignored"][buoy_id] = timings.get("error") or timings["status"]
+                continue
+
+            if executor is not None:
+                payload = _encode_frames(_station_payload(buoy_info), serialization)
+                pending.append((buoy_id, executor.submit(_process_station_worker, buoy_id, payload, serialization)))
+                drain(process_workers)
+                continue
+
+            try:
+                marine_df, meteo_df = process_station(buoy_id, buoy_info)
+            except Exception as e:
+                report["stations_ignored"][buoy_id] = str(e)
+                continue
+            add_station(buoy_id, marine_df, meteo_df)
+
+        drain(0)
+    finally:
+        if executor is not None:
+            executor.shutdown(cancel_futures=True)
+
+    if buffered_rows:
+        flush()
+
+    report["elapsed_s"] = perf_counter() - start
+    print(f"\n📊 Stations chargées : {report['stations_ok']} | ignorées : {len(report['stations_ignored'])}")
+    print(f"📊 Lignes : Marine {report['marine_rows']}, Météo {report['meteo_rows']} en {report['elapsed_s']:.1f}s")
+    return report
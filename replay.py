@@ -0,0 +1,155 @@
+from imports import *
+from contextlib import contextmanager
+from time import perf_counter, sleep
+import gzip
+import hashlib
+import pickle
+
+# ==============================
+# Configuration
+# ==============================
+REPLAY_FIXTURE_DIR = "fixtures"
+REPLAY_MODES = ("record", "replay")
+
+_MISSING = object()
+
+
+class FixtureNotFound(LookupError):
+    pass
+
+
+def _replay_targets():
+    """
+    Appels externes enregistrés/rejoués : (objet, attribut, nom de la source).
+    """
+    import functions
+    import visual_crossing
+
+    return [
+        (NDBC, "realtime_observations", "ndbc_realtime"),
+        (api, "station", "ndbc_station"),
+        (api, "stations", "ndbc_stations"),
+        (functions, "meteo_api_request", "openmeteo"),
+        (visual_crossing, "fetch_vc_timeline", "visual_crossing"),
+    ]
+
+
+class ReplaySession:
+    """
+    Enregistre les réponses des sources externes (NDBC, Open-Meteo, Visual Crossing) dans
+    des fixtures compressées, ou les rejoue sans réseau pour exécuter et chronométrer
+    le pipeline hors-ligne.
+
+    Args:
+    - mode (str): 'record' (appels réels + sauvegarde) ou 'replay' (lecture seule).
+    - fixture_dir (str): Dossier des fixtures (un sous-dossier par source).
+    - latency: Latence simulée en replay : None, un nombre de secondes, ou "recorded"
+      pour rejouer la durée mesurée pendant l'enregistrement.
+    - latency_scale (float): Facteur appliqué à la latence enregistrée.
+    """
+
+    def __init__(self, mode, fixture_dir=REPLAY_FIXTURE_DIR, latency=None, latency_scale=1.0):
+        if mode not in REPLAY_MODES:
+            raise ValueError(f"Mode inconnu : '{mode}' (attendu : {REPLAY_MODES})")
+
+        self.mode = mode
+        self.fixture_dir = fixture_dir
+        self.latency = latency
+        self.latency_scale = latency_scale
+        self.counts = {"recorded": 0, "replayed": 0}
+        self._patches = []
+
+    def fixture_path(self, source, args, kwargs):
+        key = repr((args, sorted(kwargs.items())))
+        digest = hashlib.sha1(key.encode("utf-8")).hexdigest()
+        return os.path.join(self.fixture_dir, source, f"{digest}.pkl.gz")
+
+    def _record(self, source, func, args, kwargs):
+        path = self.fixture_path(source, args, kwargs)
+        start = perf_counter()
+        try:
+            result, error = func(*args, **kwargs), None
+        except Exception as e:
+            result, error = None, e
+        elapsed = perf_counter() - start
+
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with gzip.open(path, "wb") as file:
+            pickle.dump({"source": source, "args": args, "kwargs": kwargs,
+                         "result": result, "error": error, "elapsed_s": elapsed}, file)
+        self.counts["recorded"] += 1
+
+        if error is not None:
+            raise error
+        return result
+
+    def _replay(self, source, args, kwargs):
+        path = self.fixture_path(source, args, kwargs)
+        if not os.path.exists(path):
+            raise FixtureNotFound(f"Aucune fixture '{source}' pour args={args!r} kwargs={kwargs!r}")
+
+        with gzip.open(path, "rb") as file:
+            fixture = pickle.load(file)
+
+        if self.latency == "recorded":
+            sleep(fixture["elapsed_s"] * self.latency_scale)
+        elif self.latency:
+            sleep(self.latency)
+
+        self.counts["replayed"] += 1
+        if fixture["error"] is not None:
+            raise fixture["error"]
+        return fixture["result"]
+
+    def _wrap(self, source, func):
+        def wrapper(*args, **kwargs):
+            if self.mode == "record":
+                return self._record(source, func, args, kwargs)
+            return self._replay(source, args, kwargs)
+
+        wrapper.__wrapped__ = func
+        return wrapper
+
+    def install(self):
+        for owner, name, source in _replay_targets():
+            original = getattr(owner, name)
+            raw = owner.__dict__.get(name, _MISSING) if hasattr(owner, "__dict__") else _MISSING
+            wrapper = self._wrap(source, original)
+
+            # Méthode de classe (ex: NDBC.realtime_observations) : remplacée par une staticmethod
+            setattr(owner, name, staticmethod(wrapper) if isinstance(owner, type) else wrapper)
+            self._patches.append((owner, name, raw))
+
+            # Remplacer aussi les copies importées par nom (`from functions import ...`)
+            for module in list(sys.modules.values()):
+                if module is not owner and getattr(module, name, None) is original:
+                    setattr(module, name, wrapper)
+                    self._patches.append((module, name, original))
+        return self
+
+    def uninstall(self):
+        for owner, name, raw in reversed(self._patches):
+            if raw is _MISSING:
+                delattr(owner, name)
+            else:
+                setattr(owner, name, raw)
+        self._patches = []
+
+
+@contextmanager
+def replay_mode(mode, fixture_dir=REPLAY_FIXTURE_DIR, latency=None, latency_scale=1.0):
+    """
+    Active l'enregistrement ou le rejeu des sources externes le temps d'un bloc :
+
+        with replay_mode("record"):
+            buoy_datas, timings = collect_buoy_datas(stations_df["Station"])
+
+        with replay_mode("replay", latency="recorded"):
+            buoy_datas, timings = collect_buoy_datas(stations_df["Station"])
+    """
+    session = ReplaySession(mode, fixture_dir, latency=latency, latency_scale=latency_scale).install()
+    try:
+        yield session
+    finally:
+        session.uninstall()
+        print(f"🎞️ Replay ({mode}) : {session.counts['recorded']} enregistrés, {session.counts['replayed']} rejoués")
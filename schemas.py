@@ -0,0 +1,285 @@
+from imports import *
+from functools import lru_cache
+from sqlalchemy import Enum as SqlEnum, Numeric, SmallInteger
+from sqlalchemy.dialects import mysql
+from api.models import MarineNumericFields, MarineNonNumericFields, MeteoNumericFields, MeteoNonNumericFields
+from calendar_dim import MONTH_NAMES, DAY_NAMES, DAY_PERIODS
+
+# ==============================
+# Configuration
+# ==============================
+# Type en mémoire des champs numériques des enums (tables : Float)
+NUMERIC_DTYPE = "float32"
+
+# Type en mémoire des champs non numériques, par nom de membre d'enum
+NON_NUMERIC_DTYPES = {
+    "datetime": "datetime64[ns]",
+    "lat": "float32",
+    "lon": "float32",
+    "station_id": "category",
+    "station_zone": "category",
+    "sea_temp_depth": "float32",
+    "baro_elevation": "float32",
+    "air_temp_height": "float32",
+    "year": "int16",
+    "month": pd.CategoricalDtype(MONTH_NAMES, ordered=True),
+    "day": "int8",
+    "hour": "int8",
+    "day_of_week": pd.CategoricalDtype(DAY_NAMES, ordered=True),
+    "day_period": pd.CategoricalDtype(DAY_PERIODS),
+}
+
+# Nom du schéma → (nom de la table dans tables.py, enum numérique, enum non numérique)
+SCHEMA_SOURCES = {
+    "marine": ("cleaned_marine_data", MarineNumericFields, MarineNonNumericFields),
+    "meteo": ("cleaned_meteo_data", MeteoNumericFields, MeteoNonNumericFields),
+}
+
+
+def build_schema(table, numeric_fields, non_numeric_fields):
+    """
+    Construit le schéma {colonne: dtype} d'une table SQLAlchemy : les champs de l'enum
+    numérique passent en float32, les autres selon NON_NUMERIC_DTYPES. Une colonne de la
+    table absente des enums lève une ValueError (table et enums désynchronisés).
+    """
+    dtypes = {field.value: NUMERIC_DTYPE for field in numeric_fields}
+    dtypes.update({field.value: NON_NUMERIC_DTYPES[field.name] for field in non_numeric_fields})
+
+    missing = [column.name for column in table.columns if column.name not in dtypes]
+    if missing:
+        raise ValueError(f"Colonnes de '{table.name}' absentes des enums de api/models.py : {missing}")
+
+    return {column.name: dtypes[column.name] for column in table.columns}
+
+
+@lru_cache(maxsize=None)
+def get_schema(name):
+    """
+    Schéma 'marine' ou 'meteo', dérivé des tables de staging de tables.py et des enums de l'API.
+    """
+    import tables
+
+    table_name, numeric_fields, non_numeric_fields = SCHEMA_SOURCES[name]
+    return build_schema(getattr(tables, table_name), numeric_fields, non_numeric_fields)
+
+
+def _cast(series, dtype):
+    if isinstance(dtype, pd.CategoricalDtype) or dtype == "category":
+        return series.astype(dtype)
+    if dtype == "datetime64[ns]":
+        return pd.to_datetime(series, errors="coerce")
+
+    values = pd.to_numeric(series, errors="coerce")
+    if dtype.startswith("int") and values.isna().any():
+        dtype = dtype.capitalize()  # Entier nullable (Int8, Int16...)
+    return values.astype(dtype)
+
+
+def apply_schema(df, schema):
+    """
+    Convertit en une fois les colonnes présentes du DataFrame vers les types du schéma
+    (float32, petits entiers, catégories). Les autres colonnes sont laissées telles quelles.
+
+    Args:
+    - df (pd.DataFrame): DataFrame à typer.
+    - schema (dict | str): Schéma {colonne: dtype} ou nom ('marine', 'meteo').
+
+    Returns:
+    - pd.DataFrame: Copie typée.
+    """
+    if isinstance(schema, str):
+        schema = get_schema(schema)
+
+    df = df.copy()
+    for col, dtype in schema.items():
+        if col in df.columns and df[col].dtype != dtype:
+            df[col] = _cast(df[col], dtype)
+    return df
+
+
+def float32_to_float64(df):
+    """
+    Passe les colonnes float32 en float64 arrondis à la plus courte écriture décimale du
+    float32 (17.88 et non 17.8799991607666), pour que les colonnes DOUBLE (SQLite, Postgres...)
+    reçoivent la valeur arrondie et non le bruit de la conversion binaire.
+    """
+    df = df.copy()
+    for col in [col for col, dtype in df.dtypes.items() if dtype == "float32"]:
+        df[col] = df[col].astype(str).astype("float64")
+    return df
+
+
+def to_table_frame(df, table):
+    """
+    Prépare un DataFrame typé pour une table SQL : les colonnes stockées en String
+    (ex: Lat, Year) sont écrites sous forme de texte court ('14.51', '2025'), les
+    float32 repassent en float64 arrondis (`float32_to_float64`) et les manquants en NULL.
+    """
+    df = float32_to_float64(df)
+    for column in table.columns:
+        if column.name in df.columns and isinstance(column.type, String) and df[column.name].dtype != object:
+            values = df[column.name]
+            df[column.name] = values.astype(str).where(values.notna(), None)
+    return df
+
+
+# ==============================
+# Types SQL (DDL)
+# ==============================
+# Le typage ne dépend que du domaine connu des colonnes, jamais de l'échantillon : un lot
+# suivant (nouvelle station, valeur plus grande, décimale de plus) doit toujours entrer.
+TINYINT = SmallInteger().with_variant(mysql.TINYINT(), "mysql", "mariadb")
+
+# Colonnes calendaires : entiers courts et ENUM de toutes les valeurs possibles
+CALENDAR_SQL_TYPES = {
+    "Year": lambda: SmallInteger(),
+    "Day": lambda: TINYINT,
+    "Hour": lambda: TINYINT,
+    "Month": lambda: _enum("Month", MONTH_NAMES),
+    "DayOfWeek": lambda: _enum("DayOfWeek", DAY_NAMES),
+    "DayPeriod": lambda: _enum("DayPeriod", DAY_PERIODS),
+}
+
+# Coordonnées : DECIMAL fixe (±90.00000 / ±180.00000, précision ~1 m)
+COORDINATE_SQL_TYPES = {
+    "Lat": lambda: Numeric(8, 5),
+    "Lon": lambda: Numeric(9, 5),
+}
+
+# Textes : largeur fixe par colonne (clé courte pour les identifiants), VARCHAR(255) pour les autres
+# (zones et noms NDBC de longueur libre)
+STATION_ID_LENGTH = 16                          # IDs NDBC : au plus 7 caractères (keys.STATION_MAX_LENGTH)
+TEXT_SQL_TYPES = {
+    "Station ID": lambda: String(STATION_ID_LENGTH),
+}
+
+MYSQL_CHARSET_BYTES = 4                         # utf8mb4
+
+
+def legacy_sql_type(dtype):
+    """
+    Type SQL historique de `create_table_in_mysql` pour un dtype pandas.
+    """
+    if dtype == 'int64':
+        return BigInteger()
+    if dtype in ['float32', 'float64']:
+        return Float()
+    if pd.api.types.is_datetime64_any_dtype(dtype):
+        return DateTime()
+    if dtype == 'timedelta64[ns]':
+        return Time()
+    if dtype == 'bool':
+        return Boolean()
+    return String(255)
+
+
+def decimal_bytes(precision, scale):
+    # Stockage DECIMAL MySQL : 4 octets par groupe de 9 chiffres, de chaque côté de la virgule
+    leftover = [0, 1, 1, 2, 2, 3, 3, 4, 4, 4]
+
+    def digits_bytes(digits):
+        return digits // 9 * 4 + leftover[digits % 9]
+
+    return digits_bytes(precision - scale) + digits_bytes(scale)
+
+
+def sql_type_bytes(sql_type, avg_length=0.0):
+    """
+    Taille estimée d'une valeur dans une ligne InnoDB (hors NULL), d'après le type MySQL.
+    """
+    mysql_type = sql_type.dialect_impl(mysql.dialect())
+
+    if isinstance(mysql_type, SqlEnum):
+        return 1 if len(mysql_type.enums) <= 255 else 2
+    if isinstance(mysql_type, String):
+        length = mysql_type.length or 255
+        return avg_length + (1 if length * MYSQL_CHARSET_BYTES <= 255 else 2)
+    if isinstance(mysql_type, (mysql.TINYINT, Boolean)):
+        return 1
+    if isinstance(mysql_type, BigInteger):
+        return 8
+    if isinstance(mysql_type, SmallInteger):
+        return 2
+    if isinstance(mysql_type, Integer):
+        return 4
+    if isinstance(mysql_type, Numeric) and not isinstance(mysql_type, Float):
+        return decimal_bytes(mysql_type.precision, mysql_type.scale)
+    if isinstance(mysql_type, Float):
+        return 8 if (mysql_type.precision or 0) > 24 else 4
+    if isinstance(mysql_type, DateTime):
+        fsp = getattr(mysql_type, "fsp", None) or 0
+        return 5 + (fsp + 1) // 2
+    if isinstance(mysql_type, Time):
+        return 3
+    return 8
+
+
+def _enum(column_name, values):
+    name = "enum_" + "".join(char if char.isalnum() else "_" for char in str(column_name).lower())
+    return SqlEnum(*values, name=name, native_enum=True, create_constraint=False)
+
+
+def infer_sql_type(series):
+    """
+    Type SQL d'une colonne, plus étroit que le typage historique là où le domaine est connu :
+    - colonnes calendaires : SMALLINT (Year), TINYINT (Day, Hour), ENUM complet (Month, DayOfWeek, DayPeriod) ;
+    - coordonnées (Lat, Lon) : DECIMAL(8,5) / DECIMAL(9,5) ;
+    - textes : VARCHAR de largeur fixe par colonne (Station ID : 16, autres : 255).
+    Les autres colonnes gardent le typage historique (BIGINT, FLOAT, DATETIME...).
+
+    Returns:
+    - sqlalchemy type
+    """
+    name = series.name
+    dtype = series.dtype
+    values = series.dropna()
+
+    if name in CALENDAR_SQL_TYPES:
+        return CALENDAR_SQL_TYPES[name]()
+
+    if name in COORDINATE_SQL_TYPES and pd.to_numeric(values.astype(str), errors="coerce").notna().all():
+        return COORDINATE_SQL_TYPES[name]()
+
+    if name in TEXT_SQL_TYPES and legacy_sql_type(dtype).__class__ is String:
+        return TEXT_SQL_TYPES[name]()
+
+    return legacy_sql_type(dtype)
+
+
+def infer_table_types(df, skip=()):
+    """
+    Infère le type SQL de chaque colonne d'un DataFrame et compare la taille estimée
+    d'une ligne MySQL avec le typage historique (String(255), BigInteger, Float...).
+
+    Args:
+    - df (pd.DataFrame): Données représentatives de la table.
+    - skip (iterable): Colonnes à garder avec le typage historique.
+
+    Returns:
+    - tuple: ({colonne: type SQLAlchemy}, pd.DataFrame rapport par colonne : 'legacy_type',
+      'sql_type', 'legacy_bytes', 'bytes', 'saved_bytes' ; total dans `attrs['saved_bytes_per_row']`).
+    """
+    types = {}
+    rows = []
+    for column in df.columns:
+        series = df[column]
+        legacy = legacy_sql_type(series.dtype)
+        sql_type = legacy if column in skip else infer_sql_type(series)
+        types[column] = sql_type
+
+        texts = series.dropna().astype(str)
+        avg_length = float(texts.str.len().mean()) if len(texts) else 0.0
+        legacy_bytes = sql_type_bytes(legacy, avg_length)
+        new_bytes = sql_type_bytes(sql_type, avg_length)
+        rows.append({
+            "column": column,
+            "legacy_type": str(legacy.compile(dialect=mysql.dialect())),
+            "sql_type": str(sql_type.compile(dialect=mysql.dialect())),
+            "legacy_bytes": round(legacy_bytes, 1),
+            "bytes": round(new_bytes, 1),
+            "saved_bytes": round(legacy_bytes - new_bytes, 1),
+        })
+
+    report = pd.DataFrame(rows).set_index("column") if rows else pd.DataFrame()
+    report.attrs["saved_bytes_per_row"] = float(report["saved_bytes"].sum()) if rows else 0.0
+    return types, report
@@ -0,0 +1,159 @@
+from imports import *
+from functions import get_buoy_url, build_chrome_options, wait_page_to_load
+from http_client import http_get
+from concurrent.futures import ThreadPoolExecutor
+from threading import Lock
+from time import perf_counter
+import queue
+
+# ==============================
+# Configuration
+# ==============================
+SCRAPER_MAX_WORKERS = 8
+BROWSER_POOL_SIZE = 2
+BROWSER_ACQUIRE_TIMEOUT = 60    # s d'attente max d'un navigateur libre
+
+# Section recherchée sur les pages de stations NDBC
+METADATA_SECTION = {"name": "section", "id": "stationmetadata", "class_": "metadata"}
+
+
+def extract_metadata_section(html):
+    """
+    Extrait la section de métadonnées d'une page de station (None si absente).
+    """
+    soup = BeautifulSoup(html, "html.parser")
+    return soup.find(METADATA_SECTION["name"], id=METADATA_SECTION["id"], class_=METADATA_SECTION["class_"])
+
+
+class BrowserPool:
+    """
+    Petit pool de navigateurs Chrome headless réutilisés, uniquement pour les pages
+    qui ont réellement besoin de JavaScript. Les drivers sont créés à la demande
+    (au plus `size`) et fermés par `close()`.
+    """
+
+    def __init__(self, size=BROWSER_POOL_SIZE, acquire_timeout=BROWSER_ACQUIRE_TIMEOUT):
+        self.size = size
+        self.acquire_timeout = acquire_timeout
+        self._drivers = queue.Queue()
+        self._created = 0
+        self._lock = Lock()
+
+    def _launch(self):
+        driver = webdriver.Chrome(options=build_chrome_options())
+        driver.implicitly_wait(2)
+        return driver
+
+    def _acquire(self):
+        with self._lock:
+            reserve = self._drivers.empty() and self._created < self.size
+            if reserve:
+                self._created += 1
+
+        if reserve:
+            # Lancement hors du verrou ; un échec libère la place réservée
+            try:
+                return self._launch()
+            except Exception:
+                with self._lock:
+                    self._created -= 1
+                raise
+
+        try:
+            return self._drivers.get(timeout=self.acquire_timeout)
+        except queue.Empty:
+            raise TimeoutError(f"Aucun navigateur disponible après {self.acquire_timeout}s "
+                               f"({self._created}/{self.size} lancés)") from None
+
+    def _discard(self, driver):
+        # Driver en erreur (planté, bloqué) : fermé et sa place libérée, le prochain `_acquire` en relance un
+        try:
+            driver.quit()
+        except Exception:
+            pass
+        with self._lock:
+            self._created -= 1
+
+    def fetch(self, url):
+        driver = self._acquire()
+        try:
+            driver.get(url)
+            wait_page_to_load(driver)
+            html = driver.page_source
+        except Exception:
+            self._discard(driver)
+            raise
+
+        self._drivers.put(driver)
+        return html
+
+    def close(self):
+        while not self._drivers.empty():
+            self._drivers.get().quit()
+        self._created = 0
+
+
+def scrape_station_page(station_id, browser_pool=None, timeout=5):
+    """
+    Récupère la section de métadonnées d'une station : d'abord en HTTP simple (session
+    partagée), puis via le pool de navigateurs si la section n'est pas dans le HTML statique
+    ou si la requête HTTP échoue (timeout, connexion, 5xx).
+
+    Returns:
+    - dict: {"html": section ou None, "path": "http" | "browser" | "failed",
+      "elapsed_s": durée, "error": message éventuel}
+    """
+    url = get_buoy_url(station_id)
+    result = {"html": None, "path": "failed", "elapsed_s": None, "error": None}
+    start = perf_counter()
+
+    try:
+        response = http_get(url, timeout=timeout)
+        response.raise_for_status()
+        section = extract_metadata_section(response.content)
+        if section is not None:
+            result.update(html=section, path="http")
+    except Exception as e:
+        # Timeout, connexion, 5xx... : le navigateur prend le relais
+        result["error"] = str(e)
+
+    if result["html"] is None and browser_pool is not None:
+        try:
+            section = extract_metadata_section(browser_pool.fetch(url))
+            if section is not None:
+                result.update(html=section, path="browser", error=None)
+        except Exception as e:
+            result["error"] = str(e)
+
+    result["elapsed_s"] = perf_counter() - start
+    return result
+
+
+def scrape_station_pages(station_ids, max_workers=SCRAPER_MAX_WORKERS, browser_pool_size=BROWSER_POOL_SIZE):
+    """
+    Remplace la boucle `requests.get` / Selenium du notebook : scrape les pages de stations
+    en parallèle et renvoie un dictionnaire au format de DICT_SECTIONS.
+
+    Args:
+    - station_ids (iterable): IDs des stations.
+    - max_workers (int): Nombre de pages récupérées simultanément.
+    - browser_pool_size (int): Nombre maximal de navigateurs de secours (0 pour désactiver).
+
+    Returns:
+    - dict: {station_id: {"html": section, "path": ..., "elapsed_s": ..., "error": ...}}
+    """
+    station_ids = list(station_ids)
+    browser_pool = BrowserPool(browser_pool_size) if browser_pool_size else None
+
+    try:
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            results = executor.map(lambda station_id: scrape_station_page(station_id, browser_pool), station_ids)
+            sections = dict(zip(station_ids, results))
+    finally:
+        if browser_pool is not None:
+            browser_pool.close()
+
+    paths = pd.Series([section["path"] for section in sections.values()], dtype="object").value_counts()
+    print(f"✅ HTTP : {paths.get('http', 0)} | 🌐 Navigateur : {paths.get('browser', 0)} | ❌ Échecs : {paths.get('failed', 0)}")
+
+    return sections
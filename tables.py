@@ -0,0 +1,70 @@
+from imports import *
+from indexes import table_keys
+
+# Définitions des tables de staging, sans engine ni identifiants : importables par les
+# schémas, le pipeline ou les tests sans base de données (database.py les ré-exporte).
+
+# Définition des tables
+metadata = MetaData()
+
+# ==============================
+# Table: cleaned_marine_data
+# ==============================
+cleaned_marine_data = Table(
+    'cleaned_marine_data', metadata,
+    Column('Datetime', DateTime, nullable=False),
+    Column('Lat', String(255), nullable=True),
+    Column('Lon', String(255), nullable=True),
+    Column('Wave Height (m)', Float, nullable=True),
+    Column('Average Wave Period (s)', Float, nullable=True),
+    Column('Dominant Wave Direction (°)', Float, nullable=True),
+    Column('Water T° (°C)', Float, nullable=True),
+    Column('Water Depth (m)', Float, nullable=True),
+    Column('Station ID', String(255), nullable=False),
+    Column('Station Zone', String(255), nullable=True),
+    Column('Sea Temperature Depth (m)', String(255), nullable=True),
+    Column('Barometer Elevation (m)', String(255), nullable=True),
+    Column('Sea Level Pressure (hPa)', Float, nullable=True),
+    Column('Year', String(255), nullable=True),
+    Column('Month', String(255), nullable=True),
+    Column('Day', String(255), nullable=True),
+    Column('Hour', String(255), nullable=True),
+    Column('DayOfWeek', String(255), nullable=True),
+    Column('DayPeriod', String(255), nullable=True),
+    *table_keys('cleaned_marine_data')
+)
+
+
+# ==============================
+# Table: cleaned_meteo_data
+# ==============================
+cleaned_meteo_data = Table(
+    'cleaned_meteo_data', metadata,
+    Column('Datetime', DateTime, nullable=False),
+    Column('Lat', String(255), nullable=True),
+    Column('Lon', String(255), nullable=True),
+    Column('Wind Direction (°)', Float, nullable=True),
+    Column('Wind Gusts (km/h)', Float, nullable=True),
+    Column('Station ID', String(255), nullable=False),
+    Column('Station Zone', String(255), nullable=True),
+    Column('Sea Temperature Depth (m)', String(255), nullable=True),
+    Column('Barometer Elevation (m)', String(255), nullable=True),
+    Column('Air T° Height (m)', String(255), nullable=True),
+    Column('T°(C°)', Float, nullable=True),
+    Column('Relative Humidity (%)', Float, nullable=True),
+    Column('Dew Point (°C)', Float, nullable=True),
+    Column('Precipitations (mm)', Float, nullable=True),
+    Column('Cloud Cover (%)', Float, nullable=True),
+    Column('Low Clouds (%)', Float, nullable=True),
+    Column('Middle Clouds (%)', Float, nullable=True),
+    Column('High Clouds (%)', Float, nullable=True),
+    Column('Visibility (km)', Float, nullable=True),
+    Column('Wind Speed (10m)', Float, nullable=True),
+    Column('Year', String(255), nullable=True),
+    Column('Month', String(255), nullable=True),
+    Column('Day', String(255), nullable=True),
+    Column('Hour', String(255), nullable=True),
+    Column('DayOfWeek', String(255), nullable=True),
+    Column('DayPeriod', String(255), nullable=True),
+    *table_keys('cleaned_meteo_data')
+)
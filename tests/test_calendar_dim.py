@@ -0,0 +1,39 @@
+import pandas as pd
+
+import calendar_dim
+from calendar_dim import add_calendar_columns, build_calendar, calendar_for, lookup_calendar
+from keys import encode_date_id
+
+
+def test_lookup_matches_values_computed_row_by_row():
+    datetimes = pd.Series(pd.to_datetime(["2025-04-01 05:59", "2025-04-05 13:10", "2024-02-29 23:00"]))
+
+    calendar = lookup_calendar(datetimes)
+
+    assert calendar["Year"].tolist() == [2025, 2025, 2024]
+    assert calendar["Month"].astype(str).tolist() == ["April", "April", "February"]
+    assert calendar["Day"].tolist() == [1, 5, 29]
+    assert calendar["Hour"].tolist() == [5, 13, 23]
+    assert calendar["DayOfWeek"].astype(str).tolist() == [d.day_name() for d in datetimes]
+    assert calendar["DayPeriod"].astype(str).tolist() == ["Night", "Afternoon", "Night"]
+
+
+def test_calendar_rows_are_deterministic():
+    datetimes = pd.to_datetime(["2025-04-01 10:50", "2025-04-01 10:10", "2025-04-02 00:00"])
+
+    first = calendar_for(datetimes)
+    second = calendar_for(datetimes)
+
+    pd.testing.assert_frame_equal(first, second)
+    assert first["Date ID"].tolist() == encode_date_id(first["Datetime"]).tolist() == [2025040110, 2025040200]
+    assert first["Datetime"].tolist() == list(pd.to_datetime(["2025-04-01 10:00", "2025-04-02 00:00"]))
+
+
+def test_calendar_grows_outside_the_precomputed_range(monkeypatch):
+    monkeypatch.setattr(calendar_dim, "_calendar", build_calendar("2025-01-01", "2025-01-31 23:00"))
+
+    df = add_calendar_columns(pd.DataFrame({"Datetime": pd.to_datetime(["2026-06-15 19:00", None])}))
+
+    assert df["Year"].tolist()[0] == 2026
+    assert df["DayPeriod"].astype(str).tolist()[0] == "Evening"
+    assert df["Year"].isna().tolist() == [False, True]
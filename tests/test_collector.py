@@ -0,0 +1,27 @@
+import pandas as pd
+
+import collector
+from collector import HostRateLimiter, collect_station
+
+
+def test_watermark_keeps_measurements_joinable_to_new_hours(monkeypatch):
+    observations = pd.DataFrame({
+        "time": pd.to_datetime(["2025-04-01 09:50", "2025-04-01 10:20", "2025-04-01 10:50", "2025-04-01 11:50"]),
+        "wave_height": [1.0, 1.1, 1.2, 1.3],
+    })
+    meteo_calls = []
+
+    def meteo_api_request(coordinates, since=None):
+        meteo_calls.append(since)
+        return pd.DataFrame({"date": pd.to_datetime(["2025-04-01 11:00", "2025-04-01 12:00"]), "temperature_2m": 20.0})
+
+    monkeypatch.setattr(collector.NDBC, "realtime_observations", lambda buoy_id: observations.copy(), raising=False)
+    monkeypatch.setattr(collector, "meteo_api_request", meteo_api_request)
+
+    buoy_info, timings = collect_station("41001", {"lat_buoy": "14.51N", "lon_buoy": "51.25W"},
+                                         HostRateLimiter({}), watermark=pd.Timestamp("2025-04-01 10:00"))
+
+    # 10:50 est la mesure la plus proche de 11:00 (nouvelle heure) ; 10:20 ne sert qu'à 10:00, déjà chargée
+    assert timings["status"] == "ok"
+    assert buoy_info["Marine"]["Datetime"].tolist() == list(pd.to_datetime(["2025-04-01 10:50", "2025-04-01 11:50"]))
+    assert meteo_calls == [pd.Timestamp("2025-04-01 10:00")]
@@ -0,0 +1,21 @@
+from engines import EngineRegistry
+
+
+def test_registry_reuses_one_engine_per_database(tmp_path):
+    registry = EngineRegistry(urls={"db_staging": f"sqlite:///{tmp_path / 'staging.db'}"},
+                              creds_path=str(tmp_path / "missing.json"))
+
+    engine = registry.get("db_staging")
+
+    assert registry.get("db_staging") is engine
+    assert registry.stats()["db_staging"]["url"].startswith("sqlite:///")
+    registry.dispose("db_staging")
+    assert registry.get("db_staging") is not engine
+
+
+def test_url_override_from_environment(tmp_path, monkeypatch):
+    monkeypatch.setenv("DB_URL_DB_DW", f"sqlite:///{tmp_path / 'dw.db'}")
+    registry = EngineRegistry(creds_path=str(tmp_path / "missing.json"))
+
+    # Aucun fichier d'identifiants lu : l'URL vient de DB_URL_DB_DW
+    assert registry.url_for("db_DW").get_backend_name() == "sqlite"
@@ -0,0 +1,229 @@
+import numpy as np
+import pandas as pd
+import requests
+
+from functions import (OPENMETEO_DAILY_VARIABLES, OPENMETEO_HOURLY_VARIABLES, OPENMETEO_URL,
+                       build_openmeteo_params, calculate_closer_probabilities, chunk_openmeteo_coordinates,
+                       closer_matrix, convert_coordinate_columns, decode_openmeteo_response,
+                       normalize_datetimes, parse_coordinate_series, parse_coordinates)
+
+
+def _coordinates(count):
+    return [(str(41000 + i), 14.51 + i / 100, -51.25 - i / 100) for i in range(count)]
+
+
+def _url(chunk, interval):
+    _, latitudes, longitudes = zip(*chunk)
+    params = build_openmeteo_params(list(latitudes), list(longitudes), interval=interval,
+                                    since=pd.Timestamp("2025-04-01"))
+    return requests.Request("GET", OPENMETEO_URL, params=params).prepare().url
+
+
+def test_params_join_lists_with_commas():
+    params = build_openmeteo_params([14.51, 15.0], [-51.25, -52.0])
+
+    assert params["latitude"] == "14.51,15.0"
+    assert params["longitude"] == "-51.25,-52.0"
+    assert params["hourly"] == ",".join(OPENMETEO_HOURLY_VARIABLES)
+    assert "latitude=14.51%2C15.0&" in requests.Request("GET", OPENMETEO_URL, params=params).prepare().url
+
+
+def test_chunked_urls_fit_the_limit():
+    max_url_length = 2000
+    for interval in ["hourly", "daily"]:
+        chunks = list(chunk_openmeteo_coordinates(_coordinates(200), max_url_length=max_url_length, interval=interval))
+
+        assert sum(len(chunk) for chunk in chunks) == 200
+        assert all(len(_url(chunk, interval)) <= max_url_length for chunk in chunks)
+        # Pas de découpage trop prudent : le paquet plein utilise au moins 80 % de la limite
+        assert len(_url(chunks[0], interval)) > 0.8 * max_url_length
+
+    # Variables journalières plus longues : paquets plus petits
+    assert len(",".join(OPENMETEO_DAILY_VARIABLES)) > len(",".join(OPENMETEO_HOURLY_VARIABLES))
+    hourly = list(chunk_openmeteo_coordinates(_coordinates(200), max_url_length=max_url_length))
+    daily = list(chunk_openmeteo_coordinates(_coordinates(200), max_url_length=max_url_length, interval="daily"))
+    assert len(daily[0]) < len(hourly[0])
+
+
+def test_chunks_respect_max_locations():
+    chunks = list(chunk_openmeteo_coordinates(_coordinates(5), max_locations=2))
+    assert [len(chunk) for chunk in chunks] == [2, 2, 1]
+
+
+def test_normalize_datetimes_tz_aware_and_naive():
+    aware = pd.Series(pd.to_datetime(["2025-04-01 12:50"]).tz_localize("America/New_York"))
+    result, report = normalize_datetimes(aware)
+    assert report["path"] == "datetime"
+    assert result.tolist() == [pd.Timestamp("2025-04-01 16:00")]
+
+    naive, _ = normalize_datetimes(pd.Series(pd.to_datetime(["2025-04-01 12:50"])))
+    assert naive.tolist() == [pd.Timestamp("2025-04-01 12:00")]
+
+
+def test_normalize_datetimes_iso_and_epoch():
+    iso, report = normalize_datetimes(pd.Series(["2025-04-01T12:50:00+02:00", None]))
+    assert (report["path"], report["format"], report["failed"]) == ("format", "ISO8601", 0)
+    assert iso.iloc[0] == pd.Timestamp("2025-04-01 10:00")
+
+    for epoch, unit in [(1743512400, "s"), (1743512400000, "ms")]:
+        parsed, report = normalize_datetimes(pd.Series([epoch]))
+        assert (report["path"], report["format"]) == ("epoch", unit)
+        assert parsed.iloc[0] == pd.Timestamp("2025-04-01 13:00")
+
+
+def test_normalize_datetimes_ambiguous_slashes_are_month_first():
+    ambiguous, report = normalize_datetimes(pd.Series(["03/04/2025 10:00", "05/06/2025 11:00"]))
+    assert report["format"] == "%m/%d/%Y %H:%M"
+    assert ambiguous.tolist() == [pd.Timestamp("2025-03-04 10:00"), pd.Timestamp("2025-05-06 11:00")]
+
+    # Jour > 12 : seul le format jour/mois convient
+    day_first, report = normalize_datetimes(pd.Series(["25/04/2025 10:00", "26/04/2025 11:00"]))
+    assert report["format"] == "%d/%m/%Y %H:%M"
+    assert day_first.iloc[0] == pd.Timestamp("2025-04-25 10:00")
+
+
+def test_normalize_datetimes_reports_failures():
+    parsed, report = normalize_datetimes(pd.Series(["2025-04-01 10:00"] * 9 + ["not a date"]))
+    assert report["failed"] == 1
+    assert report["failed_index"] == [9]
+    assert parsed.isna().sum() == 1
+
+
+class _Variable:
+    def __init__(self, values):
+        self.values = values
+
+    def ValuesAsNumpy(self):
+        return np.asarray(self.values, dtype=np.float32)
+
+    def ValuesInt64AsNumpy(self):
+        return np.asarray(self.values, dtype=np.int64)
+
+
+class _Block:
+    def __init__(self, start, periods, interval_s, variables):
+        self.start, self.periods, self.interval_s, self.variables = start, periods, interval_s, variables
+
+    def Time(self):
+        return self.start
+
+    def TimeEnd(self):
+        return self.start + self.periods * self.interval_s
+
+    def Interval(self):
+        return self.interval_s
+
+    def Variables(self, i):
+        return _Variable(self.variables[i])
+
+
+class _Response:
+    def __init__(self, hourly=None, daily=None):
+        self._hourly, self._daily = hourly, daily
+
+    def Hourly(self):
+        return self._hourly
+
+    def Daily(self):
+        return self._daily
+
+
+START = int(pd.Timestamp("2025-04-01", tz="UTC").timestamp())
+
+
+def test_decode_hourly_response_columns_and_dtypes():
+    variables = [[20.123, 21.456]] + [[1.0, 2.0]] * (len(OPENMETEO_HOURLY_VARIABLES) - 1)
+    response = _Response(hourly=_Block(START, 2, 3600, variables))
+
+    df = decode_openmeteo_response(response)
+    assert list(df.columns) == ["date"] + OPENMETEO_HOURLY_VARIABLES
+    assert df["date"].tolist() == list(pd.date_range("2025-04-01", periods=2, freq="h", tz="UTC"))
+    assert df["temperature_2m"].dtype == "float64"
+    assert df["temperature_2m"].tolist() == [20.12, 21.46]
+
+    compact = decode_openmeteo_response(response, float32=True)
+    assert (compact.dtypes.drop("date") == "float32").all()
+
+
+def test_decode_daily_response_keeps_epoch_variables_as_datetimes():
+    sunrise = START + 6 * 3600
+    variables = [[sunrise] if name in ("sunrise", "sunset") else [1.5] for name in OPENMETEO_DAILY_VARIABLES]
+    response = _Response(daily=_Block(START, 1, 86400, variables))
+
+    df = decode_openmeteo_response(response, interval="daily")
+
+    assert list(df.columns) == ["date"] + OPENMETEO_DAILY_VARIABLES
+    assert df["sunrise"].iloc[0] == pd.Timestamp("2025-04-01 06:00", tz="UTC")
+    assert df["temperature_2m_max"].tolist() == [1.5]
+
+
+SOURCES = ["NDBC", "Open-Meteo", "Visual Crossing"]
+
+
+def _sources_frame():
+    return pd.DataFrame({
+        "Station ID": ["41001", "41001", "41002", "41002", "41002"],
+        "NDBC": [20.0, 10.0, 6.0, 1.0, np.nan],
+        "Open-Meteo": [21.0, 10.0, 9.0, 2.0, 3.0],
+        "Visual Crossing": [25.0, 12.0, 5.0, 3.0, 4.0],
+    })
+
+
+def test_closer_matrix_marks_the_median_source_and_ties():
+    closer = closer_matrix(_sources_frame(), SOURCES)
+
+    # La ligne avec un NaN est ignorée
+    assert closer.index.tolist() == [0, 1, 2, 3]
+    assert closer.loc[0].tolist() == [False, True, False]
+    assert closer.loc[2].tolist() == [True, False, False]
+    # 10 / 10 / 12 : NDBC et Open-Meteo sont à égalité, les deux comptent
+    assert closer.loc[1].tolist() == [True, True, False]
+    assert closer.loc[3].tolist() == [False, True, False]
+
+
+def test_closer_probabilities_do_not_modify_the_input():
+    df = _sources_frame()
+    before = df.copy()
+
+    probabilities = calculate_closer_probabilities(df, SOURCES)
+
+    assert probabilities == {"NDBC": 0.5, "Open-Meteo": 0.75, "Visual Crossing": 0.0}
+    pd.testing.assert_frame_equal(df, before)
+
+
+def test_closer_probabilities_by_station():
+    probabilities = calculate_closer_probabilities(_sources_frame(), SOURCES, by="Station ID")
+
+    assert probabilities.index.tolist() == ["41001", "41002"]
+    assert probabilities.loc["41001"].tolist() == [0.5, 1.0, 0.0]
+    assert probabilities.loc["41002"].tolist() == [0.5, 0.5, 0.0]
+
+
+def test_parse_coordinate_series_handles_suffixes_and_invalid_values():
+    series = pd.Series(["14.51N", "75.15W", "-45.5", "12.3s", 14.514, None, "nowhere"], name="Lat")
+
+    parsed = parse_coordinate_series(series)
+
+    assert parsed.dtype == "float64"
+    assert parsed.name == "Lat"
+    assert parsed.iloc[:5].tolist() == [14.51, -75.15, -45.5, -12.3, 14.51]
+    assert parsed.iloc[5:].isna().all()
+
+
+def test_parse_coordinate_series_matches_the_scalar_parser():
+    values = ["14.51N", "75.15W", "0.5E", "-3.2", "+8.1S"]
+
+    parsed = parse_coordinate_series(pd.Series(values), decimals=None)
+
+    assert parsed.tolist() == [parse_coordinates(value) for value in values]
+
+
+def test_convert_coordinate_columns_returns_a_copy():
+    df = pd.DataFrame({"Lat": ["14.51N", "14.51N"], "Lon": ["75.15W", "75.15W"]}, index=[3, 7])
+
+    converted = convert_coordinate_columns(df)
+
+    assert converted.index.tolist() == [3, 7]
+    assert converted["Lat"].tolist() == [14.51, 14.51]
+    assert converted["Lon"].tolist() == [-75.15, -75.15]
+    assert df["Lat"].tolist() == ["14.51N", "14.51N"]
@@ -0,0 +1,42 @@
+import threading
+from http.server import BaseHTTPRequestHandler, HTTPServer
+
+import pytest
+
+from http_client import HttpClient
+
+
+class _Handler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        body = b'{"ok": true}'
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def server_url():
+    server = HTTPServer(("127.0.0.1", 0), _Handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_port}/data"
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.mark.parametrize("backend", ["memory", "sqlite", "filesystem"])
+def test_hit_and_miss_counters_per_backend(tmp_path, server_url, backend):
+    client = HttpClient(backend=backend, cache_name=str(tmp_path / "http_cache"), retries=0)
+
+    responses = [client.get(server_url) for _ in range(5)]
+
+    assert [response.from_cache for response in responses] == [False] + [True] * 4
+    stats = client.stats()
+    assert (stats["hits"], stats["misses"]) == (4, 1)
+    assert stats["hit_rate"] == 0.8
+    client.session.close()
@@ -0,0 +1,126 @@
+import json
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from functions import clean_dataframe, handle_null_values
+from imputation import Imputer, apply_null_plan, null_plan_report, null_threshold, plan_null_policies
+
+
+def _readings():
+    return pd.DataFrame({
+        "Datetime": pd.to_datetime(["2025-04-01 00:00", "2025-04-01 01:00", "2025-04-01 02:00",
+                                    "2025-04-01 00:00", "2025-04-01 01:00", "2025-04-01 02:00"]),
+        "Station ID": ["41001", "41001", "41001", "41002", "41002", "41002"],
+        "Wind Speed (km/h)": [10.0, np.nan, 30.0, 1.0, 2.0, np.nan],
+        "visibility": [1.0, 2.0, np.nan, 9.0, np.nan, np.nan],
+        "water_level_above_mean": [np.nan, 0.4, 0.2, np.nan, np.nan, 0.1],
+    })
+
+
+def test_policies_median_mean_and_constant():
+    df = _readings()
+
+    filled = Imputer(policies={"visibility": "mean", "water_level_above_mean": ("constant", 0)}).fit_transform(df)
+
+    # Médiane globale de [10, 30, 1, 2] = 6, moyenne de [1, 2, 9] = 4
+    assert filled["Wind Speed (km/h)"].tolist() == [10.0, 6.0, 30.0, 1.0, 2.0, 6.0]
+    assert filled["visibility"].tolist() == [1.0, 2.0, 4.0, 9.0, 4.0, 4.0]
+    assert filled["water_level_above_mean"].tolist() == [0.0, 0.4, 0.2, 0.0, 0.0, 0.1]
+    assert df["Wind Speed (km/h)"].isna().sum() == 2
+
+
+def test_group_statistics_fall_back_to_global_values():
+    imputer = Imputer(by=["Station ID"], default="median").fit(_readings())
+
+    batch = pd.DataFrame({
+        "Datetime": pd.to_datetime(["2025-04-02 00:00"] * 3),
+        "Station ID": ["41001", "41002", "41003"],
+        "Wind Speed (km/h)": [np.nan] * 3,
+        "visibility": [np.nan] * 3,
+        "water_level_above_mean": [np.nan] * 3,
+    })
+    filled = imputer.transform(batch)
+
+    # 41003 n'existait pas au fit : statistique globale
+    assert filled["Wind Speed (km/h)"].tolist() == [20.0, 1.5, 6.0]
+    assert filled["visibility"].tolist() == [1.5, 9.0, 2.0]
+    assert filled["Station ID"].tolist() == ["41001", "41002", "41003"]
+
+
+def test_ffill_stays_within_each_station():
+    df = _readings()
+
+    filled = Imputer(policies={"Wind Speed (km/h)": ("ffill", 1)}, default=None, by=["Station ID"]).fit_transform(df)
+
+    assert filled["Wind Speed (km/h)"].tolist() == [10.0, 10.0, 30.0, 1.0, 2.0, 2.0]
+    # default=None : les autres colonnes ne sont pas imputées
+    assert filled["visibility"].isna().sum() == 3
+
+
+def test_transform_requires_fit():
+    with pytest.raises(RuntimeError):
+        Imputer().transform(_readings())
+
+
+def test_clean_dataframe_reuses_fitted_statistics():
+    first = _readings()
+    imputer = Imputer(policies={"visibility": "mean", "water_level_above_mean": ("constant", 0)}).fit(first)
+
+    batch = pd.DataFrame({"Wind Speed (km/h)": ["100", None], "visibility": [50.0, None],
+                          "water_level_above_mean": [None, 1.0]})
+    cleaned = clean_dataframe(batch, ["Wind Speed (km/h)"], imputer=imputer)
+
+    # Les statistiques du premier lot sont utilisées, pas celles du lot courant
+    assert cleaned["Wind Speed (km/h)"].tolist() == [100.0, 6.0]
+    assert cleaned["visibility"].tolist() == [50.0, 4.0]
+    assert cleaned["water_level_above_mean"].tolist() == [0.0, 1.0]
+
+
+def _sparse_frame():
+    return pd.DataFrame({
+        "Station ID": ["41001", "41001", "41002", "41002", "41002"],
+        "Pressure (hPa)": [1010.0, np.nan, 1012.0, 1013.0, 1020.0],
+        "Station Zone": ["gulf", None, "gulf", "atlantic", "gulf"],
+        "Tide (ft)": [np.nan, np.nan, np.nan, 1.0, 2.0],
+    })
+
+
+def test_null_threshold_depends_on_row_count():
+    assert null_threshold(5) == ("red", 50)
+    assert null_threshold(2001) == ("orange", 55)
+    assert null_threshold(100001) == ("green", 70)
+
+
+def test_plan_decides_every_column_in_one_pass():
+    plan = plan_null_policies(_sparse_frame())
+
+    assert plan["policy"].to_dict() == {"Station ID": "keep", "Pressure (hPa)": "median",
+                                        "Station Zone": "mode", "Tide (ft)": "drop"}
+    assert plan.loc["Pressure (hPa)", "fill_value"] == 1012.5
+    assert plan.loc["Station Zone", "fill_value"] == "gulf"
+    assert plan.loc["Tide (ft)", "null_pct"] == 60.0
+
+
+def test_apply_plan_drops_and_fills():
+    df = _sparse_frame()
+
+    cleaned = apply_null_plan(df, plan_null_policies(df))
+
+    assert list(cleaned.columns) == ["Station ID", "Pressure (hPa)", "Station Zone"]
+    assert cleaned["Pressure (hPa)"].tolist() == [1010.0, 1012.5, 1012.0, 1013.0, 1020.0]
+    assert cleaned["Station Zone"].tolist() == ["gulf", "gulf", "gulf", "atlantic", "gulf"]
+    assert "Tide (ft)" in df.columns
+
+
+def test_handle_null_values_returns_a_json_report():
+    cleaned, report = handle_null_values(_sparse_frame(), return_report=True)
+
+    assert not cleaned.isna().any().any()
+    assert (report["rows"], report["tag"], report["threshold"]) == (5, "red", 50)
+    assert report["dropped"] == ["Tide (ft)"]
+    assert report["elapsed_s"] >= 0
+    # Aucun type numpy dans le rapport
+    json.dumps(report)
+    assert report == null_plan_report(plan_null_policies(_sparse_frame()), elapsed_s=report["elapsed_s"])
@@ -0,0 +1,91 @@
+import pandas as pd
+import pytest
+from sqlalchemy import (Column, DateTime, Float, Index, MetaData, PrimaryKeyConstraint, String, Table, create_engine,
+                        inspect)
+
+import indexes
+from indexes import index_name, migrate_table_keys, table_keys
+
+DATETIME_INDEX = index_name("cleaned_marine_data", ("Datetime",))
+
+
+def _columns():
+    return [Column("Datetime", DateTime), Column("Station ID", String(255)), Column("Wave Height (m)", Float)]
+
+
+def _legacy_engine(tmp_path, station_ids=("41001", "41002")):
+    # Table créée avant la clé composite : clé primaire sur 'Datetime' seul
+    engine = create_engine(f"sqlite:///{tmp_path / 'staging.db'}")
+    metadata = MetaData()
+    # Avec un index de même nom que celui de la nouvelle définition (noms globaux sous SQLite)
+    Table("cleaned_marine_data", metadata, *_columns(), PrimaryKeyConstraint("Datetime"),
+          Index(DATETIME_INDEX, "Datetime", "Station ID"))
+    metadata.create_all(engine)
+    pd.DataFrame({
+        "Datetime": pd.date_range("2025-04-01", periods=len(station_ids), freq="h"),
+        "Station ID": list(station_ids),
+        "Wave Height (m)": 1.0,
+    }).to_sql("cleaned_marine_data", engine, if_exists="append", index=False)
+    return engine
+
+
+def _target():
+    return Table("cleaned_marine_data", MetaData(), *_columns(),
+                 *table_keys("cleaned_marine_data", indexes=[("Datetime",), ("Wave Height (m)",)]))
+
+
+def _indexes(engine, table_name):
+    return {index["name"]: index["column_names"] for index in inspect(engine).get_indexes(table_name)}
+
+
+def test_migration_moves_to_composite_key(tmp_path):
+    engine = _legacy_engine(tmp_path)
+
+    report = migrate_table_keys(engine, _target())
+
+    assert report["status"] == "migrated"
+    assert report["rows_copied"] == 2
+    assert inspect(engine).get_pk_constraint("cleaned_marine_data")["constrained_columns"] == ["Station ID", "Datetime"]
+    assert inspect(engine).has_table("cleaned_marine_data_backup")
+    assert _indexes(engine, "cleaned_marine_data")[DATETIME_INDEX] == ["Datetime"]
+    assert len(_indexes(engine, "cleaned_marine_data")) == 2
+    assert migrate_table_keys(engine, _target())["status"] == "up_to_date"
+
+
+def test_failed_swap_drops_migration_table(tmp_path, monkeypatch):
+    engine = _legacy_engine(tmp_path)
+
+    def fail(conn, renames):
+        raise RuntimeError("rename failed")
+
+    monkeypatch.setattr(indexes, "_rename_tables", fail)
+    with pytest.raises(RuntimeError):
+        migrate_table_keys(engine, _target())
+
+    assert not inspect(engine).has_table("cleaned_marine_data_migration")
+    assert inspect(engine).get_pk_constraint("cleaned_marine_data")["constrained_columns"] == ["Datetime"]
+    assert _indexes(engine, "cleaned_marine_data") == {DATETIME_INDEX: ["Datetime", "Station ID"]}
+    assert len(pd.read_sql_table("cleaned_marine_data", engine)) == 2
+
+
+def test_duplicate_keys_stop_the_migration(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'staging.db'}")
+    pd.DataFrame({
+        "Datetime": pd.to_datetime(["2025-04-01", "2025-04-01"]),
+        "Station ID": ["41001", "41001"],
+        "Wave Height (m)": [1.0, 2.0],
+    }).to_sql("cleaned_marine_data", engine, index=False)
+
+    with pytest.raises(ValueError):
+        migrate_table_keys(engine, _target())
+    assert not inspect(engine).has_table("cleaned_marine_data_migration")
+
+
+def test_migration_without_backup(tmp_path):
+    engine = _legacy_engine(tmp_path)
+
+    report = migrate_table_keys(engine, _target(), keep_backup=False)
+
+    assert report["backup"] is None
+    assert not inspect(engine).has_table("cleaned_marine_data_backup")
+    assert set(_indexes(engine, "cleaned_marine_data")) == set(report["indexes_added"])
@@ -0,0 +1,31 @@
+import pandas as pd
+import pytest
+
+from keys import decode_keys, encode_keys, encode_station
+
+
+def test_keys_round_trip():
+    station_ids = pd.Series(["41001", "LONF1", "041001", "41001"])
+    datetimes = pd.to_datetime(["2025-04-01 00:00", "2025-04-01 01:00", "1970-01-01 00:00", "2025-04-02 23:00"])
+
+    keys = encode_keys(station_ids, datetimes)
+    decoded = decode_keys(keys)
+
+    assert keys.dtype == "int64"
+    assert decoded["Station ID"].tolist() == station_ids.tolist()
+    assert decoded["Datetime"].tolist() == datetimes.tolist()
+
+
+def test_leading_zeros_give_distinct_keys():
+    assert encode_station("041001") != encode_station("41001")
+
+
+@pytest.mark.parametrize("station_id", ["lonf1", " 41001", "41001 ", "", "TOOLONG1", "41-01"])
+def test_non_canonical_station_ids_are_rejected(station_id):
+    with pytest.raises(ValueError):
+        encode_station(station_id)
+
+
+def test_keys_require_whole_hours():
+    with pytest.raises(ValueError):
+        encode_keys(["41001"], pd.to_datetime(["2025-04-01 00:50"]))
@@ -0,0 +1,83 @@
+from types import SimpleNamespace
+
+import pytest
+import pandas as pd
+from sqlalchemy import Column, DateTime, Float, MetaData, PrimaryKeyConstraint, String, Table, create_engine
+from sqlalchemy.dialects.mysql import mysqlconnector, mysqldb
+
+from loader import _values_statement, load_dataframe
+
+
+def _table(metadata=None, *keys):
+    return Table("cleaned_meteo_data", metadata if metadata is not None else MetaData(),
+                 Column("Datetime", DateTime), Column("Station ID", String(255)),
+                 Column("Relative Humidity (%)", Float), *keys)
+
+
+def _engine(tmp_path, *keys):
+    engine = create_engine(f"sqlite:///{tmp_path / 'staging.db'}")
+    metadata = MetaData()
+    _table(metadata, *keys)
+    metadata.create_all(engine)
+    return engine
+
+
+def _frame(humidity):
+    return pd.DataFrame({
+        "Datetime": pd.to_datetime(["2025-04-01 00:00", "2025-04-01 00:00", "2025-04-01 01:00"]),
+        "Station ID": ["41001", "41002", "41001"],
+        "Relative Humidity (%)": humidity,
+    })
+
+
+def _rows(engine):
+    return pd.read_sql_table("cleaned_meteo_data", engine).sort_values(["Datetime", "Station ID"])
+
+
+@pytest.mark.parametrize("dialect, expected", [
+    (mysqlconnector.dialect(), "`Relative Humidity (%)`"),
+    (mysqldb.dialect(), "`Relative Humidity (%%)`"),
+])
+def test_values_statement_percent_escaping(dialect, expected):
+    conn = SimpleNamespace(dialect=dialect)
+    statement = _values_statement(conn, _table(), ["Datetime", "Station ID", "Relative Humidity (%)"], 2)
+
+    assert expected in statement
+    assert "%%%%" not in statement
+    assert statement.endswith("VALUES (%s, %s, %s), (%s, %s, %s)")
+
+
+@pytest.mark.parametrize("strategy", ["executemany", "values"])
+def test_load_dataframe_upsert(tmp_path, strategy):
+    engine = _engine(tmp_path, PrimaryKeyConstraint("Station ID", "Datetime"))
+
+    first = load_dataframe(_frame([80.0, 70.0, 75.0]), engine, "cleaned_meteo_data", strategy=strategy)
+    second = load_dataframe(_frame([80.0, 71.0, 75.0]), engine, "cleaned_meteo_data", strategy=strategy)
+
+    assert first["inserted"] == 3
+    assert (second["inserted"], second["updated"], second["skipped"]) == (0, 1, 2)
+    assert _rows(engine)["Relative Humidity (%)"].tolist() == [80.0, 71.0, 75.0]
+
+
+def test_load_dataframe_upsert_requires_a_unique_key(tmp_path):
+    engine = _engine(tmp_path)
+
+    with pytest.raises(ValueError):
+        load_dataframe(_frame([80.0, 70.0, 75.0]), engine, "cleaned_meteo_data")
+
+    report = load_dataframe(_frame([80.0, 70.0, 75.0]), engine, "cleaned_meteo_data", mode="insert_missing")
+    again = load_dataframe(_frame([80.0, 70.0, 75.0]), engine, "cleaned_meteo_data", mode="insert_missing")
+    assert (report["inserted"], again["inserted"], again["skipped"]) == (3, 0, 3)
+
+
+def test_insert_new_rows_follows_a_datetime_only_primary_key(tmp_path):
+    from functions import insert_new_rows
+
+    # Table créée avant la clé composite : deux stations à la même heure ne doivent pas lever d'erreur
+    engine = _engine(tmp_path, PrimaryKeyConstraint("Datetime"))
+
+    report = insert_new_rows(_frame([80.0, 70.0, 75.0]), engine, "cleaned_meteo_data", ref="Datetime")
+
+    assert report is not None
+    assert report["inserted"] == 2
+    assert len(_rows(engine)) == 2
@@ -0,0 +1,74 @@
+from datetime import timedelta
+
+import pytest
+
+import metadata_store
+from metadata_store import StationMetadataStore
+
+
+@pytest.fixture
+def source(monkeypatch):
+    state = {"metadata": {"Name": "Station 41001 - East Hatteras", "Location": "34.7 N 72.7 W"},
+             "downloads": 0, "parses": 0, "error": None}
+
+    def get_station_metadata(station_id):
+        state["downloads"] += 1
+        if state["error"]:
+            raise state["error"]
+        return dict(state["metadata"])
+
+    def parse_buoy_json(metadata):
+        state["parses"] += 1
+        return {"Station ID": metadata["Name"].split()[1], "Name": metadata["Name"]}
+
+    monkeypatch.setattr(metadata_store, "get_station_metadata", get_station_metadata)
+    monkeypatch.setattr(metadata_store, "parse_buoy_json", parse_buoy_json)
+    return state
+
+
+def _store(tmp_path, ttl):
+    return StationMetadataStore(path=str(tmp_path / "metadata.sqlite"), ttl=ttl)
+
+
+def test_fresh_entries_are_served_from_cache(tmp_path, source):
+    store = _store(tmp_path, timedelta(days=7))
+
+    first = store.get("41001")
+    assert store.get("41001") == first
+    assert store.has_fresh("41001")
+    assert source["downloads"] == 1
+
+    # Persistant : une nouvelle instance relit le fichier
+    store.close()
+    assert _store(tmp_path, timedelta(days=7)).get("41001") == first
+    assert source["downloads"] == 1
+
+
+def test_expired_entry_with_same_content_is_only_touched(tmp_path, source):
+    store = _store(tmp_path, timedelta(0))
+
+    store.get("41001")
+    store.get("41001")
+
+    assert source["downloads"] == 2
+    assert source["parses"] == 1
+
+
+def test_expired_entry_with_new_content_is_parsed_again(tmp_path, source):
+    store = _store(tmp_path, timedelta(0))
+    store.get("41001")
+
+    source["metadata"]["Name"] = "Station 41001 - East Hatteras (moved)"
+    assert store.get("41001")["Name"].endswith("(moved)")
+    assert source["parses"] == 2
+
+
+def test_network_error_falls_back_to_cached_version(tmp_path, source):
+    store = _store(tmp_path, timedelta(0))
+    cached = store.get("41001")
+
+    source["error"] = RuntimeError("timeout")
+    assert store.get("41001") == cached
+    with pytest.raises(RuntimeError):
+        store.get("41002")
+    assert store.get_many(["41001", "41002"]) == {"41001": cached}
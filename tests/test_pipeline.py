@@ -0,0 +1,154 @@
+import pandas as pd
+import pytest
+
+from pipeline import join_marine_meteo
+
+
+def _frames():
+    marine = pd.DataFrame({
+        "Datetime": pd.to_datetime(["2025-04-01 00:50", "2025-04-01 01:50", "2025-04-01 00:40"]),
+        "Station ID": ["41001", "41001", "41002"],
+        "wave_height": [1.0, 1.2, 2.0],
+        "visibility": [5.0, 6.0, 7.0],
+    })
+    meteo = pd.DataFrame({
+        "Datetime": pd.to_datetime(["2025-04-01 01:00", "2025-04-01 02:00", "2025-04-01 01:00"]),
+        "Station ID": ["41001", "41001", "41002"],
+        "temperature_2m": [20.0, 21.0, 25.0],
+        "visibility": [24000.0, 25000.0, 26000.0],
+    })
+    return marine, meteo
+
+
+def test_join_keeps_both_sides_of_overlapping_columns():
+    marine, meteo = _frames()
+    merged, report = join_marine_meteo(marine, meteo)
+
+    assert report["overlapping_columns"] == ["visibility"]
+    assert "visibility" not in merged.columns
+    merged = merged.sort_values(["Station ID", "Datetime"]).reset_index(drop=True)
+    assert merged["visibility_x"].tolist() == [5.0, 6.0, 7.0]
+    assert merged["visibility_y"].tolist() == [24000.0, 25000.0, 26000.0]
+
+
+def test_join_matches_nearest_reading_of_same_station():
+    marine, meteo = _frames()
+    merged, report = join_marine_meteo(marine, meteo, tolerance="30min")
+
+    merged = merged.sort_values(["Station ID", "Datetime"]).reset_index(drop=True)
+    assert merged["wave_height"].tolist() == [1.0, 1.2, 2.0]
+    assert merged["Datetime"].tolist() == meteo.sort_values(["Station ID", "Datetime"])["Datetime"].tolist()
+    assert report["meteo_unmatched"] == 0
+
+
+def test_join_respects_tolerance():
+    marine, meteo = _frames()
+    merged, report = join_marine_meteo(marine, meteo, tolerance="15min")
+
+    # 41002 : 00:40 → 01:00 dépasse 15 min
+    assert set(merged["Station ID"]) == {"41001"}
+    assert report["meteo_unmatched"] == 1
+    assert report["stations_empty"] == ["41002"]
+
+
+def test_load_dw_tables_upserts_on_integer_keys(tmp_path):
+    from sqlalchemy import create_engine, inspect
+
+    from calendar_dim import add_calendar_columns
+    from keys import decode_keys
+    from pipeline import load_dw_tables
+
+    engine = create_engine(f"sqlite:///{tmp_path / 'dw.db'}")
+    df = add_calendar_columns(pd.DataFrame({
+        "Datetime": pd.to_datetime(["2025-04-01 00:00", "2025-04-01 01:00"]),
+        "Station ID": ["41001", "41001"],
+        "Station Zone": ["atlantic", "atlantic"],
+        "Lat": [14.51, 14.51],
+        "Lon": [-51.25, -51.25],
+        "T°(C°)": [25.0, 25.5],
+        "Wave Height (m)": [1.0, 1.2],
+    }))
+
+    load_dw_tables(df, engine)
+    df.loc[1, "Wave Height (m)"] = 1.5
+    reports = load_dw_tables(df, engine)
+
+    assert reports["facts_ocean"]["updated"] == 1
+    assert inspect(engine).get_pk_constraint("facts_ocean")["constrained_columns"] == ["Unique ID"]
+    facts = pd.read_sql_table("facts_ocean", engine)
+    assert facts["Wave Height (m)"].tolist() == [1.0, 1.5]
+    assert decode_keys(facts["Unique ID"])["Station ID"].tolist() == ["41001", "41001"]
+
+
+def test_clean_station_keeps_ndbc_coordinates():
+    from pipeline import IMPORTANT_COLUMNS_METEOROLOGY, IMPORTANT_COLUMNS_OCEANOGRAPHY, clean_station
+
+    datetimes = pd.date_range("2025-04-01", periods=4, freq="h")
+    marine = pd.DataFrame({col: [1.0, None, 2.0, 3.0] for col in IMPORTANT_COLUMNS_OCEANOGRAPHY})
+    marine["Datetime"], marine["Lat"], marine["Lon"] = datetimes, "14.51N", "51.25W"
+    meteo = pd.DataFrame({col: [1.0, 2.0, None, 3.0] for col in IMPORTANT_COLUMNS_METEOROLOGY})
+    meteo["Datetime"] = datetimes
+
+    cleaned_marine, cleaned_meteo = clean_station({"Marine": marine, "Meteo": meteo})
+
+    assert cleaned_marine["Lat"].tolist() == ["14.51N"] * 4
+    assert cleaned_marine["wave_height"].notna().all()
+    assert cleaned_meteo["temperature_2m"].notna().all()
+
+
+def _buoy_info(buoy_id, offset):
+    hours = pd.date_range("2025-04-01 00:00", periods=6, freq="h")
+    marine = pd.DataFrame({
+        "Datetime": hours - pd.Timedelta("10min"),
+        "wind_direction": [180.0 + offset] * 6,
+        "wind_speed": [5.0, None, 7.0, 8.0, 9.0, 10.0],
+        "wave_height": [1.0 + offset, 1.1, 1.2, None, 1.4, 1.5],
+        "pressure": [1012.0] * 6,
+        "air_temperature": [20.0, 21.0, 22.0, 23.0, 24.0, 25.0],
+        "water_temperature": [18.0 + offset] * 6,
+        "Lat": ["14.51N"] * 6,
+        "Lon": [f"{51 + offset}.25W"] * 6,
+    })
+    meteo = pd.DataFrame({
+        "Datetime": hours,
+        "temperature_2m": [19.0, 20.0, 21.0, 22.0, 23.0, 24.0],
+        "relative_humidity_2m": [80.0] * 6,
+        "dew_point_2m": [15.0] * 6,
+        "precipitation": [0.0, 0.1, 0.0, 0.0, None, 0.0],
+        "pressure_msl": [1013.0] * 6,
+        "cloud_cover": [50.0] * 6,
+        "wind_speed_10m": [12.0] * 6,
+        "visibility": [24000.0] * 6,
+    })
+    return {"Marine": marine, "Meteo": meteo, "station_zone": f"zone {buoy_id}", "url": "https://example"}
+
+
+@pytest.mark.parametrize("serialization", ["arrow", "pickle"])
+def test_process_workers_give_the_same_tables_as_the_serial_path(monkeypatch, serialization):
+    import pipeline
+
+    stations = {"41001": _buoy_info("41001", 0), "41002": _buoy_info("41002", 1), "41003": None}
+
+    def fake_stations(station_ids, *args):
+        for buoy_id in station_ids:
+            buoy_info = stations[buoy_id]
+            yield buoy_id, buoy_info, {"status": "ok" if buoy_info else "error", "error": None}
+
+    monkeypatch.setattr(pipeline, "iter_collected_stations", fake_stations)
+
+    def run(process_workers):
+        loaded = []
+        report = pipeline.run_pipeline(list(stations), lambda df, table_name: loaded.append((table_name, df)),
+                                       batch_rows=1, process_workers=process_workers,
+                                       serialization=serialization)
+        return report, loaded
+
+    serial_report, serial_loaded = run(1)
+    parallel_report, parallel_loaded = run(2)
+
+    assert serial_report["stations_ok"] == parallel_report["stations_ok"] == 2
+    assert list(serial_report["stations_ignored"]) == list(parallel_report["stations_ignored"]) == ["41003"]
+    assert [name for name, _ in serial_loaded] == [name for name, _ in parallel_loaded]
+    for (_, serial_df), (_, parallel_df) in zip(serial_loaded, parallel_loaded):
+        pd.testing.assert_frame_equal(serial_df, parallel_df)
+    assert len(serial_loaded) == 4 and not serial_loaded[0][1].empty
@@ -0,0 +1,55 @@
+import pandas as pd
+import pytest
+
+import functions
+from replay import FixtureNotFound, replay_mode
+
+
+@pytest.fixture
+def openmeteo(monkeypatch):
+    calls = []
+
+    def meteo_api_request(coordinates, since=None):
+        calls.append((tuple(coordinates), since))
+        if coordinates[0] == "0N":
+            raise ValueError("coordonnées invalides")
+        return pd.DataFrame({"date": pd.to_datetime(["2025-04-01"]), "temperature_2m": [20.5]})
+
+    monkeypatch.setattr(functions, "meteo_api_request", meteo_api_request)
+    return calls
+
+
+def test_record_then_replay_without_calling_the_source(tmp_path, openmeteo):
+    with replay_mode("record", fixture_dir=str(tmp_path)) as session:
+        recorded = functions.meteo_api_request(["14.51N", "51.25W"], since=None)
+        with pytest.raises(ValueError):
+            functions.meteo_api_request(["0N", "0E"])
+    assert session.counts["recorded"] == 2
+    assert len(openmeteo) == 2
+
+    with replay_mode("replay", fixture_dir=str(tmp_path)) as session:
+        replayed = functions.meteo_api_request(["14.51N", "51.25W"], since=None)
+        # Les erreurs enregistrées sont rejouées telles quelles
+        with pytest.raises(ValueError):
+            functions.meteo_api_request(["0N", "0E"])
+        with pytest.raises(FixtureNotFound):
+            functions.meteo_api_request(["15.00N", "51.25W"], since=None)
+
+    assert session.counts["replayed"] == 2
+    assert len(openmeteo) == 2
+    pd.testing.assert_frame_equal(replayed, recorded)
+
+
+def test_uninstall_restores_the_original_function(tmp_path, openmeteo):
+    original = functions.meteo_api_request
+
+    with replay_mode("replay", fixture_dir=str(tmp_path)):
+        assert functions.meteo_api_request is not original
+
+    assert functions.meteo_api_request is original
+
+
+def test_unknown_mode_is_rejected(tmp_path):
+    with pytest.raises(ValueError):
+        with replay_mode("live", fixture_dir=str(tmp_path)):
+            pass
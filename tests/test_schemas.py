@@ -0,0 +1,93 @@
+import pandas as pd
+from sqlalchemy import BigInteger, Float, String
+from sqlalchemy.dialects import mysql
+
+from schemas import infer_sql_type, infer_table_types
+
+
+def _ddl(sql_type):
+    return sql_type.compile(dialect=mysql.dialect())
+
+
+def test_calendar_columns_get_fixed_narrow_types():
+    assert _ddl(infer_sql_type(pd.Series([2025, 2025], name="Year"))) == "SMALLINT"
+    assert _ddl(infer_sql_type(pd.Series([1, 2], name="Day"))) == "TINYINT"
+    assert _ddl(infer_sql_type(pd.Series([0, 23], name="Hour"))) == "TINYINT"
+
+
+def test_month_enum_covers_the_whole_domain():
+    # Un échantillon d'avril seulement ne doit pas empêcher d'insérer mai ensuite
+    month = infer_sql_type(pd.Series(["April", "April"], name="Month"))
+    assert len(month.enums) == 12
+    assert "May" in month.enums
+
+
+def test_coordinates_use_fixed_decimals():
+    assert _ddl(infer_sql_type(pd.Series([14.5], name="Lat"))) == "NUMERIC(8, 5)"
+    assert _ddl(infer_sql_type(pd.Series([-51.25], name="Lon"))) == "NUMERIC(9, 5)"
+
+
+def test_other_columns_are_not_narrowed_from_the_sample():
+    # Peu de valeurs distinctes et petite plage : rien ne garantit le lot suivant
+    assert isinstance(infer_sql_type(pd.Series([1, 2, 3], name="Wind Dir")), BigInteger)
+    assert isinstance(infer_sql_type(pd.Series([0.5, 1.0], name="Wave Height (m)")), Float)
+
+    station = infer_sql_type(pd.Series(["41001", "41002"], name="Station ID"))
+    assert type(station) is String
+    assert station.length == 16
+
+
+def test_text_widths_do_not_depend_on_the_first_batch():
+    first = pd.DataFrame({"Station ID": ["41001"], "Station Zone": ["gulf"], "Datetime": pd.to_datetime(["2025-04-01"])})
+    second = pd.DataFrame({"Station ID": ["LONF1"], "Station Zone": ["southwest north atlantic ocean, 200 nm"],
+                           "Datetime": pd.to_datetime(["2025-04-01 10:00:00.250"])})
+
+    first_types, _ = infer_table_types(first)
+    second_types, _ = infer_table_types(second)
+
+    assert {col: _ddl(sql_type) for col, sql_type in first_types.items()} == \
+        {col: _ddl(sql_type) for col, sql_type in second_types.items()}
+    for column in ["Station ID", "Station Zone"]:
+        assert first_types[column].length >= second[column].str.len().max()
+
+
+def test_report_counts_saved_bytes():
+    df = pd.DataFrame({"Year": [2025], "Month": ["April"], "Lat": [14.5], "Station ID": ["41001"]})
+    types, report = infer_table_types(df)
+
+    assert set(types) == set(df.columns)
+    assert report.attrs["saved_bytes_per_row"] > 0
+
+
+def test_get_schema_needs_no_database_connection():
+    import sys
+
+    from schemas import get_schema
+
+    schema = get_schema("marine")
+    assert schema["Datetime"] == "datetime64[ns]"
+    assert "database" not in sys.modules
+
+
+def test_float32_values_are_written_rounded(tmp_path):
+    from sqlalchemy import create_engine
+
+    from loader import bulk_load
+    from schemas import apply_schema
+    from tables import cleaned_marine_data
+
+    engine = create_engine(f"sqlite:///{tmp_path / 'staging.db'}")
+    cleaned_marine_data.create(engine)
+    df = apply_schema(pd.DataFrame({
+        "Datetime": pd.to_datetime(["2025-04-01 10:00"]),
+        "Station ID": ["41001"],
+        "Lat": [14.51],
+        "Water T° (°C)": [17.88],
+    }), "marine")
+    assert df["Water T° (°C)"].dtype == "float32"
+
+    bulk_load(df, engine, "cleaned_marine_data")
+
+    stored = pd.read_sql_table("cleaned_marine_data", engine)
+    assert stored["Water T° (°C)"].tolist() == [17.88]
+    assert stored["Lat"].tolist() == ["14.51"]
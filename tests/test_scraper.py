@@ -0,0 +1,103 @@
+import pytest
+
+import scraper
+from scraper import BrowserPool
+
+
+class FakeDriver:
+    page_source = "<html></html>"
+
+    def get(self, url):
+        pass
+
+    def quit(self):
+        pass
+
+
+def test_failed_launch_releases_slot(monkeypatch):
+    pool = BrowserPool(size=1, acquire_timeout=0.1)
+    launches = []
+
+    def launch():
+        launches.append(1)
+        if len(launches) == 1:
+            raise RuntimeError("chrome introuvable")
+        return FakeDriver()
+
+    monkeypatch.setattr(pool, "_launch", launch)
+
+    with pytest.raises(RuntimeError):
+        pool._acquire()
+    assert pool._created == 0
+
+    driver = pool._acquire()
+    assert isinstance(driver, FakeDriver)
+    assert pool._created == 1
+
+
+def test_acquire_times_out_when_pool_exhausted(monkeypatch):
+    pool = BrowserPool(size=1, acquire_timeout=0.1)
+    monkeypatch.setattr(pool, "_launch", FakeDriver)
+
+    pool._acquire()
+    with pytest.raises(TimeoutError):
+        pool._acquire()
+
+
+def test_fetch_returns_driver_to_pool(monkeypatch):
+    pool = BrowserPool(size=1, acquire_timeout=0.1)
+    monkeypatch.setattr(pool, "_launch", FakeDriver)
+    monkeypatch.setattr(scraper, "wait_page_to_load", lambda driver: None)
+
+    assert pool.fetch("http://example") == "<html></html>"
+    assert pool.fetch("http://example") == "<html></html>"
+    assert pool._created == 1
+
+
+def test_failed_driver_is_replaced_not_reused(monkeypatch):
+    class BrokenDriver(FakeDriver):
+        quits = 0
+
+        def get(self, url):
+            raise RuntimeError("chrome planté")
+
+        def quit(self):
+            BrokenDriver.quits += 1
+
+    pool = BrowserPool(size=1, acquire_timeout=0.1)
+    drivers = iter([BrokenDriver(), FakeDriver()])
+    monkeypatch.setattr(pool, "_launch", lambda: next(drivers))
+    monkeypatch.setattr(scraper, "wait_page_to_load", lambda driver: None)
+
+    with pytest.raises(RuntimeError):
+        pool.fetch("http://example")
+    assert BrokenDriver.quits == 1
+    assert pool._created == 0
+
+    assert pool.fetch("http://example") == "<html></html>"
+
+
+def test_http_error_falls_back_to_browser(monkeypatch):
+    import requests
+
+    section = '<section id="stationmetadata" class="metadata">41001</section>'
+
+    def http_get(url, timeout=None):
+        raise requests.ConnectionError("connexion refusée")
+
+    class PagePool:
+        def fetch(self, url):
+            return f"<html><body>{section}</body></html>"
+
+    monkeypatch.setattr(scraper, "http_get", http_get)
+    monkeypatch.setattr(scraper, "get_buoy_url", lambda station_id: f"http://example/{station_id}")
+
+    result = scraper.scrape_station_page("41001", browser_pool=PagePool())
+
+    assert result["path"] == "browser"
+    assert result["error"] is None
+    assert result["html"].text == "41001"
+
+    failed = scraper.scrape_station_page("41001", browser_pool=None)
+    assert failed["path"] == "failed"
+    assert "connexion refusée" in failed["error"]
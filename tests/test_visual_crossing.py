@@ -0,0 +1,70 @@
+import pandas as pd
+
+import visual_crossing
+from visual_crossing import load_vc_csv_cache, load_vc_hours, parse_python_literals
+
+
+def _hour(epoch, temp, conditions="Clear"):
+    return {"datetime": "00:00:00", "datetimeEpoch": epoch, "temp": temp, "preciptype": None,
+            "conditions": conditions, "stations": ["41001"], "snow": 0.0}
+
+
+def test_empty_payload_gives_empty_frame_with_columns(monkeypatch):
+    monkeypatch.setattr(visual_crossing, "fetch_vc_timeline", lambda *args, **kwargs: {"days": []})
+
+    df = load_vc_hours(14.5, -51.2, "2025-04-01", "2025-04-02", api_key="key")
+
+    assert df.empty
+    assert list(df.columns[:2]) == ["Datetime", "Date"]
+    assert "VC_temp" in df.columns
+
+
+def test_csv_cache_is_parsed_in_one_pass(tmp_path):
+    days = [
+        {"datetime": "2025-04-01", "hours": [_hour(1743465600, 25.1), _hour(1743469200, None)]},
+        {"datetime": "2025-04-02", "hours": [_hour(1743552000, 24.0, "Rain, Overcast")]},
+    ]
+    csv_path = tmp_path / "vc_meteo_14.5_-51.2.csv"
+    pd.DataFrame({"datetime": [day["datetime"] for day in days],
+                  "hours": [repr(day["hours"]) for day in days]}).to_csv(csv_path, index=False)
+
+    df = load_vc_csv_cache(csv_path)
+
+    assert len(df) == 3
+    assert df["temp"].isna().tolist() == [False, True, False]
+    assert df["conditions"].tolist() == ["Clear", "Clear", "Rain, Overcast"]
+    assert df["Datetime"].iloc[0] == pd.Timestamp("2025-04-01 00:00")
+
+
+def test_python_literals_fall_back_for_apostrophes():
+    texts = [repr([{"conditions": "Don't know", "ok": True}]), repr([None, 1.5])]
+
+    assert parse_python_literals(texts) == [[{"conditions": "Don't know", "ok": True}], [None, 1.5]]
+
+
+def test_cache_is_keyed_by_date_range(tmp_path, monkeypatch):
+    calls = []
+
+    class Response:
+        def __init__(self, url):
+            self.url = url
+
+        def raise_for_status(self):
+            pass
+
+        def json(self):
+            return {"days": [], "url": self.url}
+
+    def http_get(url, params=None):
+        calls.append(url)
+        return Response(url)
+
+    monkeypatch.setattr(visual_crossing, "http_get", http_get)
+
+    april = visual_crossing.fetch_vc_timeline(14.5, -51.2, "2025-04-01", "2025-04-02", "key", cache_dir=tmp_path)
+    may = visual_crossing.fetch_vc_timeline(14.5, -51.2, "2025-05-01", "2025-05-02", "key", cache_dir=tmp_path)
+    april_again = visual_crossing.fetch_vc_timeline(14.5, -51.2, "2025-04-01", "2025-04-02", "key", cache_dir=tmp_path)
+
+    assert len(calls) == 2
+    assert april["url"] != may["url"]
+    assert april_again == april
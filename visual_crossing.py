@@ -0,0 +1,135 @@
+from imports import *
+from http_client import http_get
+
+# ==============================
+# Configuration
+# ==============================
+VC_API_URL = "https://weather.visualcrossing.com/VisualCrossingWebServices/rest/services/timeline"
+VC_CACHE_DIR = "api_call_files"
+VC_CACHE_MAX_AGE = timedelta(hours=24)
+
+# Colonnes horaires utilisées pour la comparaison avec NDBC / Open-Meteo
+VC_HOURLY_COLUMNS = ["temp", "humidity", "precip", "dew", "windgust", "windspeed", "winddir", "pressure", "visibility"]
+
+# Anciens caches CSV : repr Python → JSON (guillemets simples, et None/True/False en position de valeur)
+PYTHON_TO_JSON = {"'": '"', "None": "null", "True": "true", "False": "false"}
+PYTHON_LITERAL_PATTERN = re.compile(r"'|(?<=[\[:,] )(?:None|True|False)(?=[,\]}])|(?<=\[)(?:None|True|False)(?=[,\]])")
+
+
+def vc_cache_path(lat, lon, start_date, end_date, cache_dir=VC_CACHE_DIR):
+    # Une entrée par point et par période demandée
+    return os.path.join(cache_dir, f"vc_meteo_{lat}_{lon}_{start_date}_{end_date}.json")
+
+
+def fetch_vc_timeline(lat, lon, start_date, end_date, api_key, cache_dir=VC_CACHE_DIR, max_age=VC_CACHE_MAX_AGE):
+    """
+    Récupère la réponse brute de l'API Visual Crossing (timeline) pour un point,
+    en la gardant en cache sous forme de JSON (au lieu d'un CSV où les heures
+    sont stockées comme des listes Python en texte).
+
+    Args:
+    - lat, lon: Coordonnées décimales.
+    - start_date, end_date (str): Dates au format YYYY-MM-DD.
+    - api_key (str): Clé API Visual Crossing.
+    - max_age (timedelta): Âge maximal du cache avant une nouvelle requête.
+
+    Returns:
+    - dict: Réponse JSON complète de l'API.
+    """
+    os.makedirs(cache_dir, exist_ok=True)
+    cache_file = vc_cache_path(lat, lon, start_date, end_date, cache_dir)
+
+    if os.path.exists(cache_file):
+        last_modified = datetime.fromtimestamp(os.path.getmtime(cache_file))
+        if datetime.now() - last_modified < max_age:
+            print(f"📦 Cache détecté ({cache_file}), modifié le {last_modified.strftime('%Y-%m-%d %H:%M:%S')}")
+            with open(cache_file, "r", encoding="utf-8") as file:
+                return json.load(file)
+        print("⚠️ Cache trouvé mais périmé → nouvelle requête API.")
+
+    url = f"{VC_API_URL}/{lat},{lon}/{start_date}/{end_date}"
+    response = http_get(url, params={"unitGroup": "metric", "key": api_key, "contentType": "json"})
+    response.raise_for_status()
+    payload = response.json()
+
+    with open(cache_file, "w", encoding="utf-8") as file:
+        json.dump(payload, file)
+    print(f"💾 Données sauvegardées dans le cache : {cache_file}")
+
+    return payload
+
+
+def flatten_vc_days(days):
+    """
+    Aplatit une liste de jours Visual Crossing (chacun avec sa liste 'hours') en une
+    ligne par heure, en une seule passe `json_normalize`.
+
+    Returns:
+    - pd.DataFrame: Colonnes horaires typées + 'Date' (jour) + 'Datetime' (datetime64, UTC naïf).
+    """
+    if not days:
+        # Mêmes colonnes qu'un résultat non vide : les sélections en aval restent valides
+        return pd.DataFrame({
+            "Date": pd.Series(dtype="datetime64[ns]"),
+            "Datetime": pd.Series(dtype="datetime64[ns]"),
+            **{col: pd.Series(dtype="float64") for col in VC_HOURLY_COLUMNS},
+        })
+
+    df = pd.json_normalize(days, record_path="hours", meta=["datetime"], meta_prefix="day_")
+    df["Date"] = pd.to_datetime(df.pop("day_datetime"), format="%Y-%m-%d")
+    df["Datetime"] = pd.to_datetime(df["datetimeEpoch"].astype("int64"), unit="s")
+
+    numeric_cols = [col for col in VC_HOURLY_COLUMNS if col in df.columns]
+    df[numeric_cols] = df[numeric_cols].apply(pd.to_numeric, errors="coerce")
+
+    return df
+
+
+def flatten_vc_payload(payload):
+    """
+    Aplatit une réponse complète de l'API et ajoute les coordonnées de la requête,
+    pour pouvoir concaténer plusieurs stations.
+    """
+    df = flatten_vc_days(payload.get("days", []))
+    df["Lat"] = payload.get("latitude")
+    df["Lon"] = payload.get("longitude")
+    return df
+
+
+def parse_python_literals(texts):
+    """
+    Parse en une seule fois une colonne de listes/dicts Python écrits en texte (repr) :
+    les valeurs sont concaténées en un seul document, traduit en JSON (guillemets, None,
+    True, False) pour `json.loads`. Si la traduction échoue (ex: apostrophe dans un texte),
+    le document entier passe par un unique `ast.literal_eval`.
+
+    Returns:
+    - list: Une valeur Python par texte.
+    """
+    document = "[" + ",".join(texts) + "]"
+    try:
+        return json.loads(PYTHON_LITERAL_PATTERN.sub(lambda match: PYTHON_TO_JSON[match.group(0)], document))
+    except ValueError:
+        return ast.literal_eval(document)
+
+
+def load_vc_csv_cache(csv_path):
+    """
+    Charge un ancien cache CSV (`vc_meteo_*.csv`) où la colonne 'hours' contient des
+    listes Python sous forme de texte, et l'aplatit avec `flatten_vc_days`.
+    """
+    df_days = pd.read_csv(csv_path, usecols=["datetime", "hours"])
+    hours = parse_python_literals(df_days["hours"].astype(str))
+    days = [{"datetime": day, "hours": day_hours} for day, day_hours in zip(df_days["datetime"], hours)]
+    return flatten_vc_days(days)
+
+
+def load_vc_hours(lat, lon, start_date, end_date, api_key, columns=VC_HOURLY_COLUMNS, prefix="VC_", **kwargs):
+    """
+    Renvoie les données horaires Visual Crossing d'un point, prêtes à être fusionnées
+    sur 'Datetime' (colonnes préfixées par `prefix`, comme dans le notebook).
+    """
+    df = flatten_vc_payload(fetch_vc_timeline(lat, lon, start_date, end_date, api_key, **kwargs))
+    columns = [col for col in columns if col in df.columns]
+    df = df[["Datetime", "Date"] + columns]
+    return df.rename(columns={col: f"{prefix}{col}" for col in columns})